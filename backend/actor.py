@@ -0,0 +1,126 @@
+"""One-at-a-time execution of a game's commands.
+
+Each game has a ``Mailbox``. A command sent to an idle mailbox runs straight
+away on the caller's own (green) thread, then that caller keeps running
+whatever other commands queued up behind it until the mailbox is empty.
+Callers that find the mailbox busy queue their command and sleep until it has
+run. So commands never run at the same time and run in the order they arrived,
+and no caller ever blocks on another to take a turn: the turn is only ever
+tried, never waited for.
+
+Under eventlet, ``threading`` is monkey patched and the waits yield to the
+hub. Mailboxes of different games are independent, so throughput grows with
+the number of games.
+"""
+
+import threading
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+# Seconds a command waits in a busy mailbox before giving up
+COMMAND_TIMEOUT = 2
+
+
+class MailboxTimeoutError(Exception):
+    pass
+
+
+class _Command:
+    """A queued command, and its outcome once it has run.
+
+    ``done`` is held from the moment the command is queued until it has run,
+    so the caller waits on it by acquiring it.
+    """
+
+    __slots__ = ("args", "cancelled", "done", "error", "fn", "kwargs", "result", "started")
+
+    def __init__(self, fn: Callable[..., Any], args: tuple, kwargs: dict):
+        self.fn, self.args, self.kwargs = fn, args, kwargs
+        self.done = threading.Lock()
+        self.done.acquire()
+        self.started = False
+        self.cancelled = False
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+    def run(self):
+        self.started = True
+        try:
+            if self.cancelled:
+                # The caller gave up just as the command was about to start
+                raise MailboxTimeoutError("Timed out waiting for the game to be free.")
+            self.result = self.fn(*self.args, **self.kwargs)
+        except BaseException as e:
+            self.error = e
+        finally:
+            self.done.release()
+
+
+class Mailbox:
+    """Runs commands one at a time, in the order they arrive.
+
+    Attributes:
+        timeout (float): Seconds a command waits in a busy mailbox before giving up.
+    """
+
+    def __init__(self, timeout: float = COMMAND_TIMEOUT):
+        self.timeout = timeout
+        # Held by whichever caller is running commands
+        self._turn = threading.Lock()
+        self._queue: deque[_Command] = deque()
+
+    def __len__(self) -> int:
+        """The number of commands waiting to run."""
+        return len(self._queue)
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a command once every command sent before it has run.
+
+        Args:
+            fn (Callable): The command.
+            *args: Its positional arguments.
+            **kwargs: Its keyword arguments.
+
+        Raises:
+            MailboxTimeoutError: The command did not start within ``timeout`` seconds.
+                It will not run.
+
+        Returns:
+            Any: What the command returned. What it raised is raised again here.
+        """
+        if not self._queue and self._turn.acquire(blocking=False):
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._drain()
+
+        command = _Command(fn, args, kwargs)
+        self._queue.append(command)
+        # The mailbox may have gone idle before the command was queued
+        if self._turn.acquire(blocking=False):
+            self._drain()
+
+        if not command.done.acquire(timeout=self.timeout):
+            command.cancelled = True
+            if not command.started:
+                raise MailboxTimeoutError("Timed out waiting for the game to be free.")
+            # Already running, so it finishes soon
+            command.done.acquire()
+        if command.error is not None:
+            raise command.error
+        return command.result
+
+    def _drain(self):
+        """Run the queued commands, then give up the turn. Call holding the turn."""
+        queue = self._queue
+        while True:
+            while queue:
+                command = queue.popleft()
+                if command.cancelled and not command.started:
+                    continue
+                command.run()
+            self._turn.release()
+            # A command queued after the last check needs a caller to run it
+            if not queue or not self._turn.acquire(blocking=False):
+                return
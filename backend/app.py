@@ -1,18 +1,27 @@
 import atexit
-import datetime
 import logging
 import os
-import sys
+import time
 from typing import Any
 
+import msgpack
 import simplejson
 from apscheduler.schedulers.background import BackgroundScheduler
-from flask import Flask, Response, json
+from eventlet import patcher
+from flask import Flask, Response, json, request
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit, join_room
-from jsonschema import ValidationError, validate
 
-from game import Game, GameError
+import logqueue
+import solver
+from events import GameEvents, running_event
+from game import SLOW_COMMAND, Change, Game, State, time_commands, validate_words
+from hibernate import Hibernator
+from hints import RANKINGS, get_engine
+from hubwatch import STALL, HubWatchdog
+from journal import Journal
+from metrics import SIZE_BUCKETS, Registry
+from registry import GameRegistry
 
 # Initialize the application
 app = Flask(__name__, static_url_path="", static_folder="static")
@@ -21,6 +30,8 @@ app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-secret-key-change-i
 socketio = SocketIO(app)
 socketio.init_app(
     app,
+    # simplejson, so cached encodings of the game state can be sent as they are
+    json=simplejson,
     cors_allowed_origins=os.environ.get(
         "ALLOWED_ORIGINS", "http://localhost:8080,http://localhost:3000"
     ).split(","),
@@ -29,31 +40,129 @@ socketio.init_app(
 # Initialize CORS
 CORS(app)
 
-# Setup logging
+# Setup logging. Records are queued and written out on a thread of their own, see
+# logqueue.py. Only one in every n records below WARNING from the busiest events
+# is kept, and each event is rate limited. Only the app's own loggers are set up,
+# the libraries' records are left to the root logger
 if not os.path.isdir("logs"):
     os.makedirs("logs")
 logger = logging.getLogger(__name__)
-logger.setLevel("DEBUG")
-handler = logging.FileHandler("logs/app.log")
-shell_handler = logging.StreamHandler(sys.stdout)
-handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
-logger.addHandler(handler)
-logger.addHandler(shell_handler)
+log_listener = logqueue.setup(
+    [logging.getLogger(name) for name in (__name__, "game", "hibernate", "hubwatch", "journal")],
+    "logs/app.log",
+    level=os.environ.get("LOG_LEVEL", "INFO"),
+    sample={"connect": 10, "disconnect": 10, "render": 100},
+    rate=float(os.environ.get("LOG_RATE", logqueue.RATE)),
+)
+# Registered first so that it runs last, once everything else has logged
+atexit.register(log_listener.stop)
+
+# Every change to a game, so games outlive the process. Snapshots of the games in
+# memory are taken every SNAPSHOT_INTERVAL seconds to keep the journal short
+journal = Journal(os.environ.get("JOURNAL_DIR", "data/journal"))
+SNAPSHOT_INTERVAL = float(os.environ.get("SNAPSHOT_INTERVAL", 300))
+
+# Idle games, packed away on disk for up to HIBERNATE_TTL seconds
+hibernate_path = os.environ.get("HIBERNATE_PATH", "data/games.sqlite3")
+if hibernate_path != ":memory:" and not os.path.isdir(os.path.dirname(hibernate_path) or "."):
+    os.makedirs(os.path.dirname(hibernate_path))
+hibernator = Hibernator(hibernate_path, journal)
+HIBERNATE_TTL = float(os.environ.get("HIBERNATE_TTL", 7 * 86400))
+
+# All games in memory, by name. Games go to disk after GAME_TTL seconds without
+# activity, and games idle for GAME_IDLE seconds are moved there sooner, least
+# recently used first, to keep at most MAX_GAMES in memory. Looking up a game
+# that is on disk brings it back.
+all_games: GameRegistry[Game] = GameRegistry(
+    ttl=float(os.environ.get("GAME_TTL", 1800)),
+    max_games=int(os.environ.get("MAX_GAMES", 10000)),
+    idle_after=float(os.environ.get("GAME_IDLE", 600)),
+    store=hibernator,
+)
+
+# Bring back the games that were in memory when the server last stopped
+for name, game in journal.recover().items():
+    # A crash while hibernating or resuming can leave a game on disk as well
+    hibernator.discard(name)
+    all_games[name] = game
+journal.start()
 
-# Dictionary to hold all games
-all_games: dict[str, Game] = {}
+# The (game, player) each connected socket plays as, and the sockets of each player
+session_players: dict[str, tuple[str, str]] = {}
+player_sessions: dict[tuple[str, str], set[str]] = {}
+
+# Sockets that asked for game state as MessagePack when they connected
+msgpack_sessions: set[str] = set()
 
 # Boolean to determine if game is being run locally. Used for testing
 test = False
 
+
+def _games_by_state() -> dict[tuple[str, ...], float]:
+    counts = dict.fromkeys(((state.value,) for state in State), 0.0)
+    for _, game in all_games.items():
+        counts[(game.state.value,)] += 1
+    return counts
+
+
+# Metrics of the server, served at /metrics, see metrics.py. Most are read from
+# where they are kept when scraped
+metrics = Registry()
+metrics.gauge("bananagrams_games", "Games in memory, by state.", ["state"], _games_by_state)
+metrics.gauge("bananagrams_games_in_memory", "Games in memory.", function=lambda: len(all_games))
+metrics.gauge("bananagrams_games_hibernated", "Games on disk.", function=lambda: len(hibernator))
+metrics.counter(
+    "bananagrams_games_expired_total",
+    "Games hibernated after going quiet.",
+    function=lambda: all_games.expired,
+)
+metrics.counter(
+    "bananagrams_games_evicted_total",
+    "Idle games hibernated to keep the number of games in memory down.",
+    function=lambda: all_games.evicted,
+)
+metrics.counter(
+    "bananagrams_games_resumed_total",
+    "Games brought back from disk.",
+    function=lambda: hibernator.resumed,
+)
+metrics.counter(
+    "bananagrams_journal_entries_total", "Entries in the journal.", function=lambda: journal.entries
+)
+metrics.counter(
+    "bananagrams_journal_flushes_total",
+    "Writes of the journal to disk.",
+    function=lambda: journal.flushes,
+)
+metrics.counter(
+    "bananagrams_journal_snapshots_total",
+    "Snapshots of the games taken.",
+    function=lambda: journal.snapshots,
+)
+# How long game commands wait for their turn and run for. Those that keep their game
+# longer than SLOW_COMMAND seconds are logged
+time_commands(metrics, slow=float(os.environ.get("SLOW_COMMAND", SLOW_COMMAND)))
+sessions = metrics.gauge("bananagrams_sessions", "Connected sockets.")
+emitted_bytes = metrics.histogram(
+    "bananagrams_emitted_bytes",
+    "Size of the payloads sent, once per room or socket sent to, by event and format.",
+    ["event", "format"],
+    SIZE_BUCKETS,
+)
+
 # ---------------------------------------
 # App routes
 # ---------------------------------------
 
 
+@app.route("/metrics")
+def get_metrics() -> Response:
+    return Response(metrics.expose(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.route("/api/get_names")
 def get_names() -> Response:
-    ids = list(all_games)
+    ids = list(all_games) + hibernator.names()
     return json.jsonify({"ids": ids})
 
 
@@ -62,44 +171,66 @@ def get_names() -> Response:
 # ---------------------------------------
 
 
-@socketio.on("join")
-def on_join(data: dict[str, Any]):
-    """Joins the connection to the provided room
-    Args:
-        data (dict): Name of the room.
-    """
-    schema = {
-        "type": "object",
-        "properties": {"name": {"type": ["string", "number"]}},
-        "required": ["name"],
-    }
-    try:
-        validate(data, schema=schema)
-    except ValidationError as e:
-        if "name" in data:
-            emit_error(data["name"], str(e))
-        else:
-            logger.error("No game specified in input. from join event")
-    else:
-        room_name = data["name"]
-        join_room(room_name)
-        logger.info(f"{'[session]'} has entered the room {room_name}")
+@socketio.on("connect")
+def on_connect(auth: dict[str, Any] | None = None):
+    """Called on client connect.
 
+    A client can ask for game state as MessagePack rather than JSON by
+    connecting with ``{"format": "msgpack"}`` as its auth data. The format in
+    use is confirmed with a ``wire_format`` event, so clients that get
+    ``"json"`` back, or nothing from an older server, stay on JSON.
 
-@socketio.on("connect")
-def on_connect():
-    """Called on client connect."""
-    logger.info(f"{'[session]'} has connected.")
+    Args:
+        auth (Dict[str, Any], optional): {
+            "format": (str, optional) "json" or "msgpack".
+        }
+    """
+    sessions.inc()
+    if isinstance(auth, dict) and auth.get("format") == "msgpack":
+        msgpack_sessions.add(request.sid)
+        emit("wire_format", {"format": "msgpack"})
+    logger.info("[session] has connected.", extra={"event": "connect"})
 
 
 @socketio.on("disconnect")
 def on_disconnect():
     """Called on client disconnect."""
-    logger.info(f"{'[session]'} has disconnected.")
+    unbind_session(request.sid)
+    msgpack_sessions.discard(request.sid)
+    sessions.dec()
+    logger.info("[session] has disconnected.", extra={"event": "disconnect"})
+
+
+def bind_session(sid: str, game_name: str, player_id: str):
+    """Record that a socket plays as a player, so it is sent that player's tiles.
+
+    Args:
+        sid (str): The socket's session ID.
+        game_name (str): The name of the game.
+        player_id (str): The ID of the player.
+    """
+    unbind_session(sid)
+    session_players[sid] = (game_name, player_id)
+    player_sessions.setdefault((game_name, player_id), set()).add(sid)
+
+
+def unbind_session(sid: str):
+    """Forget the player a socket plays as, if any.
+
+    Args:
+        sid (str): The socket's session ID.
+    """
+    key = session_players.pop(sid, None)
+    if key is None:
+        return
+    sids = player_sessions.get(key, set())
+    sids.discard(sid)
+    if not sids:
+        player_sessions.pop(key, None)
 
 
 def emit_error(game_name: str, msg: str):
-    logging.error(msg)
+    logger.debug("Sent the game named %s the error: %s", game_name, msg)
     emit(
         "render_game",
         {"status_code": 400, "message": msg, "payload": {}},
@@ -107,21 +238,154 @@ def emit_error(game_name: str, msg: str):
     )
 
 
+# Game events: each handler is declared with the schema of its payload, see events.py
+events = GameEvents(socketio, all_games, emit_error, logger, metrics, session_players)
+
+# A game or player name
+_NAME = {"type": ["string", "number"]}
+
+# A payload that only names the game
+_NAME_ONLY = {"type": "object", "properties": {"name": _NAME}, "required": ["name"]}
+
+
+def game_state(game: Game, msg: str) -> simplejson.RawJSON:
+    """The shared game state with a message, from the game's cached encoding.
+
+    Args:
+        game (Game): The game.
+        msg (str): What happened.
+
+    Returns:
+        simplejson.RawJSON: The ``game_state`` payload, already encoded.
+    """
+    encoded = game.encoded_state().decode()
+    return simplejson.RawJSON(f'{encoded[:-1]},"message":{simplejson.dumps(msg)}}}')
+
+
+def packed_game_state(game: Game, msg: str) -> bytes:
+    """The ``game_state`` payload for MessagePack clients, from the game's cached encoding.
+
+    The message is added to the packed map of the shared state by rewriting
+    the map's header, without unpacking it.
+
+    Args:
+        game (Game): The game.
+        msg (str): What happened.
+
+    Returns:
+        bytes: The payload, sent as a single binary attachment.
+    """
+    packed = game.encoded_state("msgpack")
+    if packed[0] & 0xF0 == 0x80:
+        size, body = packed[0] & 0x0F, packed[1:]
+    else:
+        # map 16, the shared state never has more than 65535 fields
+        size, body = int.from_bytes(packed[1:3], "big"), packed[3:]
+    size += 1
+    header = bytes([0x80 | size]) if size < 16 else b"\xde" + size.to_bytes(2, "big")
+    return header + body + msgpack.packb("message") + msgpack.packb(msg)
+
+
+def encode(payload: Any) -> simplejson.RawJSON:
+    """Encode a JSON payload the way Socket.IO would, to send it to several sockets.
+
+    Args:
+        payload (Any): The payload.
+
+    Returns:
+        simplejson.RawJSON: The payload, sent as it is.
+    """
+    return simplejson.RawJSON(simplejson.dumps(payload, separators=(",", ":")))
+
+
+def emit_measured(event: str, payload: Any, **kwargs):
+    """Emit an event, recording the size of its payload in ``emitted_bytes``.
+
+    Payloads not yet encoded are encoded here, and sent as they are, so measuring
+    them does not encode them twice.
+
+    Args:
+        event (str): The name of the event.
+        payload (Any): The payload, ``bytes`` for MessagePack clients.
+        **kwargs: The arguments of ``emit``, such as ``room`` or ``to``.
+    """
+    if isinstance(payload, bytes):
+        emitted_bytes.labels(event, "msgpack").observe(len(payload))
+    else:
+        if not isinstance(payload, simplejson.RawJSON):
+            payload = encode(payload)
+        emitted_bytes.labels(event, "json").observe(len(payload.encoded_json))
+    emit(event, payload, **kwargs)
+
+
 def emit_game(game_name: str, game: Game, msg: str):
-    emit(
-        "render_game",
-        {
-            "status_code": 200,
-            "message": msg,
-            "payload": simplejson.dumps(game, for_json=True),
-        },
-        room=game_name,
+    """Send the shared game state to the room, and each player only their own tiles.
+
+    Args:
+        game_name (str): The name of the game, and of its room.
+        game (Game): The game.
+        msg (str): What happened.
+    """
+    packed = [
+        sid
+        for sid, _ in socketio.server.manager.get_participants("/", game_name)
+        if sid in msgpack_sessions
+    ]
+    emit_measured("game_state", game_state(game, msg), room=game_name, skip_sid=packed or None)
+    if packed:
+        payload = packed_game_state(game, msg)
+        for sid in packed:
+            emit_measured("game_state", payload, to=sid)
+    version = game.version
+    for player_id, rack in list(game.players.items()):
+        sids = player_sessions.get((game_name, player_id))
+        if sids:
+            tiles = encode({"version": version, "tiles": rack.letters()})
+            for sid in sids:
+                emit_measured("player_tiles", tiles, to=sid)
+    logger.debug(
+        "[session] has successfully rendered their game with message %s",
+        msg,
+        extra={"event": "render"},
     )
-    logger.info(f"{'[session]'} has successfully rendered their game with message {msg}")
 
 
-@socketio.on("load_game")
-def load_game(data: dict[Any, Any]):
+def emit_change(game_name: str, change: Change):
+    """Send the room what an update changed, and each player the change to their tiles.
+
+    Args:
+        game_name (str): The name of the game, and of its room.
+        change (Change): What the update changed.
+    """
+    emit_measured("state_delta", change.delta(), room=game_name)
+    for player_id, rack in change.racks.items():
+        sids = player_sessions.get((game_name, player_id), ())
+        if sids:
+            update = encode({"version": change.version, **rack})
+            for sid in sids:
+                emit_measured("rack_update", update, to=sid)
+
+
+@events.on("join", _NAME_ONLY, find_game=False)
+def on_join(data: dict[str, Any], room_name: str):
+    """Joins the connection to the provided room
+    Args:
+        data (dict): Name of the room.
+    """
+    join_room(room_name)
+    logger.info("[session] has entered the room %s", room_name, extra={"event": "join"})
+
+
+@events.on(
+    "load_game",
+    {
+        "type": "object",
+        "properties": {"name": _NAME, "test_mode": {"type": "boolean"}},
+        "required": ["name"],
+    },
+    find_game=False,
+)
+def load_game(data: dict[Any, Any], game_name: str):
     """Loads the current game game, or creates on if none exists.
     Args:
         data (Dict[Any, Any]): {
@@ -129,37 +393,28 @@ def load_game(data: dict[Any, Any]):
             "test_mode": (bool, optional) Whether to create game in test mode.
         }
     """
-    schema = {
-        "type": "object",
-        "properties": {
-            "name": {"type": ["string", "number"]},
-            "test_mode": {"type": "boolean"},
-        },
-        "required": ["name"],
-    }
-    try:
-        validate(data, schema=schema)
-    except ValidationError as e:
-        if "name" in data:
-            emit_error(data["name"], str(e))
-        else:
-            logger.error("No game specified in input. from load_game")
-    else:
-        game_name = data["name"]
-        test_mode = data.get("test_mode", False)
-
-        if game_name not in all_games:
-            cur_game = Game(game_name, test_mode=test_mode)
-            all_games[game_name] = cur_game
-            if test_mode:
-                emit_game(game_name, cur_game, "Test game created.")
-        else:
-            game = all_games[game_name]
-            emit_game(game_name, game, "Game loaded.")
+    test_mode = data.get("test_mode", False)
+
+    game, created = all_games.get_or_create(
+        game_name, lambda: Game(game_name, test_mode=test_mode, journal=journal)
+    )
+    if created and len(all_games) > all_games.max_games:
+        _expire_games()
+    if not created:
+        emit_game(game_name, game, "Game loaded.")
+    elif test_mode:
+        emit_game(game_name, game, "Test game created.")
 
 
-@socketio.on("player_join")
-def player_join(data: dict[Any, Any]):
+@events.on(
+    "player_join",
+    {
+        "type": "object",
+        "properties": {"name": _NAME, "player_id": _NAME},
+        "required": ["name", "player_id"],
+    },
+)
+def player_join(data: dict[Any, Any], game_name: str, game: Game):
     """Adds a player to the game.
 
     Args:
@@ -168,51 +423,63 @@ def player_join(data: dict[Any, Any]):
             "player_id": (Any) ID of the player to join the game.
         }
     """
-    schema = {
+    # See if the player has already joined
+    if data["player_id"] in game.players:
+        bind_session(request.sid, game_name, data["player_id"])
+        emit_game(
+            game_name,
+            game,
+            f"Player {data['player_id']} already joined, returning game.",
+        )
+        return
+    game.join_game(data["player_id"])
+    # Send this socket the player's tiles from now on
+    bind_session(request.sid, game_name, data["player_id"])
+    emit_game(game_name, game, f"Added player {data['player_id']} to game.")
+
+
+@events.on(
+    "sync",
+    {
         "type": "object",
         "properties": {
-            "name": {"type": ["string", "number"]},
-            "player_id": {"type": ["string", "number"]},
+            "name": _NAME,
+            "player_id": _NAME,
+            "version": {"type": "integer", "minimum": 0},
         },
-        "required": ["name", "player_id"],
-    }
-    try:
-        validate(data, schema=schema)
-    except ValidationError as e:
-        if "name" in data:
-            emit_error(data["name"], str(e))
+        "required": ["name", "version"],
+    },
+)
+def sync(data: dict[Any, Any], game_name: str, game: Game):
+    """Brings a client that missed updates up to date.
+
+    The client is sent the changes since its version when the game still has
+    them, and a full snapshot otherwise.
+
+    Args:
+        data (Dict[Any, Any]): {
+            "name": (Any) The name of the game.
+            "player_id": (Any, optional) The player the client plays as, whose tiles
+                are sent if the socket joined as them.
+            "version": (int) The version of the game the client has.
+        }
+    """
+    delta = game.changes_since(data["version"])
+    if delta is None:
+        if request.sid in msgpack_sessions:
+            emit_measured("game_state", packed_game_state(game, "Game resynced."))
         else:
-            logger.error("No game specified in input. from player_join")
+            emit_measured("game_state", game_state(game, "Game resynced."))
     else:
-        game_name = data["name"]
-        try:
-            game = all_games[game_name]
-        except KeyError:
-            logger.warning(f"Could not find the game named {game_name}. from player_join")
-            emit_error(
-                game_name,
-                f"Could not find the game named {game_name}. from player_join",
-            )
-            return
+        emit_measured("state_delta", delta)
+    # Only the socket playing as the player is sent their tiles
+    player_id = data.get("player_id")
+    if session_players.get(request.sid) == (game_name, player_id) and player_id in game.players:
+        emit_measured("player_tiles", {"version": game.version, "tiles": game.rack(player_id)})
 
-        # See if the player has already joined
-        if data["player_id"] in game.players:
-            emit_game(
-                game_name,
-                game,
-                f"Player {data['player_id']} already joined, returning game.",
-            )
-            return
-        try:
-            game.join_game(data["player_id"])
-            emit_game(game_name, game, f"Added player {data['player_id']} to game.")
-        except GameError as e:
-            logging.error("Exception occurred", exc_info=True)
-            emit_error(game_name, str(e))
 
-
-@socketio.on("start_game")
-def start_game(data: dict[Any, Any]):
+@events.on("start_game", _NAME_ONLY)
+def start_game(data: dict[Any, Any], game_name: str, game: Game):
     """Starts the game.
 
     Args:
@@ -220,37 +487,12 @@ def start_game(data: dict[Any, Any]):
             "name": (Any) The name of the game.
         }
     """
-    schema = {
-        "type": "object",
-        "properties": {"name": {"type": ["string", "number"]}},
-        "required": ["name"],
-    }
-    try:
-        validate(data, schema=schema)
-    except ValidationError as e:
-        if "name" in data:
-            emit_error(data["name"], str(e))
-        else:
-            logger.error("No game specified in input. from start_game")
-    else:
-        game_name = data["name"]
-        try:
-            game = all_games[game_name]
-        except KeyError:
-            logger.warning(f"Could not find the game named {game_name}.")
-            emit_error(game_name, f"Could not find the game named {game_name}.")
-            return
+    game.start_game()
+    emit_game(game_name, game, "Game started.")
 
-        try:
-            game.start_game()
-            emit_game(game_name, game, "Game started.")
-        except GameError as e:
-            logging.error("Exception occurred", exc_info=True)
-            emit_error(game_name, str(e))
 
-
-@socketio.on("peel")
-def peel(data: dict[Any, Any]):
+@events.on("peel", _NAME_ONLY)
+def peel(data: dict[Any, Any], game_name: str, game: Game):
     """Gives every player a new tile.
 
     Args:
@@ -258,37 +500,20 @@ def peel(data: dict[Any, Any]):
             "game": (Any) The name of the game.
         }
     """
-    schema = {
-        "type": "object",
-        "properties": {"name": {"type": ["string", "number"]}},
-        "required": ["name"],
-    }
-    try:
-        validate(data, schema=schema)
-    except ValidationError as e:
-        if "name" in data:
-            emit_error(data["name"], str(e))
-        else:
-            logger.error("No game specified in input. from peel")
-    else:
-        game_name = data["name"]
-        try:
-            game = all_games[game_name]
-        except KeyError:
-            logger.warning(f"Could not find the game named {game_name}.")
-            emit_error(game_name, f"Could not find the game named {game_name}.")
-            return
-
-        try:
-            game.peel(test=test)
-            emit_game(game_name, game, "New tile given out.")
-        except GameError as e:
-            logging.error("Exception occurred", exc_info=True)
-            emit_error(game_name, str(e))
+    change = game.peel(test=test)
+    emit_change(game_name, change)
 
 
-@socketio.on("swap")
-def swap(data: dict[Any, Any]):
+@events.on(
+    "swap",
+    {
+        "type": "object",
+        "properties": {"name": _NAME, "player_id": _NAME, "letter": {"type": "string"}},
+        "required": ["name", "player_id", "letter"],
+    },
+    player="player_id",
+)
+def swap(data: dict[Any, Any], game_name: str, game: Game):
     """
     Swaps a letter for a given player.
 
@@ -299,41 +524,51 @@ def swap(data: dict[Any, Any]):
             "letter": (str) The letter to swap out.
         }
     """
-    schema = {
-        "type": "object",
-        "properties": {
-            "name": {"type": ["string", "number"]},
-            "player_id": {"type": ["string", "number"]},
-            "letter": {"type": "string"},
-        },
-        "required": ["name", "player_id", "letter"],
-    }
-    try:
-        validate(data, schema=schema)
-    except ValidationError as e:
-        if "name" in data:
-            emit_error(data["name"], str(e))
-        else:
-            logger.error("No game specified in input. from swap")
-    else:
-        game_name = data["name"]
-        try:
-            game = all_games[game_name]
-        except KeyError:
-            logger.warning(f"Could not find the game named {game_name}.")
-            emit_error(game_name, f"Could not find the game named {game_name}.")
-            return
+    change = game.swap(data["letter"], data["player_id"])
+    emit_change(game_name, change)
 
-        try:
-            game.swap(data["letter"], data["player_id"])
-            emit_game(game_name, game, f"Performed swap for player {data['player_id']}.")
-        except GameError as e:
-            logging.error("Exception occurred", exc_info=True)
-            emit_error(game_name, str(e))
 
+# A tile on a board, as the row, column and letter
+_PLACEMENT = {
+    "type": "object",
+    "properties": {
+        "row": {"type": "integer"},
+        "col": {"type": "integer"},
+        "letter": {"type": "string"},
+    },
+    "required": ["row", "col", "letter"],
+}
 
-@socketio.on("bananagrams")
-def bananagrams(data: dict[Any, Any]):
+
+@events.on(
+    "bananagrams",
+    {
+        "type": "object",
+        "properties": {
+            "name": _NAME,
+            "player_id": _NAME,
+            # Every tile is in at most two words of two letters or more
+            "words": {
+                "type": "array",
+                "items": {"type": "string", "maxLength": 32},
+                "maxItems": 144,
+            },
+            "board": {
+                "anyOf": [
+                    {
+                        "type": "array",
+                        "items": {"type": "string", "maxLength": 144},
+                        "maxItems": 144,
+                    },
+                    {"type": "array", "items": _PLACEMENT, "maxItems": 144},
+                ]
+            },
+        },
+        "required": ["name", "player_id", "words"],
+    },
+    player="player_id",
+)
+def bananagrams(data: dict[Any, Any], game_name: str, game: Game):
     """
     When someone gets bananagrams.
 
@@ -342,43 +577,20 @@ def bananagrams(data: dict[Any, Any]):
             "game": (Any) The name of the game.
             "player_id": (Any). The player to perform the swap on.
             "words": (List[str]) The words from the winning board.
+            "board": (List[str] | List[Dict[str, Any]], optional) The winning board, as
+                rows of text or as the row, col and letter of each tile. Defaults to
+                the board tracked from the player's tile placements.
         }
     """
-    schema = {
-        "type": "object",
-        "properties": {
-            "name": {"type": ["string", "number"]},
-            "player_id": {"type": ["string", "number"]},
-            "words": {"type": "array"},
-        },
-        "required": ["name", "player_id", "words"],
-    }
-    try:
-        validate(data, schema=schema)
-    except ValidationError as e:
-        if "name" in data:
-            emit_error(data["name"], str(e))
-        else:
-            logger.error("No game specified in input. from bananagrams")
-    else:
-        game_name = data["name"]
-        try:
-            game = all_games[game_name]
-        except KeyError:
-            logger.warning(f"Could not find the game named {game_name}.")
-            emit_error(game_name, f"Could not find the game named {game_name}.")
-            return
-
-        try:
-            game.bananagrams(data["player_id"], data["words"])
-            emit_game(game_name, game, "Bananagrams.")
-        except GameError as e:
-            logging.error("Exception occurred", exc_info=True)
-            emit_error(game_name, str(e))
+    board = data.get("board")
+    if board and not isinstance(board[0], str):
+        board = [(tile["row"], tile["col"], tile["letter"]) for tile in board]
+    game.bananagrams(data["player_id"], data["words"], board)
+    emit_game(game_name, game, "Bananagrams.")
 
 
-@socketio.on("continue_game")
-def continue_game(data: dict[Any, Any]):
+@events.on("continue_game", _NAME_ONLY)
+def continue_game(data: dict[Any, Any], game_name: str, game: Game):
     """
     Continues the game on false alarm banagrams.
 
@@ -387,37 +599,12 @@ def continue_game(data: dict[Any, Any]):
             "game": (Any) The name of the game.
         }
     """
-    schema = {
-        "type": "object",
-        "properties": {"name": {"type": ["string", "number"]}},
-        "required": ["name"],
-    }
-    try:
-        validate(data, schema=schema)
-    except ValidationError as e:
-        if "name" in data:
-            emit_error(data["name"], str(e))
-        else:
-            logger.error("No game specified in input. from continue_game")
-    else:
-        game_name = data["name"]
-        try:
-            game = all_games[game_name]
-        except KeyError:
-            logger.warning(f"Could not find the game named {game_name}.")
-            emit_error(game_name, f"Could not find the game named {game_name}.")
-            return
-
-        try:
-            game.continue_game()
-            emit_game(game_name, game, f"Game '{game_name}' continued.")
-        except GameError as e:
-            logging.error("Exception occurred", exc_info=True)
-            emit_error(game_name, str(e))
+    game.continue_game()
+    emit_game(game_name, game, f"Game '{game_name}' continued.")
 
 
-@socketio.on("reset")
-def reset(data: dict[Any, Any]):
+@events.on("reset", _NAME_ONLY)
+def reset(data: dict[Any, Any], game_name: str, game: Game):
     """Resets the given game.
 
     Args:
@@ -425,76 +612,327 @@ def reset(data: dict[Any, Any]):
             "game": (Any) The name of the game.
         }
     """
-    schema = {
+    game.reset()
+    emit_game(game_name, game, f"Game '{game_name}' reset.")
+
+
+@events.on(
+    "validate_words",
+    {
         "type": "object",
-        "properties": {"name": {"type": ["string", "number"]}},
-        "required": ["name"],
-    }
-    try:
-        validate(data, schema=schema)
-    except ValidationError as e:
-        if "name" in data:
-            emit_error(data["name"], str(e))
-        else:
-            logger.error("No game specified in input. from reset")
-    else:
-        game_name = data["name"]
-        try:
-            game = all_games[game_name]
-        except KeyError:
-            logger.warning(f"Could not find the game named {game_name}. from reset")
-            emit_error(game_name, f"Could not find the game named {game_name}. from reset")
-            return
+        "properties": {
+            "game_id": _NAME,
+            "player_id": _NAME,
+            "valid_words": {
+                "type": "array",
+                "items": {"type": "string", "maxLength": 32},
+                "maxItems": 512,
+            },
+        },
+        "required": ["game_id", "valid_words"],
+    },
+    key="game_id",
+)
+def validate_words_event(data: dict[Any, Any], game_name: str, game: Game):
+    """Checks a batch of words against the dictionary and replies to the sender.
 
-        game.reset()
-        emit_game(game_name, game, f"Game '{game_name}' reset.")
+    Args:
+        data (Dict[Any, Any]): {
+            "game_id": (Any) The name of the game.
+            "player_id": (Any, optional) The player checking their words.
+            "valid_words": (List[str]) The words to check.
+        }
+    """
+    emit(
+        "words_validated",
+        {
+            "game_id": game_name,
+            "player_id": data.get("player_id"),
+            "words": validate_words(data["valid_words"]),
+        },
+    )
 
 
-@socketio.on("create_test_game")
-def create_test_game(data: dict[Any, Any]):
-    """Creates a new test game with minimal tiles and allows single player.
+@events.on(
+    "find_words",
+    {
+        "type": "object",
+        "properties": {
+            "name": _NAME,
+            "player_id": _NAME,
+            "pattern": {"type": "string", "pattern": "^[A-Za-z?]{1,32}$"},
+            "limit": {"type": "integer", "minimum": 1, "maximum": 500},
+        },
+        "required": ["name", "player_id", "pattern"],
+    },
+    player="player_id",
+)
+def find_words(data: dict[Any, Any], game_name: str, game: Game):
+    """Finds the words that fit a pattern using a player's tiles and replies to the sender.
 
     Args:
         data (Dict[Any, Any]): {
             "name": (Any) The name of the game.
-            "player_id": (Any) ID of the player to automatically join.
+            "player_id": (Any) The player whose tiles fill the pattern.
+            "pattern": (str) The pattern, e.g. "??A?E" where "?" is a tile from the rack.
+            "limit": (int, optional) The maximum number of words to return.
         }
     """
-    schema = {
+    words = game.find_words(data["player_id"], data["pattern"], data.get("limit", 100))
+    emit("words_found", {"pattern": data["pattern"], "words": words})
+
+
+@events.on(
+    "rack_hints",
+    {
         "type": "object",
         "properties": {
-            "name": {"type": ["string", "number"]},
-            "player_id": {"type": ["string", "number"]},
+            "name": _NAME,
+            "player_id": _NAME,
+            "limit": {"type": "integer", "minimum": 1, "maximum": 500},
+            "rank": {"enum": list(RANKINGS)},
         },
         "required": ["name", "player_id"],
-    }
+    },
+    player="player_id",
+)
+def rack_hints(data: dict[Any, Any], game_name: str, game: Game):
+    """Finds the best words a player can build from their rack and replies to the sender.
+
+    Args:
+        data (Dict[Any, Any]): {
+            "name": (Any) The name of the game.
+            "player_id": (Any) The player to find words for.
+            "limit": (int, optional) The maximum number of words to return.
+            "rank": (str, optional) "length" or "letters", how to rank the words.
+        }
+    """
+    rack = game.rack(data["player_id"])
+    rank = data.get("rank", "length")
+    words = get_engine().words_for_rack(rack, data.get("limit", 20), rank)
+    emit("rack_hints", {"player_id": data["player_id"], "rank": rank, "words": words})
+
+
+@events.on(
+    "auto_arrange",
+    {
+        "type": "object",
+        "properties": {
+            "name": _NAME,
+            "player_id": _NAME,
+            "time_budget": {"type": "number", "exclusiveMinimum": 0, "maximum": 10},
+        },
+        "required": ["name", "player_id"],
+    },
+    player="player_id",
+)
+def auto_arrange(data: dict[Any, Any], game_name: str, game: Game):
+    """Searches for a grid that uses all of a player's tiles and replies to the sender.
+
+    The search runs in the solver's process pool and the reply is sent once it
+    finishes, with the best partial grid if the time budget ran out.
+
+    Args:
+        data (Dict[Any, Any]): {
+            "name": (Any) The name of the game.
+            "player_id": (Any) The player whose tiles to arrange.
+            "time_budget": (float, optional) Seconds to search for, defaults to 3.
+        }
+    """
+    rack = game.rack(data["player_id"])
+    time_budget = data.get("time_budget", 3.0)
+    future = solver.submit(rack, time_budget)
+    socketio.start_background_task(
+        _emit_arrangement, future, request.sid, data["player_id"], time_budget
+    )
+
+
+def _emit_arrangement(future, sid: str, player_id: str, time_budget: float):
+    """Waits for a search without blocking the event loop, then sends the grid."""
+    # Allow for the worker starting up on top of the search itself
+    deadline = time_budget + 10
+    waited = 0.0
+    while not future.done() and waited < deadline:
+        socketio.sleep(0.05)
+        waited += 0.05
+    if not future.done():
+        future.cancel()
+        logger.warning(f"Grid search for player {player_id} did not finish in time.")
+        socketio.emit("error", {"message": "Could not arrange tiles in time."}, to=sid)
+        return
     try:
-        validate(data, schema=schema)
-    except ValidationError as e:
-        if "name" in data:
-            emit_error(data["name"], str(e))
-        else:
-            logger.error("No game specified in input. from create_test_game")
-    else:
-        game_name = data["name"]
-        player_id = data["player_id"]
-
-        # Create test game
-        test_game = Game(game_name, test_mode=True)
-        all_games[game_name] = test_game
-
-        # Automatically join the player and start the game
-        try:
-            test_game.join_game(player_id)
-            test_game.start_game()  # Auto-start test games
-            emit_game(
-                game_name,
-                test_game,
-                f"Test game created, player {player_id} joined, and game started!",
-            )
-        except GameError as e:
-            logger.error("Exception occurred while creating test game", exc_info=True)
-            emit_error(game_name, str(e))
+        result = future.result()
+    except Exception:
+        logger.error("Exception occurred while arranging tiles", exc_info=True)
+        socketio.emit("error", {"message": "Could not arrange tiles."}, to=sid)
+        return
+    socketio.emit(
+        "auto_arrange",
+        {
+            "player_id": player_id,
+            "placements": result.placements,
+            "remaining": result.remaining,
+            "complete": result.complete,
+            "timed_out": result.timed_out,
+        },
+        to=sid,
+    )
+
+
+@events.on(
+    "place_tile",
+    {
+        "type": "object",
+        "properties": {
+            "game_id": _NAME,
+            "player_id": _NAME,
+            "tile_id": {"type": "string"},
+            "letter": {"type": "string", "pattern": "^[A-Za-z]$"},
+            "row": {"type": "integer"},
+            "col": {"type": "integer"},
+        },
+        "required": ["game_id", "player_id", "letter", "row", "col"],
+    },
+    key="game_id",
+    player="player_id",
+)
+def place_tile(data: dict[Any, Any], game_name: str, game: Game):
+    """Places one of a player's tiles on their board and replies with the board's state.
+
+    Args:
+        data (Dict[Any, Any]): {
+            "game_id": (Any) The name of the game.
+            "player_id": (Any) The player placing the tile.
+            "tile_id": (str, optional) The client's ID of the tile.
+            "letter": (str) The letter of the tile.
+            "row": (int) The row to place the tile in.
+            "col": (int) The column to place the tile in.
+        }
+    """
+    board = game.place_tile(
+        data["player_id"], data["row"], data["col"], data["letter"], data.get("tile_id")
+    )
+    emit_measured("tile_update", {"player_id": data["player_id"], "board": board})
+
+
+# The fields of a single move
+_MOVE_FIELDS = ("from_row", "from_col", "to_row", "to_col")
+_MOVE = {
+    "type": "object",
+    "properties": {field: {"type": "integer"} for field in _MOVE_FIELDS},
+    "required": list(_MOVE_FIELDS),
+}
+
+
+@events.on(
+    "move_tile",
+    {
+        "type": "object",
+        "properties": {
+            "game_id": _NAME,
+            "player_id": _NAME,
+            "moves": {"type": "array", "items": _MOVE, "minItems": 1, "maxItems": 144},
+            **_MOVE["properties"],
+        },
+        "required": ["game_id", "player_id"],
+        "anyOf": [{"required": ["moves"]}, {"required": list(_MOVE_FIELDS)}],
+    },
+    key="game_id",
+    player="player_id",
+)
+def move_tile(data: dict[Any, Any], game_name: str, game: Game):
+    """Moves tiles around a player's board and replies with the board's state.
+
+    Either a single move, or a list of moves that are applied all at once.
+
+    Args:
+        data (Dict[Any, Any]): {
+            "game_id": (Any) The name of the game.
+            "player_id": (Any) The player moving the tiles.
+            "from_row", "from_col", "to_row", "to_col": (int) A single move.
+            "moves": (List[Dict[str, int]], optional) Several moves, each with the
+                same four fields.
+        }
+    """
+    moves = [tuple(move[field] for field in _MOVE_FIELDS) for move in data.get("moves", [data])]
+    board = game.move_tiles(data["player_id"], moves)
+    emit_measured("tile_update", {"player_id": data["player_id"], "board": board})
+
+
+@events.on(
+    "remove_tile",
+    {
+        "type": "object",
+        "properties": {
+            "game_id": _NAME,
+            "player_id": _NAME,
+            "row": {"type": "integer"},
+            "col": {"type": "integer"},
+        },
+        "required": ["game_id", "player_id", "row", "col"],
+    },
+    key="game_id",
+    player="player_id",
+)
+def remove_tile(data: dict[Any, Any], game_name: str, game: Game):
+    """Takes a tile off a player's board and replies with the board's state.
+
+    Args:
+        data (Dict[Any, Any]): {
+            "game_id": (Any) The name of the game.
+            "player_id": (Any) The player removing the tile.
+            "row": (int) The row of the tile.
+            "col": (int) The column of the tile.
+        }
+    """
+    board = game.remove_tile(data["player_id"], data["row"], data["col"])
+    emit_measured("tile_update", {"player_id": data["player_id"], "board": board})
+
+
+@events.on(
+    "create_test_game",
+    {
+        "type": "object",
+        "properties": {"name": _NAME, "player_id": _NAME},
+        "required": ["name", "player_id"],
+    },
+    find_game=False,
+)
+def create_test_game(data: dict[Any, Any], game_name: str):
+    """Creates a new test game with minimal tiles and allows single player.
+
+    Args:
+        data (Dict[Any, Any]): {
+            "name": (Any) The name of the game.
+            "player_id": (Any) ID of the player to automatically join.
+        }
+    """
+    player_id = data["player_id"]
+
+    # Create test game, replacing an earlier test game but never a real one.
+    # Games are only made once they are wanted, as making one journals it
+    test_game, created = all_games.get_or_create(
+        game_name, lambda: Game(game_name, test_mode=True, journal=journal)
+    )
+    if created and len(all_games) > all_games.max_games:
+        _expire_games()
+    if not created:
+        if not test_game.test_mode:
+            logger.warning(f"Game {game_name} already exists. from create_test_game")
+            emit_error(game_name, f"Game {game_name} already exists.")
+            return
+        logger.info(f"Replacing test game {game_name}.")
+        test_game = all_games[game_name] = Game(game_name, test_mode=True, journal=journal)
+
+    # Automatically join the player and start the game
+    test_game.join_game(player_id)
+    bind_session(request.sid, game_name, player_id)
+    test_game.start_game()  # Auto-start test games
+    emit_game(
+        game_name,
+        test_game,
+        f"Test game created, player {player_id} joined, and game started!",
+    )
 
 
 # ---------------------------------------
@@ -503,23 +941,45 @@ def create_test_game(data: dict[Any, Any]):
 
 
 # Schedule cleanup
-def _delete_old_games():
-    games_to_delete = []
-    for game_name in all_games:
-        age = datetime.datetime.now() - all_games[game_name].date_created
-        if age.total_seconds() > 86400:
-            games_to_delete.append(game_name)
-
-    for game_name in games_to_delete:
-        del all_games[game_name]
-
+def _expire_games():
+    """Hibernate abandoned games, and the least recently used idle games when there
+    are too many, then delete games that have been hibernated for too long."""
+    expired, evicted = all_games.expired, all_games.evicted
+    removed = all_games.expire()
+    if removed:
+        logger.info(
+            f"Hibernated {len(removed)} games: {all_games.expired - expired} expired, "
+            f"{all_games.evicted - evicted} evicted, {len(all_games)} left in memory."
+        )
+    deleted = hibernator.purge(time.time() - HIBERNATE_TTL)
+    if deleted:
+        logger.info(f"Deleted {deleted} games hibernated for too long.")
+
+
+def _snapshot_games():
+    """Snapshot the games in memory, so the journal before it can be dropped."""
+    if journal.snapshot(lambda: [game for _, game in all_games.items()]):
+        logger.info(f"Snapshot of {len(all_games)} games taken.")
+
+
+# Under gunicorn's eventlet worker, watch for handlers that block every other room
+# for longer than HUB_STALL seconds, see hubwatch.py
+if patcher.is_monkey_patched("thread"):
+    watchdog = HubWatchdog(
+        metrics, threshold=float(os.environ.get("HUB_STALL", STALL)), describe=running_event
+    )
+    watchdog.start()
+    atexit.register(watchdog.stop)
 
 scheduler = BackgroundScheduler()
-scheduler.add_job(func=_delete_old_games, trigger="interval", seconds=3600)
+scheduler.add_job(func=_expire_games, trigger="interval", seconds=60)
+scheduler.add_job(func=_snapshot_games, trigger="interval", seconds=SNAPSHOT_INTERVAL)
 scheduler.start()
 
 # Shutdown your cron thread if the web process is stopped
 atexit.register(lambda: scheduler.shutdown())
+atexit.register(journal.close)
+atexit.register(solver.shutdown)
 
 
 if __name__ == "__main__":
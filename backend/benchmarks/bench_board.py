@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Time moving tiles around a board, each move followed by the summary sent to the player.
+
+Every move lifts a tile and puts it down next to another one, so each update can
+split the board's connectivity and has to be checked again.
+
+Run from the *backend* directory:
+
+    python -m benchmarks.bench_board
+"""
+
+import random
+import statistics
+import time
+
+from board import Board
+from game import is_word
+
+SIZES = [21, 144, 1000, 5000]
+MOVES = 500
+
+
+def comb(tiles: int, rng: random.Random) -> Board:
+    """A connected board: a long row with columns hanging off every other tile."""
+    width = max(2, int(tiles**0.5))
+    cells = [(0, col) for col in range(width)]
+    row = 1
+    while len(cells) < tiles:
+        cells.extend((row, col) for col in range(0, width, 2))
+        row += 1
+    return Board.from_placements([(r, c, rng.choice("AEIRST")) for r, c in cells[:tiles]], is_word)
+
+
+def main():
+    print(f"=== Board move benchmark ({MOVES} moves each) ===\n")
+    print(f"{'tiles':>6} {'median us':>10} {'p99 us':>8} {'max us':>8}")
+    for size in SIZES:
+        rng = random.Random(0)
+        board = comb(size, rng)
+        board.summary(size)
+        times = []
+        for _ in range(MOVES):
+            source = rng.choice(list(board.cells))
+            row, col = rng.choice(list(board.cells))
+            target = rng.choice([(row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)])
+            if target in board.cells:
+                continue
+            start = time.perf_counter()
+            board.move([(*source, *target)])
+            board.summary(size)
+            times.append((time.perf_counter() - start) * 1e6)
+        times.sort()
+        print(
+            f"{size:>6} {statistics.median(times):>10.1f} "
+            f"{times[int(len(times) * 0.99)]:>8.1f} {times[-1]:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
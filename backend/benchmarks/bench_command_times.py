@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+What timing every game command costs.
+
+A player places a tile and takes it off again, through the game's commands,
+which time each call and record it in the wait and run histograms, and
+through the same methods wrapped the way commands were before they were
+timed. The difference is the cost of the timing. Each is the best of several
+runs. Run from the *backend* directory:
+
+    python -m benchmarks.bench_command_times
+"""
+
+import functools
+import time
+import timeit
+
+from actor import MailboxTimeoutError
+from game import CommandTimer, Game, GameError, time_commands
+from metrics import Registry
+
+NUMBER = 20000
+REPEAT = 7
+
+# The methods under test, without the mailbox
+PLACE = Game.place_tile.__wrapped__
+REMOVE = Game.remove_tile.__wrapped__
+
+
+def _unless_retired(method, game: Game, *args, **kwargs):
+    if game.retired:
+        raise GameError("The game was put away while idle, please try again.")
+    return method(game, *args, **kwargs)
+
+
+def untimed_command(method):
+    """A command as it was before commands were timed."""
+
+    @functools.wraps(method)
+    def wrapper(self: Game, *args, **kwargs):
+        self.last_active = time.monotonic()
+        try:
+            return self.mailbox.call(_unless_retired, method, self, *args, **kwargs)
+        except MailboxTimeoutError as e:
+            raise GameError("Could not get a turn on the game - operation timed out") from e
+
+    return wrapper
+
+
+class UntimedGame(Game):
+    place_tile = untimed_command(PLACE)
+    remove_tile = untimed_command(REMOVE)
+
+
+def per_command_us(game: Game) -> float:
+    game.join_game("id_0")
+    game.join_game("id_1")
+    game.start_game()
+    letter = game.rack("id_0")[0]
+
+    def play():
+        game.place_tile("id_0", 0, 0, letter)
+        game.remove_tile("id_0", 0, 0)
+
+    return min(timeit.repeat(play, number=NUMBER, repeat=REPEAT)) / NUMBER / 2 * 1e6
+
+
+def main():
+    time_commands(Registry())
+    timer = CommandTimer(Registry())
+    game = Game("record")
+    record_ns = (
+        min(
+            timeit.repeat(
+                lambda: timer.record(game, "place_tile", 1e-5, 1e-5), number=NUMBER, repeat=REPEAT
+            )
+        )
+        / NUMBER
+        * 1e9
+    )
+    untimed_us, timed_us = per_command_us(UntimedGame("untimed")), per_command_us(Game("timed"))
+
+    print("=== Time per game command, placing and removing a tile ===\n")
+    print(f"untimed          {untimed_us:>7.2f} µs")
+    print(f"timed            {timed_us:>7.2f} µs")
+    print(f"overhead         {(timed_us - untimed_us) * 1000:>7.0f} ns")
+    print(f"(record alone)   {record_ns:>7.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
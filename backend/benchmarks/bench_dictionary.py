@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Compare the packed, memory-mapped dictionary against the plain ``set`` of words.
+
+Each variant is loaded in a fresh interpreter so that the memory numbers are not
+polluted by the other. Run from the *backend* directory:
+
+    python -m benchmarks.bench_dictionary
+"""
+
+import json
+import subprocess
+import sys
+
+WORD_LIST = "words/words.txt"
+
+CHILD = """
+import json, random, time
+
+def status():
+    fields = {}
+    with open("/proc/self/status") as file:
+        for line in file:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "RssAnon", "RssFile"):
+                fields[key] = int(value.split()[0])
+    return fields
+
+before = status()
+start = time.perf_counter()
+if VARIANT == "set":
+    with open(WORD_LIST) as file:
+        words = {x.strip() for x in file.readlines()}
+else:
+    from dictionary import load_dictionary
+    words = load_dictionary(WORD_LIST)
+load_time = time.perf_counter() - start
+
+with open(WORD_LIST) as file:
+    sample = [x.strip() for x in file.readlines()[2:]]
+rng = random.Random(0)
+hits = rng.sample(sample, 50000)
+misses = [w[::-1] + "Q" for w in hits]
+queries = hits + misses
+rng.shuffle(queries)
+
+start = time.perf_counter()
+found = sum(1 for w in queries if w in words)
+lookup_time = time.perf_counter() - start
+del sample, hits, misses, queries
+
+after = status()
+print(json.dumps({
+    "load_ms": load_time * 1000,
+    "lookups_per_s": 100000 / lookup_time,
+    "found": found,
+    "rss_kb": after["VmRSS"] - before["VmRSS"],
+    "anon_kb": after["RssAnon"] - before["RssAnon"],
+    "file_kb": after["RssFile"] - before["RssFile"],
+}))
+"""
+
+
+def run(variant: str) -> dict:
+    code = f"VARIANT = {variant!r}\nWORD_LIST = {WORD_LIST!r}\n{CHILD}"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, check=True, text=True)
+    return json.loads(out.stdout)
+
+
+def main():
+    # Make sure the packed file exists so that packing is not timed
+    run("packed")
+
+    print("=== Dictionary benchmark (100k lookups, half misses) ===\n")
+    print(
+        f"{'variant':<8} {'load ms':>9} {'lookups/s':>11} {'RSS KiB':>9} {'anon KiB':>9} {'file KiB':>9}"
+    )
+    for variant in ("set", "packed"):
+        r = run(variant)
+        print(
+            f"{variant:<8} {r['load_ms']:>9.1f} {r['lookups_per_s']:>11,.0f} "
+            f"{r['rss_kb']:>9} {r['anon_kb']:>9} {r['file_kb']:>9}"
+        )
+    print("\nanon KiB is private to each worker, file KiB is shared page cache.")
+
+
+if __name__ == "__main__":
+    main()
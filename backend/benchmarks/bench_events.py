@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Per-event overhead of socket handlers: validating the payload and finding the game.
+
+The old handlers built their schema and called ``jsonschema.validate`` on
+every event, which checks the schema and builds a validator each time. They
+are compared to the same handler with a ``Draft7Validator`` built once, and to
+``events.GameEvents``, which checks payloads with schemas compiled into
+Python. Each is timed with a handler that does nothing, for a valid and an
+invalid payload of a peel, a tile placement and a bananagrams call with a 21
+tile board. Run from the *backend* directory:
+
+    python -m benchmarks.bench_events
+"""
+
+import timeit
+from unittest.mock import MagicMock
+
+from jsonschema import Draft7Validator, ValidationError, validate
+from jsonschema.exceptions import best_match
+
+from events import GameEvents
+from game import Game
+
+NUMBER = 5000
+# jsonschema.validate takes milliseconds a call
+SLOW_NUMBER = 200
+
+NAME = {"type": ["string", "number"]}
+PLACEMENT = {
+    "type": "object",
+    "properties": {
+        "row": {"type": "integer"},
+        "col": {"type": "integer"},
+        "letter": {"type": "string"},
+    },
+    "required": ["row", "col", "letter"],
+}
+
+# (schema, key, valid payload, invalid payload) of each event
+EVENTS = {
+    "peel": (
+        {"type": "object", "properties": {"name": NAME}, "required": ["name"]},
+        "name",
+        {"name": "game"},
+        {"name": ["game"]},
+    ),
+    "place_tile": (
+        {
+            "type": "object",
+            "properties": {
+                "game_id": NAME,
+                "player_id": NAME,
+                "tile_id": {"type": "string"},
+                "letter": {"type": "string", "pattern": "^[A-Za-z]$"},
+                "row": {"type": "integer"},
+                "col": {"type": "integer"},
+            },
+            "required": ["game_id", "player_id", "letter", "row", "col"],
+        },
+        "game_id",
+        {"game_id": "game", "player_id": "p1", "tile_id": "t1", "letter": "A", "row": 0, "col": 0},
+        {"game_id": "game", "player_id": "p1", "tile_id": "t1", "letter": "AB", "row": 0, "col": 0},
+    ),
+    "bananagrams": (
+        {
+            "type": "object",
+            "properties": {
+                "name": NAME,
+                "player_id": NAME,
+                "words": {
+                    "type": "array",
+                    "items": {"type": "string", "maxLength": 32},
+                    "maxItems": 144,
+                },
+                "board": {
+                    "anyOf": [
+                        {"type": "array", "items": {"type": "string"}, "maxItems": 144},
+                        {"type": "array", "items": PLACEMENT, "maxItems": 144},
+                    ]
+                },
+            },
+            "required": ["name", "player_id", "words"],
+        },
+        "name",
+        {
+            "name": "game",
+            "player_id": "p1",
+            "words": ["WORD"] * 5,
+            "board": [{"row": 0, "col": col, "letter": "A"} for col in range(21)],
+        },
+        {
+            "name": "game",
+            "player_id": "p1",
+            "words": ["WORD"] * 5,
+            "board": [{"row": 0, "col": col, "letter": "A"} for col in range(20)] + [{"row": 0}],
+        },
+    ),
+}
+
+
+def old_handler(schema: dict, key: str, games: dict, emit_error):
+    """A handler as they were written before, doing nothing once it has the game."""
+
+    def handler(data):
+        try:
+            validate(data, schema=dict(schema))
+        except ValidationError as e:
+            if key in data:
+                emit_error(data[key], str(e))
+        else:
+            try:
+                games[data[key]]
+            except KeyError:
+                emit_error(data[key], "Could not find the game.")
+
+    return handler
+
+
+def prebuilt_handler(schema: dict, key: str, games: dict, emit_error):
+    """The old handler with its validator built once."""
+    validator = Draft7Validator(schema)
+
+    def handler(data):
+        if not validator.is_valid(data):
+            if key in data:
+                emit_error(data[key], str(best_match(validator.iter_errors(data))))
+        else:
+            try:
+                games[data[key]]
+            except KeyError:
+                emit_error(data[key], "Could not find the game.")
+
+    return handler
+
+
+def new_handler(schema: dict, key: str, games: dict, emit_error):
+    events = GameEvents(MagicMock(), games, emit_error, MagicMock())
+    return events.on("event", schema, key)(lambda data, game_name, game: None)
+
+
+def per_event_us(handler, payload, number: int = NUMBER) -> float:
+    return timeit.timeit(lambda: handler(payload), number=number) / number * 1e6
+
+
+def main():
+    games = {"game": Game("game")}
+    emit_error = MagicMock()
+    print("=== Socket event overhead (µs per event) ===\n")
+    print(
+        f"{'event':<12} {'payload':<8} {'validate':>9} {'prebuilt':>9} {'compiled':>9} "
+        f"{'speedup':>8}"
+    )
+    for name, (schema, key, valid, invalid) in EVENTS.items():
+        old = old_handler(schema, key, games, emit_error)
+        prebuilt = prebuilt_handler(schema, key, games, emit_error)
+        new = new_handler(schema, key, games, emit_error)
+        for kind, data in (("valid", valid), ("invalid", invalid)):
+            old_us = per_event_us(old, data, SLOW_NUMBER)
+            prebuilt_us, new_us = per_event_us(prebuilt, data), per_event_us(new, data)
+            print(
+                f"{name:<12} {kind:<8} {old_us:>9.1f} {prebuilt_us:>9.1f} {new_us:>9.1f} "
+                f"{old_us / new_us:>7.0f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Memory saved by hibernating idle games, and how long they take to come back.
+
+Games are played to the middle of a game: every player has placed half of
+their tiles in a row on their board. Each game's memory is measured with
+tracemalloc and compared to its packed size on disk. Hibernating and resuming
+are timed against an SQLite file that already holds the other games. Run from
+the *backend* directory:
+
+    python -m benchmarks.bench_hibernate
+"""
+
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from game import Game
+from hibernate import Hibernator
+
+PLAYERS = (2, 4, 8)
+GAMES = 2000
+
+
+def make_game(name: str, players: int) -> Game:
+    game = Game(name)
+    for i in range(players):
+        game.join_game(f"player_{i}")
+    game.start_game()
+    for player in game.players:
+        for col, letter in enumerate(game.rack(player)[: len(game.players[player]) // 2]):
+            game.place_tile(player, 0, col, letter, f"{player}_{col}")
+    return game
+
+
+def game_bytes(players: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    games = [make_game(f"game_{i}", players) for i in range(100)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del games
+    return (after - before) / 100
+
+
+def percentiles_ms(samples: list[float]) -> tuple[float, float, float]:
+    cuts = statistics.quantiles(samples, n=100)
+    return cuts[49] * 1e3, cuts[98] * 1e3, max(samples) * 1e3
+
+
+def main():
+    print(f"=== Hibernation benchmark ({GAMES} games on disk per row) ===\n")
+    print(
+        f"{'players':>7} {'RAM B':>8} {'disk B':>7} "
+        f"{'save p50':>9} {'save p99':>9} {'resume p50':>11} {'resume p99':>11} {'max':>7}"
+    )
+    for players in PLAYERS:
+        with tempfile.TemporaryDirectory() as directory:
+            store = Hibernator(os.path.join(directory, "games.sqlite3"))
+            games = [make_game(f"game_{i}", players) for i in range(GAMES)]
+            packed = len(games[0].retire())
+            games[0] = make_game("game_0", players)
+
+            saves = []
+            for i, game in enumerate(games):
+                start = time.perf_counter()
+                store.save(f"game_{i}", game)
+                saves.append(time.perf_counter() - start)
+            del games
+
+            resumes = []
+            for i in range(GAMES):
+                start = time.perf_counter()
+                store.restore(f"game_{i}")
+                resumes.append(time.perf_counter() - start)
+
+            save_p50, save_p99, _ = percentiles_ms(saves)
+            resume_p50, resume_p99, resume_max = percentiles_ms(resumes)
+            print(
+                f"{players:>7} {game_bytes(players):>8.0f} {packed:>7} "
+                f"{save_p50:>8.2f}ms {save_p99:>8.2f}ms {resume_p50:>10.2f}ms "
+                f"{resume_p99:>10.2f}ms {resume_max:>6.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
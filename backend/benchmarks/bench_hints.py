@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Compare the vectorized rack search against a pure Python loop over the dictionary.
+
+Run from the *backend* directory:
+
+    python -m benchmarks.bench_hints
+"""
+
+import random
+import statistics
+import time
+from collections import Counter
+
+from game import WORDS
+from hints import get_engine
+from tiles import TILE_FREQUENCIES
+
+RACKS = 20
+
+
+def python_loop(words: list[str], rack: list[str]) -> list[str]:
+    counts = Counter(rack)
+    return [word for word in words if len(word) <= len(rack) and not Counter(word) - counts]
+
+
+def main():
+    bag = [letter for count, letters in TILE_FREQUENCIES.items() for letter in letters * count]
+    rng = random.Random(0)
+    racks = [rng.sample(bag, 21) for _ in range(RACKS)]
+
+    start = time.perf_counter()
+    engine = get_engine()
+    build_ms = (time.perf_counter() - start) * 1000
+    words = list(WORDS)
+
+    print(f"=== Rack search benchmark ({RACKS} racks of 21 tiles) ===\n")
+    print(f"engine build: {build_ms:.0f} ms, matrix {engine.counts.nbytes / 2**20:.1f} MiB\n")
+
+    def timed(fn) -> float:
+        times = []
+        for rack in racks:
+            start = time.perf_counter()
+            fn(rack)
+            times.append((time.perf_counter() - start) * 1000)
+        return statistics.median(times)
+
+    print(f"{'variant':<24} {'median ms':>10}")
+    print(f"{'python loop':<24} {timed(lambda rack: python_loop(words, rack)):>10.1f}")
+    print(f"{'vectorized, all words':<24} {timed(engine.words_for_rack):>10.1f}")
+    print(
+        f"{'vectorized, top 20':<24} {timed(lambda rack: engine.words_for_rack(rack, 20)):>10.1f}"
+    )
+
+    start = time.perf_counter()
+    engine.words_for_racks(racks[:8], limit=20)
+    print(f"{'8 racks, top 20':<24} {(time.perf_counter() - start) * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+What the hub watchdog sees, and what it costs, under eventlet.
+
+The hub is monkey patched as under gunicorn's eventlet worker. For a second
+each, the hub is left idle; kept busy by the green threads of 8 players in
+each of 8 games, placing and removing tiles; and kept busy while one handler
+blocks it by sleeping in the real ``time.sleep``, as a handler stuck on the
+disk would. The lag is the mean of
+the watchdog's beats and the upper bound of the histogram bucket holding the
+99th percentile. The cost of the watchdog is the drop in commands a second
+with it running. Run from the *backend* directory:
+
+    python -m benchmarks.bench_hubwatch
+"""
+
+import eventlet
+
+eventlet.monkey_patch()
+
+import logging  # noqa: E402
+import time  # noqa: E402
+
+from eventlet import patcher  # noqa: E402
+
+from game import Game  # noqa: E402
+from hubwatch import HubWatchdog  # noqa: E402
+from metrics import Registry  # noqa: E402
+
+SECONDS = 1.0
+GAMES = 8
+PLAYERS = 8
+BLOCK = 0.3
+
+# The sleep eventlet leaves alone, which blocks the whole hub
+_sleep = patcher.original("time").sleep
+
+
+def player(game: Game, player_id: str, until: float, done: list[int]):
+    letter = game.rack(player_id)[0]
+    while time.monotonic() < until:
+        game.place_tile(player_id, 0, 0, letter)
+        eventlet.sleep(0)
+        game.remove_tile(player_id, 0, 0)
+        eventlet.sleep(0)
+        done[0] += 2
+
+
+def run(games: int, block: bool) -> float:
+    """Play for SECONDS, returning the commands run a second."""
+    until = time.monotonic() + SECONDS
+    done = [0]
+    pool = eventlet.GreenPool()
+    for g in range(games):
+        game = Game(f"game_{g}")
+        for i in range(PLAYERS):
+            game.join_game(f"player_{i}")
+        game.start_game()
+        for player_id in game.players:
+            pool.spawn(player, game, player_id, until, done)
+    if block:
+        eventlet.sleep(SECONDS / 3)
+        _sleep(BLOCK)
+    eventlet.sleep(max(until - time.monotonic(), 0))
+    pool.waitall()
+    return done[0] / SECONDS
+
+
+def p99_ms(watchdog: HubWatchdog) -> float:
+    buckets = watchdog.lag.labels()
+    total, seen = sum(buckets.counts), 0
+    for bound, count in zip((*watchdog.lag.buckets, float("inf")), buckets.counts):
+        seen += count
+        if seen >= 0.99 * total:
+            return bound * 1000
+    return float("inf")
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    print("=== Eventlet hub lag seen by the watchdog (50 ms beats) ===\n")
+    print(f"{'load':<22} {'beats':>6} {'mean ms':>8} {'p99 <= ms':>10} {'stalls':>7}")
+    busy = f"{GAMES * PLAYERS} players"
+    for name, games, block in (
+        ("idle", 0, False),
+        (busy, GAMES, False),
+        (f"{busy}, blocked", GAMES, True),
+    ):
+        watchdog = HubWatchdog(Registry())
+        watchdog.start()
+        run(games, block)
+        eventlet.sleep(0.1)
+        watchdog.stop()
+        buckets = watchdog.lag.labels()
+        beats = sum(buckets.counts)
+        print(
+            f"{name:<22} {beats:>6} {buckets.sum / beats * 1000:>8.2f} {p99_ms(watchdog):>10.1f} "
+            f"{watchdog.stalls.labels().value:>7.0f}"
+        )
+
+    plain = run(GAMES, False)
+    watchdog = HubWatchdog(Registry())
+    watchdog.start()
+    watched = run(GAMES, False)
+    watchdog.stop()
+    print(f"\ncommands a second: {plain:,.0f} without the watchdog, {watched:,.0f} with it")
+
+
+if __name__ == "__main__":
+    main()
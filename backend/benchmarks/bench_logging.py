@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Time a socket handler spends logging, before and after the queued pipeline.
+
+Before, the app logger wrote each record straight to a file and to stdout,
+flushing both, and a ``GameError`` was logged through the root logger with its
+traceback. Now records go through ``logqueue.setup``: the handler only queues
+them, render records are sampled one in a hundred and a ``GameError`` is
+logged without its traceback. Each row is the time per call in the calling
+thread, as p50 and p99 of single calls, with stdout sent to /dev/null. Run
+from the *backend* directory:
+
+    python -m benchmarks.bench_logging
+"""
+
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+
+import logqueue
+from game import GameError
+
+CALLS = 20000
+
+
+def old_logger(path: str, stdout) -> logging.Logger:
+    logger = logging.getLogger("bench_old")
+    logger.propagate = False
+    logger.setLevel("DEBUG")
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter(logqueue.TEXT_FORMAT))
+    logger.addHandler(handler)
+    logger.addHandler(logging.StreamHandler(stdout))
+    return logger
+
+
+def percentiles_us(call: Callable[[int], None]) -> tuple[float, float]:
+    samples = []
+    for i in range(CALLS):
+        start = time.perf_counter()
+        call(i)
+        samples.append(time.perf_counter() - start)
+    cuts = statistics.quantiles(samples, n=100)
+    return cuts[49] * 1e6, cuts[98] * 1e6
+
+
+def game_error() -> GameError:
+    try:
+        raise GameError("Not enough tiles to swap.")
+    except GameError as e:
+        return e
+
+
+def main():
+    error = game_error()
+    with tempfile.TemporaryDirectory() as directory, open(os.devnull, "w") as devnull:
+        old = old_logger(os.path.join(directory, "old.log"), devnull)
+        old_calls = {
+            "connect": lambda i: old.info("[session] has connected."),
+            "render": lambda i: old.info(f"[session] has rendered their game with message {i}"),
+            "GameError": lambda i: old.error("Exception occurred", exc_info=error),
+        }
+
+        new = logging.getLogger("bench_new")
+        new.propagate = False
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            listener = logqueue.setup(
+                [new],
+                os.path.join(directory, "new.log"),
+                sample={"connect": 10, "render": 100},
+                rate=1e9,
+                burst=CALLS,
+            )
+        finally:
+            sys.stdout = stdout
+        new_calls = {
+            "connect": lambda i: new.info("[session] has connected.", extra={"event": "connect"}),
+            "render": lambda i: new.debug(
+                "[session] has rendered their game with message %s", i, extra={"event": "render"}
+            ),
+            "render (DEBUG)": lambda i: new.debug(
+                "[session] has rendered their game with message %s", i, extra={"event": "render"}
+            ),
+            "GameError": lambda i: new.warning(
+                "%s failed for the game named %s: %s",
+                "swap",
+                "game",
+                error,
+                extra={"event": "swap"},
+            ),
+        }
+
+        print(f"=== Logging time per call in the handler (µs, {CALLS} calls) ===\n")
+        print(f"{'record':<15} {'old p50':>8} {'old p99':>8} {'new p50':>8} {'new p99':>8}")
+        for name, call in new_calls.items():
+            new.setLevel("DEBUG" if name.endswith("(DEBUG)") else "INFO")
+            old_p50, old_p99 = percentiles_us(old_calls[name.split()[0]])
+            new_p50, new_p99 = percentiles_us(call)
+            print(f"{name:<15} {old_p50:>8.1f} {old_p99:>8.1f} {new_p50:>8.1f} {new_p99:>8.1f}")
+        listener.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Throughput of game commands run through the mailbox against the old lock.
+
+Green threads, as under gunicorn's eventlet worker, each place a tile on and
+take it off their player's board in a loop. Every game has 8 players, each
+with their own green thread, and the games are played side by side. The old
+variant calls the same methods inside ``threading.Lock.acquire(timeout=2)``.
+
+In the "slow" rows placing a tile yields to the hub once while it holds the
+game, as a command that logs or does other I/O would. Run from the *backend*
+directory:
+
+    python -m benchmarks.bench_mailbox
+"""
+
+import eventlet
+
+eventlet.monkey_patch()
+
+import threading  # noqa: E402
+import time  # noqa: E402
+
+from game import Game, command  # noqa: E402
+
+GAMES = (1, 4, 16)
+PLAYERS = 8
+ROUNDS = 200
+
+# The methods under test, without the mailbox
+PLACE = Game.place_tile.__wrapped__
+REMOVE = Game.remove_tile.__wrapped__
+
+
+def slow_place(game: Game, *args):
+    eventlet.sleep(0)
+    return PLACE(game, *args)
+
+
+class SlowGame(Game):
+    place_tile = command(slow_place)
+
+
+def locked(place):
+    def play_round(game: Game, lock: threading.Lock, player_id: str, letter: str):
+        for method, args in ((place, (0, 0, letter)), (REMOVE, (0, 0))):
+            if not lock.acquire(timeout=2):
+                raise RuntimeError("Could not acquire game lock - operation timed out")
+            try:
+                method(game, player_id, *args)
+            finally:
+                lock.release()
+            # Let the other players in, as a handler does between events
+            eventlet.sleep(0)
+
+    return play_round
+
+
+def mailbox_round(game: Game, lock: threading.Lock, player_id: str, letter: str):
+    game.place_tile(player_id, 0, 0, letter)
+    eventlet.sleep(0)
+    game.remove_tile(player_id, 0, 0)
+    eventlet.sleep(0)
+
+
+def player(play_round, game: Game, lock: threading.Lock, player_id: str):
+    letter = game.rack(player_id)[0]
+    for _ in range(ROUNDS):
+        play_round(game, lock, player_id, letter)
+
+
+def commands_per_second(play_round, games: int, game_class: type[Game] = Game) -> float:
+    pool = eventlet.GreenPool()
+    started = []
+    for g in range(games):
+        game = game_class(f"game_{g}")
+        for p in range(PLAYERS):
+            game.join_game(f"player_{p}")
+        game.start_game()
+        started.append((game, threading.Lock()))
+
+    start = time.perf_counter()
+    for game, lock in started:
+        for player_id in game.players:
+            pool.spawn(player, play_round, game, lock, player_id)
+    pool.waitall()
+    seconds = time.perf_counter() - start
+    return games * PLAYERS * ROUNDS * 2 / seconds
+
+
+def main():
+    print(f"=== Mailbox benchmark ({PLAYERS} green threads per game, commands/s) ===\n")
+    print(f"{'holder':<6} {'games':>6} {'lock':>10} {'mailbox':>10} {'speedup':>8}")
+    for name, place, game_class in (("fast", PLACE, Game), ("slow", slow_place, SlowGame)):
+        for games in GAMES:
+            old = commands_per_second(locked(place), games)
+            new = commands_per_second(mailbox_round, games, game_class)
+            print(f"{name:<6} {games:>6} {old:>10.0f} {new:>10.0f} {new / old:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Time pattern queries against the full word list with racks dealt from a real bag.
+
+Run from the *backend* directory:
+
+    python -m benchmarks.bench_patterns
+"""
+
+import random
+import statistics
+import time
+
+from game import WORDS
+from tiles import TILE_FREQUENCIES
+
+PATTERNS = ["??A?E", "Q??", "?A?", "E?????", "S???????", "??R??", "???E???", "?????"]
+RACKS = 50
+
+
+def main():
+    bag = [letter for count, letters in TILE_FREQUENCIES.items() for letter in letters * count]
+    rng = random.Random(0)
+    racks = [rng.sample(bag, 21) for _ in range(RACKS)]
+    WORDS.get()
+
+    print(f"=== Pattern query benchmark ({RACKS} racks of 21 tiles) ===\n")
+    print(f"{'pattern':<10} {'words':>6} {'median ms':>10} {'max ms':>8}")
+    for pattern in PATTERNS:
+        times = []
+        found = []
+        for rack in racks:
+            start = time.perf_counter()
+            found.append(len(WORDS.match(pattern, rack)))
+            times.append((time.perf_counter() - start) * 1000)
+        print(
+            f"{pattern:<10} {statistics.median(found):>6.0f} "
+            f"{statistics.median(times):>10.2f} {max(times):>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
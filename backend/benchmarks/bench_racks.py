@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Memory and per-operation cost of the letter count racks against lists of tiles.
+
+Racks are filled as in the late game of an 8 player game, where each player
+holds about 18 tiles, and of a 2 player game, where each holds about 70.
+Run from the *backend* directory:
+
+    python -m benchmarks.bench_racks
+"""
+
+import random
+import timeit
+import tracemalloc
+
+from tiles import Rack, TileBag
+
+GAMES = 1000
+NUMBER = 100000
+
+# (players, tiles in each rack)
+GAME_SIZES = ((8, 18), (2, 70))
+
+
+def racks_bytes(make, players: int, tiles: int) -> float:
+    """Bytes allocated per game for the racks of every player."""
+    rng = random.Random(0)
+    hands = [TileBag.from_frequencies(rng=rng).deal(players, tiles) for _ in range(GAMES)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    games = [[make(hand) for hand in game] for game in hands]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del games
+    return (after - before) / GAMES
+
+
+def per_op_ns(rack, letter: str, statement: str) -> float:
+    seconds = timeit.timeit(statement, globals={"rack": rack, "letter": letter}, number=NUMBER)
+    return seconds / NUMBER * 1e9
+
+
+def main():
+    print(f"=== Rack benchmark ({GAMES} games, late game racks) ===\n")
+    operations = {
+        "letter in rack": "letter in rack",
+        "rack.count(letter)": "rack.count(letter)",
+        "remove + append": "rack.remove(letter); rack.append(letter)",
+    }
+    print(f"{'players x tiles':<16} {'measure':<22} {'list':>9} {'Rack':>9}")
+    for players, tiles in GAME_SIZES:
+        size = f"{players} x {tiles}"
+        old = racks_bytes(list, players, tiles)
+        new = racks_bytes(Rack, players, tiles)
+        print(f"{size:<16} {'bytes per game':<22} {old:>9.0f} {new:>9.0f}")
+
+        hand = TileBag.from_frequencies(rng=random.Random(0)).draw(tiles)
+        # The last letter in the list, the worst case of a linear scan
+        letter = hand[-1]
+        for name, statement in operations.items():
+            old = per_op_ns(list(hand), letter, statement)
+            new = per_op_ns(Rack(hand), letter, statement)
+            print(f"{size:<16} {name + ' ns':<22} {old:>9.0f} {new:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+How long the server takes to rebuild its games from the journal after a restart.
+
+Each game has four players, who each peel a few times and place a few tiles,
+about twenty journal entries per game. Recovery is timed from the journal
+alone, and from a snapshot taken after the games were played plus a tail of
+one more peel per game. The cost of journaling a command is measured as the
+time of a peel with and without a journal. Run from the *backend* directory:
+
+    python -m benchmarks.bench_recovery
+"""
+
+import os
+import tempfile
+import time
+import timeit
+import zlib
+
+from game import Game
+from journal import Journal
+from tiles import LETTERS
+
+SIZES = (100, 1000, 5000)
+PEELS = 5
+PLACED = 3
+
+
+def play(journal: Journal | None, name: str) -> Game:
+    game = Game(name, journal=journal, seed=zlib.crc32(name.encode()))
+    for i in range(4):
+        game.join_game(f"player_{i}")
+    game.start_game()
+    for _ in range(PEELS):
+        game.peel(test=True)
+    for player in game.players:
+        for col, letter in enumerate(game.rack(player)[:PLACED]):
+            game.place_tile(player, 0, col, letter, f"{player}_{col}")
+    return game
+
+
+def size_kb(directory: str, suffix: str) -> float:
+    return (
+        sum(
+            os.path.getsize(os.path.join(directory, name))
+            for name in os.listdir(directory)
+            if name.endswith(suffix)
+        )
+        / 1024
+    )
+
+
+def recover_ms(directory: str) -> float:
+    start = time.perf_counter()
+    Journal(directory).recover()
+    return (time.perf_counter() - start) * 1e3
+
+
+def peel_us(journal: Journal | None) -> float:
+    total, peels = 0.0, 0
+    for i in range(20):
+        game = play(journal, f"peel_{i}")
+        # Enough tiles to peel a hundred times more
+        game.tiles.put(LETTERS * 16)
+        game.tiles_remaining = len(game.tiles)
+        total += timeit.timeit(lambda game=game: game.peel(test=True), number=100)
+        peels += 100
+    return total / peels * 1e6
+
+
+def main():
+    print("=== Journal recovery benchmark ===\n")
+    print(
+        f"{'games':>6} {'entries':>8} {'journal KB':>11} {'replay ms':>10} "
+        f"{'snapshot KB':>12} {'snap+tail ms':>13}"
+    )
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            journal = Journal(directory)
+            games = [play(journal, f"game_{i}") for i in range(size)]
+            journal.flush()
+            entries, journal_kb = journal.entries, size_kb(directory, ".log")
+            replay_ms = recover_ms(directory)
+
+            journal.snapshot(lambda games=games: games)
+            for game in games:
+                game.peel(test=True)
+            journal.close()
+            snapshot_kb = size_kb(directory, ".msgpack")
+            snapshot_ms = recover_ms(directory)
+        print(
+            f"{size:>6} {entries:>8} {journal_kb:>11.0f} {replay_ms:>10.1f} "
+            f"{snapshot_kb:>12.0f} {snapshot_ms:>13.1f}"
+        )
+
+    with tempfile.TemporaryDirectory() as directory:
+        journal = Journal(directory)
+        plain, journaled = peel_us(None), peel_us(journal)
+        journal.close()
+    print(f"\npeel: {plain:.1f} us without a journal, {journaled:.1f} us journaled")
+
+
+if __name__ == "__main__":
+    main()
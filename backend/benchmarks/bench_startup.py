@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Measure the cost of ``import game`` and of the first word lookup.
+
+The "eager" variant reproduces the old behaviour of building a ``set`` of the
+word list at import time, and "stdlib" only imports the standard library modules
+the game needs, the floor under the cost of importing it. Every sample runs in a
+fresh interpreter, with the bytecode compiled once beforehand as in the Docker
+image (``PYTHONDONTWRITEBYTECODE`` would otherwise make each sample compile the
+game from source). Run from the *backend* directory:
+
+    python -m benchmarks.bench_startup
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RUNS = 15
+
+EAGER = """
+import time
+start = time.perf_counter()
+import game
+with open("words/words.txt") as file:
+    game.WORDS = {x.strip() for x in file.readlines()}
+imported = time.perf_counter()
+"WINNING" in game.WORDS
+done = time.perf_counter()
+"""
+
+LAZY = """
+import time
+start = time.perf_counter()
+import game
+imported = time.perf_counter()
+"WINNING" in game.WORDS
+done = time.perf_counter()
+"""
+
+STDLIB = """
+import time
+start = time.perf_counter()
+import collections, dataclasses, datetime, enum, functools, logging, mmap, random, struct, typing
+imported = time.perf_counter()
+done = time.perf_counter()
+"""
+
+REPORT = """
+import json
+print(json.dumps({"import_ms": (imported - start) * 1000, "lookup_ms": (done - imported) * 1000}))
+"""
+
+
+def sample(code: str, env: dict[str, str]) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", code + REPORT], capture_output=True, check=True, text=True, env=env
+    )
+    return json.loads(out.stdout)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as cache:
+        env = {**os.environ, "PYTHONPYCACHEPREFIX": cache}
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        # Make sure the packed word list exists and the bytecode is cached, so
+        # neither building them is timed
+        sample(LAZY, env)
+        report(env)
+
+
+def report(env: dict[str, str]):
+    print(f"=== Startup benchmark (median of {RUNS} fresh interpreters) ===\n")
+    print(f"{'variant':<8} {'import ms':>10} {'first lookup ms':>16}")
+    for name, code in (("stdlib", STDLIB), ("eager", EAGER), ("lazy", LAZY)):
+        runs = [sample(code, env) for _ in range(RUNS)]
+        import_ms = statistics.median(r["import_ms"] for r in runs)
+        lookup_ms = statistics.median(r["lookup_ms"] for r in runs)
+        print(f"{name:<8} {import_ms:>10.2f} {lookup_ms:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Per-operation cost of the tile bag against the old shuffled list of tiles.
+
+Each operation starts from a full bag: filling a new bag, a single peel draw,
+a swap (draw three tiles and return one) and dealing the opening hands of an 8
+player game. Bags of several full sets of tiles show how each variant scales.
+The bag is timed drawing with ``random.Random`` and with the ``SeededRandom``
+games use. Run from the *backend* directory:
+
+    python -m benchmarks.bench_tiles
+"""
+
+import random
+import timeit
+
+from tiles import SeededRandom, TileBag
+
+BAGS = (1, 4, 16)
+NUMBER = 2000
+
+
+class ListBag:
+    """The old tile pile: a shuffled list, popped from the end."""
+
+    def __init__(self, bags: int):
+        self.tiles = list(TileBag.from_frequencies(bags))
+        random.shuffle(self.tiles)
+
+    def draw(self, k: int = 1) -> list[str]:
+        return [self.tiles.pop() for _ in range(k)]
+
+    def deal(self, hands: int, k: int) -> list[list[str]]:
+        return [[self.tiles.pop() for _ in range(k)] for _ in range(hands)]
+
+    def put(self, letters: str):
+        self.tiles.extend(letters)
+        random.shuffle(self.tiles)
+
+
+def swap(bag):
+    bag.draw(3)
+    bag.put("E")
+
+
+OPERATIONS = {
+    "new bag": None,
+    "peel": lambda bag: bag.draw(1),
+    "swap": swap,
+    "deal 8x11": lambda bag: bag.deal(8, 11),
+}
+
+
+def per_op_us(make, operation) -> float:
+    """Microseconds per operation, timed on a fresh bag each time."""
+    if operation is None:
+        return timeit.timeit(make, number=NUMBER) / NUMBER * 1e6
+    bags = [make() for _ in range(NUMBER)]
+    it = iter(bags)
+    seconds = timeit.timeit(lambda: operation(next(it)), number=NUMBER)
+    return seconds / NUMBER * 1e6
+
+
+def main():
+    print(f"=== Tile bag benchmark (µs per operation, {NUMBER} fresh bags) ===\n")
+    print(f"{'tiles':>6} {'operation':<10} {'list':>9} {'bag':>9} {'speedup':>8} {'seeded':>9}")
+    for bags in BAGS:
+        for name, operation in OPERATIONS.items():
+            old = per_op_us(lambda bags=bags: ListBag(bags), operation)
+            new = per_op_us(lambda bags=bags: TileBag.from_frequencies(bags), operation)
+            seeded = per_op_us(
+                lambda bags=bags: TileBag.from_frequencies(bags, SeededRandom(0)), operation
+            )
+            print(
+                f"{144 * bags:>6} {name:<10} {old:>9.2f} {new:>9.2f} {old / new:>7.1f}x "
+                f"{seeded:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Encode time and payload size of the game state in each wire format.
+
+- nested json: the old ``render_game`` message, the whole game encoded as a
+  JSON string inside the ``payload`` field of another JSON message.
+- json: the ``game_state`` event, the shared state as a single JSON object.
+- msgpack: the ``game_state`` event for clients that negotiated MessagePack.
+
+Games are measured just after the opening deal and after a few peels. Each
+encode starts from the game object, as on a cache miss. Run from the
+*backend* directory:
+
+    python -m benchmarks.bench_wire
+"""
+
+import timeit
+
+import msgpack
+import simplejson
+
+from game import Game
+
+PLAYERS = (2, 4, 8)
+PEELS = 5
+NUMBER = 5000
+
+
+def nested_json(game: Game) -> bytes:
+    payload = simplejson.dumps(game, for_json=True)
+    message = {"status_code": 200, "message": "Game loaded.", "payload": payload}
+    return simplejson.dumps(message).encode()
+
+
+def flat_json(game: Game) -> bytes:
+    state = {**game.shared_state(), "message": "Game loaded."}
+    return simplejson.dumps(state, separators=(",", ":")).encode()
+
+
+def packed(game: Game) -> bytes:
+    return msgpack.packb({**game.shared_state(), "message": "Game loaded."})
+
+
+FORMATS = {"nested json": nested_json, "json": flat_json, "msgpack": packed}
+
+
+def make_game(players: int, peels: int) -> Game:
+    game = Game("bench", seed=0)
+    for i in range(players):
+        game.join_game(f"player_{i}")
+    game.start_game()
+    for _ in range(peels):
+        game.peel(test=True)
+    return game
+
+
+def main():
+    print(f"=== Wire format benchmark ({NUMBER} encodes per row) ===\n")
+    print(f"{'players':>7} {'peels':>5} {'format':<12} {'bytes':>7} {'µs':>7}")
+    for players in PLAYERS:
+        for peels in (0, PEELS):
+            game = make_game(players, peels)
+            for name, encode in FORMATS.items():
+                size = len(encode(game))
+                us = timeit.timeit(lambda e=encode, g=game: e(g), number=NUMBER) / NUMBER * 1e6
+                print(f"{players:>7} {peels:>5} {name:<12} {size:>7} {us:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+"""Server side model of a player's board.
+
+The board is sparse, a dictionary of the occupied cells, and is kept up to
+date one tile at a time:
+
+- Only the horizontal and vertical runs through the changed cell and its
+  neighbours are re-extracted and re-checked, so an update costs
+  O(length of the touching words) no matter how big the board is.
+- Connectivity is tracked by labelling every occupied cell with its
+  component. Placing a tile merges the components around it, relabelling the
+  smaller ones. Removing a tile can split its component: a search runs from
+  each of its neighbours in turn, a step at a time, and stops once all but one
+  are known to have met or run out. Only the pieces that split off are walked
+  in full and relabelled, so moving a tile around a big board never walks
+  the board.
+
+Checking a whole board (e.g. when a player calls bananagrams) is then a matter
+of reading a few counters, see ``Board.verify``.
+"""
+
+import itertools
+from collections import Counter, deque
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+
+Cell = tuple[int, int]
+
+# The direction of horizontal and vertical runs
+ACROSS = (0, 1)
+DOWN = (1, 0)
+
+
+class BoardError(Exception):
+    pass
+
+
+@dataclass
+class Verdict:
+    """The outcome of checking a board against a player's rack.
+
+    Attributes:
+        valid (bool): Whether the board is a winning board.
+        missing (List[str]): Tiles in the rack that are not on the board.
+        extra (List[str]): Tiles on the board that are not in the rack.
+        components (int): The number of separate groups of tiles on the board.
+        words (List[str]): Every run of two or more tiles.
+        invalid_words (List[str]): The runs that are not words.
+    """
+
+    valid: bool = False
+    missing: list[str] = field(default_factory=list)
+    extra: list[str] = field(default_factory=list)
+    components: int = 0
+    words: list[str] = field(default_factory=list)
+    invalid_words: list[str] = field(default_factory=list)
+
+    def __json__(self) -> dict:
+        return {
+            "valid": self.valid,
+            "missing": self.missing,
+            "extra": self.extra,
+            "components": self.components,
+            "words": self.words,
+            "invalid_words": self.invalid_words,
+        }
+
+    for_json = __json__
+
+
+def grid_placements(rows: Iterable[str]) -> list[tuple[int, int, str]]:
+    """Read a board drawn as rows of text, with spaces or dots for empty cells.
+
+    Args:
+        rows (Iterable[str]): The rows of the board, top first.
+
+    Returns:
+        List[Tuple[int, int, str]]: The (row, column, letter) of every tile.
+    """
+    return [
+        (row, col, letter)
+        for row, line in enumerate(rows)
+        for col, letter in enumerate(line)
+        if letter not in " ."
+    ]
+
+
+class Board:
+    """A single player's board.
+
+    Attributes:
+        cells (Dict[Tuple[int, int], str]): The letter in every occupied cell.
+        tile_ids (Dict[Tuple[int, int], str]): The client's ID of the tile in a cell.
+        words (Dict[Tuple[Tuple[int, int], Tuple[int, int]], str]): Every run of two
+            or more tiles, keyed by its first cell and direction.
+        invalid (Set[Tuple[Tuple[int, int], Tuple[int, int]]]): Keys of the runs that
+            are not words.
+        letters (Counter): How many of each letter is on the board.
+    """
+
+    def __init__(self, is_word: Callable[[str], bool]):
+        self.is_word = is_word
+        self.cells: dict[Cell, str] = {}
+        self.tile_ids: dict[Cell, str] = {}
+        self.words: dict[tuple[Cell, Cell], str] = {}
+        self.invalid: set[tuple[Cell, Cell]] = set()
+        self.letters: Counter = Counter()
+
+        # The component of every occupied cell, and the cells of each component
+        self._label: dict[Cell, int] = {}
+        self._members: dict[int, set[Cell]] = {}
+        self._labels = itertools.count()
+
+    @classmethod
+    def from_placements(
+        cls, placements: Iterable[tuple[int, int, str]], is_word: Callable[[str], bool]
+    ) -> "Board":
+        """Build a board from the (row, column, letter) of each of its tiles.
+
+        Raises:
+            BoardError: Two tiles share a cell, or a tile is not a single letter.
+        """
+        board = cls(is_word)
+        for row, col, letter in placements:
+            if len(letter) != 1 or not "A" <= letter.upper() <= "Z":
+                raise BoardError(f"Invalid tile {letter!r} at ({row}, {col}).")
+            if (row, col) in board.cells:
+                raise BoardError(f"Cell ({row}, {col}) is already occupied.")
+            board.cells[(row, col)] = letter.upper()
+        board.letters.update(board.cells.values())
+
+        # Read every run once, from its first cell, rather than tile by tile
+        for cell in board.cells:
+            for step in (ACROSS, DOWN):
+                if (cell[0] - step[0], cell[1] - step[1]) not in board.cells:
+                    board._learn_run((cell, step))
+        board._label_all()
+        return board
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __iter__(self) -> Iterator[tuple[int, int, str]]:
+        for (row, col), letter in self.cells.items():
+            yield row, col, letter
+
+    # Runs
+
+    def _start(self, cell: Cell, step: Cell) -> Cell:
+        (row, col), (dr, dc) = cell, step
+        while (row - dr, col - dc) in self.cells:
+            row, col = row - dr, col - dc
+        return row, col
+
+    def _word_at(self, start: Cell, step: Cell) -> str:
+        (row, col), (dr, dc) = start, step
+        letters = []
+        while (row, col) in self.cells:
+            letters.append(self.cells[(row, col)])
+            row, col = row + dr, col + dc
+        return "".join(letters)
+
+    def _touching(self, cell: Cell) -> set[tuple[Cell, Cell]]:
+        """Keys of the runs through a cell or its four neighbours."""
+        keys = set()
+        row, col = cell
+        for step in (ACROSS, DOWN):
+            dr, dc = step
+            for neighbour in ((row - dr, col - dc), cell, (row + dr, col + dc)):
+                if neighbour in self.cells:
+                    keys.add((self._start(neighbour, step), step))
+        return keys
+
+    def _forget_runs(self, cell: Cell):
+        for key in self._touching(cell):
+            self.words.pop(key, None)
+            self.invalid.discard(key)
+
+    def _learn_run(self, key: tuple[Cell, Cell]):
+        word = self._word_at(*key)
+        if len(word) < 2:
+            return
+        self.words[key] = word
+        if not self.is_word(word):
+            self.invalid.add(key)
+
+    def _learn_runs(self, cell: Cell):
+        for key in self._touching(cell):
+            self._learn_run(key)
+
+    # Connectivity
+
+    def _occupied_neighbours(self, cell: Cell) -> list[Cell]:
+        row, col = cell
+        return [
+            neighbour
+            for neighbour in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1))
+            if neighbour in self.cells
+        ]
+
+    def _relabel(self, cells: Iterable[Cell], label: int):
+        members = self._members.setdefault(label, set())
+        for cell in cells:
+            self._label[cell] = label
+            members.add(cell)
+
+    def _label_all(self):
+        """Label every cell from scratch."""
+        self._label.clear()
+        self._members.clear()
+        for cell in self.cells:
+            if cell in self._label:
+                continue
+            label = next(self._labels)
+            self._relabel([cell], label)
+            stack = [cell]
+            while stack:
+                for neighbour in self._occupied_neighbours(stack.pop()):
+                    if neighbour not in self._label:
+                        self._relabel([neighbour], label)
+                        stack.append(neighbour)
+
+    def _join(self, cell: Cell):
+        """Label a placed tile, merging the components it touches."""
+        labels = {self._label[neighbour] for neighbour in self._occupied_neighbours(cell)}
+        if not labels:
+            self._relabel([cell], next(self._labels))
+            return
+        # Keep the biggest component's label, so a cell is only relabelled when
+        # the component it is in at least doubles
+        largest = max(labels, key=lambda label: len(self._members[label]))
+        for label in labels - {largest}:
+            self._relabel(self._members.pop(label), largest)
+        self._relabel([cell], largest)
+
+    def _split(self, cell: Cell):
+        """Take a removed tile's label, relabelling the pieces its component splits into.
+
+        A breadth first search starts from each neighbour of the tile and they
+        take a step each in turn. Searches that meet are in the same piece, and
+        a piece whose searches run out of cells has split off and is relabelled.
+        Once a single piece is left searching it keeps the label, unwalked.
+        """
+        label = self._label.pop(cell)
+        members = self._members[label]
+        members.discard(cell)
+        if not members:
+            del self._members[label]
+            return
+        starts = self._occupied_neighbours(cell)
+        if len(starts) < 2:
+            return
+
+        searches = range(len(starts))
+        # Which search is in the same piece as which, merged when they meet
+        group = list(searches)
+        owner = {start: i for i, start in enumerate(starts)}
+        visited = [[start] for start in starts]
+        frontiers = [deque([start]) for start in starts]
+
+        def root(i: int) -> int:
+            while group[i] != i:
+                i = group[i]
+            return i
+
+        pieces = len(starts)
+        settled: set[int] = set()
+        while pieces > 1:
+            for i in searches:
+                if not frontiers[i]:
+                    continue
+                for neighbour in self._occupied_neighbours(frontiers[i].popleft()):
+                    j = owner.get(neighbour)
+                    if j is None:
+                        owner[neighbour] = i
+                        visited[i].append(neighbour)
+                        frontiers[i].append(neighbour)
+                    elif root(i) != root(j):
+                        group[root(i)] = root(j)
+                        pieces -= 1
+            for piece in {root(i) for i in searches} - settled:
+                if pieces == 1:
+                    break
+                piece_searches = [i for i in searches if root(i) == piece]
+                if any(frontiers[i] for i in piece_searches):
+                    continue
+                cells = [cell for i in piece_searches for cell in visited[i]]
+                members.difference_update(cells)
+                self._relabel(cells, next(self._labels))
+                settled.add(piece)
+                pieces -= 1
+
+    @property
+    def components(self) -> int:
+        """The number of separate groups of tiles on the board."""
+        return len(self._members)
+
+    @property
+    def connected(self) -> bool:
+        return self.components <= 1
+
+    # Updates
+
+    def place(self, row: int, col: int, letter: str, tile_id: str | None = None):
+        """Place a tile in an empty cell.
+
+        Args:
+            row (int): The row of the cell.
+            col (int): The column of the cell.
+            letter (str): The letter of the tile.
+            tile_id (str, optional): The client's ID of the tile.
+
+        Raises:
+            BoardError: The cell is already occupied.
+        """
+        cell = (row, col)
+        if cell in self.cells:
+            raise BoardError(f"Cell ({row}, {col}) is already occupied.")
+        self._forget_runs(cell)
+        self.cells[cell] = letter
+        if tile_id is not None:
+            self.tile_ids[cell] = tile_id
+        self.letters[letter] += 1
+        self._learn_runs(cell)
+        self._join(cell)
+
+    def remove(self, row: int, col: int) -> str:
+        """Take the tile out of a cell.
+
+        Args:
+            row (int): The row of the cell.
+            col (int): The column of the cell.
+
+        Raises:
+            BoardError: The cell is empty.
+
+        Returns:
+            str: The letter of the removed tile.
+        """
+        cell = (row, col)
+        if cell not in self.cells:
+            raise BoardError(f"Cell ({row}, {col}) is empty.")
+        self._forget_runs(cell)
+        letter = self.cells.pop(cell)
+        self.tile_ids.pop(cell, None)
+        self.letters[letter] -= 1
+        self._learn_runs(cell)
+        self._split(cell)
+        return letter
+
+    def move(self, moves: list[tuple[int, int, int, int]]):
+        """Move tiles to new cells, all at once.
+
+        Every tile is lifted before any is put down, so tiles may move into
+        cells that other moving tiles are leaving.
+
+        Args:
+            moves (List[Tuple[int, int, int, int]]): (from row, from column, to row,
+                to column) of each tile.
+
+        Raises:
+            BoardError: A source cell is empty or a target cell is occupied. The
+                board is left unchanged.
+        """
+        sources = [(from_row, from_col) for from_row, from_col, _, _ in moves]
+        targets = [(to_row, to_col) for _, _, to_row, to_col in moves]
+        if len(set(sources)) != len(sources) or len(set(targets)) != len(targets):
+            raise BoardError("Each tile can only be moved once, to a distinct cell.")
+        for row, col in sources:
+            if (row, col) not in self.cells:
+                raise BoardError(f"Cell ({row}, {col}) is empty.")
+        leaving = set(sources)
+        for row, col in targets:
+            if (row, col) in self.cells and (row, col) not in leaving:
+                raise BoardError(f"Cell ({row}, {col}) is already occupied.")
+
+        lifted = []
+        for row, col in sources:
+            tile_id = self.tile_ids.get((row, col))
+            lifted.append((self.remove(row, col), tile_id))
+        for (row, col), (letter, tile_id) in zip(targets, lifted, strict=True):
+            self.place(row, col, letter, tile_id)
+
+    def clear(self):
+        """Take every tile off the board."""
+        self.cells.clear()
+        self.tile_ids.clear()
+        self.words.clear()
+        self.invalid.clear()
+        self.letters.clear()
+        self._label.clear()
+        self._members.clear()
+
+    # State
+
+    def invalid_words(self) -> list[str]:
+        """The runs on the board that are not words."""
+        return sorted(self.words[key] for key in self.invalid)
+
+    def complete(self, tiles: int) -> bool:
+        """Whether a rack of ``tiles`` tiles is all on the board, in one valid grid.
+
+        Args:
+            tiles (int): The number of tiles in the player's rack.
+        """
+        return len(self.cells) == tiles and not self.invalid and self.connected
+
+    def verify(self, rack: Iterable[str]) -> Verdict:
+        """Check that the board is a winning board for a rack.
+
+        The board wins when it uses exactly the tiles in the rack, is a single
+        connected group and every run on it is a word. The tile check is a
+        single pass over the rack against the board's letter counts.
+
+        Args:
+            rack (Iterable[str]): The player's tiles.
+
+        Returns:
+            Verdict: The outcome of each check.
+        """
+        counts = Counter(self.letters)
+        missing = []
+        for letter in rack:
+            if counts[letter] > 0:
+                counts[letter] -= 1
+            else:
+                missing.append(letter)
+        extra = sorted(counts.elements())
+
+        components = self.components
+        invalid_words = self.invalid_words()
+        return Verdict(
+            valid=not missing and not extra and components == 1 and not invalid_words,
+            missing=sorted(missing),
+            extra=extra,
+            components=components,
+            words=sorted(self.words.values()),
+            invalid_words=invalid_words,
+        )
+
+    def summary(self, tiles: int) -> dict:
+        """The state of the board, as sent to the player.
+
+        Args:
+            tiles (int): The number of tiles in the player's rack.
+        """
+        return {
+            "tiles": len(self.cells),
+            "words": sorted(self.words.values()),
+            "invalid_words": self.invalid_words(),
+            "connected": self.connected,
+            "complete": self.complete(tiles),
+        }
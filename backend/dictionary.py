@@ -0,0 +1,477 @@
+"""Compact, memory-mapped word list used to validate words.
+
+The word list is packed into a single binary file where the words are grouped
+by length and every group is stored as a sorted run of fixed-width ASCII
+records. Each group also carries a table of where every two-letter prefix
+starts, so a lookup only has to scan the records sharing the first two letters
+of the word. Nothing is allocated per word, and the scan is a single C-level
+``find`` over those records, linear in their size: at most a few thousand
+records, which measures faster than binary searching them from Python.
+
+Because the records of a group are sorted, every prefix owns a contiguous
+range of them, so a group doubles as an implicit trie: the children of a
+prefix are found by binary searching inside its range. ``Dictionary.match``
+walks that trie to answer crossword style pattern queries.
+
+The packed file is opened with ``mmap``, which means every process on a host
+(e.g. every gunicorn worker) shares one copy of the pages through the OS page
+cache instead of each building its own ``set`` of ``str`` objects.
+
+The packed file is built ahead of time with ``python -m dictionary`` (or the
+``build-dictionary`` script), and ``LazyDictionary`` defers mapping it until
+the first lookup so that importing the game stays cheap.
+
+Layout (all integers little endian)::
+
+    magic     8 bytes   b"BGWORDS\\0"
+    version   uint16
+    n_groups  uint16
+    n_words   uint32
+    checksum  16 bytes  BLAKE2b digest of everything after the header
+    groups    n_groups * (length uint16, count uint32, offset uint32, index uint32)
+    indexes   n_groups * 677 uint32, the first record of every two-letter prefix
+    records   the sorted fixed-width records of every group
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from threading import Lock
+
+MAGIC = b"BGWORDS\0"
+FORMAT_VERSION = 2
+
+# Words may only contain the letters A-Z
+LETTERS = b"ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# Matches any letter in a pattern passed to ``Dictionary.match``
+WILDCARD = ord("?")
+
+# Below this many records, a pattern query checks the records one by one
+# rather than searching for the next letters
+_SCAN_BELOW = 48
+
+_HEADER = struct.Struct("<8sHHI16s")
+_GROUP = struct.Struct("<HIII")
+_BUCKETS = 26 * 26
+
+
+class DictionaryError(Exception):
+    pass
+
+
+def _bucket(key: bytes) -> int:
+    """Index of the two-letter prefix of a key in a group's prefix table."""
+    if len(key) == 1:
+        return (key[0] - 65) * 26
+    return (key[0] - 65) * 26 + key[1] - 65
+
+
+class _Group:
+    """A sorted run of fixed-width records that all have the same length.
+
+    Supports ``len`` and indexing so that it can be searched with ``bisect``.
+    """
+
+    __slots__ = ("_buffer", "count", "index", "length", "offset")
+
+    def __init__(
+        self, buffer: bytes | mmap.mmap, length: int, count: int, offset: int, index: array
+    ):
+        self._buffer = buffer
+        self.length = length
+        self.count = count
+        self.offset = offset
+        self.index = index
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> bytes:
+        start = self.offset + i * self.length
+        return self._buffer[start : start + self.length]
+
+    def records(self) -> memoryview:
+        """A zero-copy view of all of the records of the group."""
+        return memoryview(self._buffer)[self.offset : self.offset + self.count * self.length]
+
+    def __contains__(self, key: bytes) -> bool:
+        bucket = _bucket(key)
+        start = self.offset + self.index[bucket] * self.length
+        end = self.offset + self.index[bucket + 1] * self.length
+        # A linear scan of the prefix's records, but in C: binary searching them with
+        # bisect slices a record per step and is slower for ranges of this size
+        pos = self._buffer.find(key, start, end)
+        # Records are not delimited, so a match may straddle two records
+        while pos != -1 and (pos - self.offset) % self.length:
+            pos = self._buffer.find(key, pos + 1, end)
+        return pos != -1
+
+
+class Dictionary:
+    """A read-only set of words backed by a packed word list.
+
+    Attributes:
+        groups (Dict[int, _Group]): The records of each word length.
+    """
+
+    def __init__(self, buffer: bytes | mmap.mmap, verify: bool = True):
+        self._buffer = buffer
+        if len(buffer) < _HEADER.size:
+            raise DictionaryError("Packed word list is truncated.")
+        magic, version, n_groups, n_words, checksum = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise DictionaryError("Not a packed word list.")
+        if version != FORMAT_VERSION:
+            raise DictionaryError(
+                f"Unsupported word list version {version}, expected {FORMAT_VERSION}."
+            )
+        if verify and _checksum(memoryview(buffer)[_HEADER.size :]) != checksum:
+            raise DictionaryError("Packed word list checksum mismatch.")
+
+        self.groups: dict[int, _Group] = {}
+        for i in range(n_groups):
+            length, count, offset, index_offset = _GROUP.unpack_from(
+                buffer, _HEADER.size + i * _GROUP.size
+            )
+            index_end = index_offset + (_BUCKETS + 1) * 4
+            if offset + length * count > len(buffer) or index_end > len(buffer):
+                raise DictionaryError("Packed word list is truncated.")
+            index = array("I", buffer[index_offset:index_end])
+            if sys.byteorder == "big":  # pragma: no cover
+                index.byteswap()
+            self.groups[length] = _Group(buffer, length, count, offset, index)
+        self._len = n_words
+
+    @classmethod
+    def open(cls, path: str, verify: bool = True) -> "Dictionary":
+        """Memory map a packed word list.
+
+        Args:
+            path (str): Path to the packed word list.
+            verify (bool): Check the checksum of the file, defaults to True.
+
+        Returns:
+            Dictionary: The mapped dictionary.
+        """
+        with open(path, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, verify=verify)
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str):
+            return False
+        try:
+            key = word.encode("ascii")
+        except UnicodeEncodeError:
+            return False
+        group = self.groups.get(len(key))
+        if group is None or key.strip(LETTERS):
+            return False
+        return key in group
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[str]:
+        for length in sorted(self.groups):
+            group = self.groups[length]
+            for i in range(group.count):
+                yield group[i].decode("ascii")
+
+    def match(
+        self, pattern: str, rack: Iterable[str] | None = None, limit: int | None = None
+    ) -> list[str]:
+        """Find the words that fit a crossword style pattern.
+
+        Letters in the pattern are fixed (e.g. already on the board) and each
+        ``?`` matches a single letter. When a rack is given, the wildcards must
+        be filled from its letters, using each tile at most once.
+
+        Args:
+            pattern (str): The pattern to match, e.g. ``"??A?E"``.
+            rack (Iterable[str], optional): The letters available for the wildcards.
+                Defaults to None, in which case a wildcard matches any letter.
+            limit (int, optional): The maximum number of words to return.
+
+        Raises:
+            DictionaryError: The pattern contains something other than A-Z and ``?``.
+
+        Returns:
+            List[str]: The matching words, in alphabetical order.
+        """
+        try:
+            # Strictly, as the replacement character "?" would be read as a wildcard
+            key = pattern.upper().encode("ascii")
+        except UnicodeEncodeError:
+            key = b"!"
+        if key.replace(b"?", b"").strip(LETTERS):
+            raise DictionaryError(f"Invalid pattern {pattern!r}, use A-Z and '?'.")
+        group = self.groups.get(len(key))
+        if group is None or limit == 0:
+            return []
+
+        # Tiles left in the rack, or None when wildcards are unrestricted
+        counts = None
+        if rack is not None:
+            counts = [0] * 26
+            for letter in rack:
+                if len(letter) == 1 and "A" <= letter.upper() <= "Z":
+                    counts[ord(letter.upper()) - 65] += 1
+
+        words: list[str] = []
+        any_letter = range(65, 91)
+
+        def scan(depth: int, lo: int, hi: int):
+            for i in range(lo, hi):
+                record = group[i]
+                used = []
+                for pos in range(depth, len(key)):
+                    c = record[pos]
+                    if key[pos] != WILDCARD:
+                        if key[pos] != c:
+                            break
+                    elif counts is not None:
+                        if not counts[c - 65]:
+                            break
+                        counts[c - 65] -= 1
+                        used.append(c)
+                else:
+                    words.append(record.decode("ascii"))
+                for c in used:
+                    counts[c - 65] += 1  # type: ignore[index]
+                if limit is not None and len(words) >= limit:
+                    return
+
+        def walk(prefix: bytes, lo: int, hi: int):
+            depth = len(prefix)
+            if depth == len(key):
+                words.append(prefix.decode("ascii"))
+                return
+            if hi - lo < _SCAN_BELOW:
+                scan(depth, lo, hi)
+                return
+            wildcard = key[depth] == WILDCARD
+            if not wildcard:
+                letters: Iterable[int] = (key[depth],)
+            elif counts is None:
+                letters = any_letter
+            else:
+                letters = [c for c in any_letter if counts[c - 65]]
+
+            for c in letters:
+                # The records below the prefix are sorted on this position, and
+                # the prefix table gives the ranges of the first two positions
+                child = prefix + bytes((c,))
+                if depth == 0 and len(key) > 1:
+                    start, end = group.index[(c - 65) * 26], group.index[(c - 64) * 26]
+                elif depth == 1:
+                    bucket = _bucket(child)
+                    start, end = group.index[bucket], group.index[bucket + 1]
+                else:
+                    start = bisect_left(group, child, lo, hi)
+                    end = bisect_left(group, prefix + bytes((c + 1,)), start, hi)
+                if start == end:
+                    continue
+                if wildcard and counts is not None:
+                    counts[c - 65] -= 1
+                    walk(child, start, end)
+                    counts[c - 65] += 1
+                else:
+                    walk(child, start, end)
+                if limit is not None and len(words) >= limit:
+                    return
+
+        walk(b"", 0, group.count)
+        return words
+
+
+class LazyDictionary:
+    """A ``Dictionary`` that is only loaded on its first use.
+
+    Attributes:
+        source (str): Path to the text word list.
+        packed (str): Path to the packed word list.
+    """
+
+    def __init__(self, source: str, packed: str | None = None):
+        self.source = source
+        self.packed = packed
+        self._dictionary: Dictionary | None = None
+        self._lock = Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._dictionary is not None
+
+    def get(self) -> Dictionary:
+        """Return the dictionary, loading it if this is the first use."""
+        if self._dictionary is None:
+            with self._lock:
+                if self._dictionary is None:
+                    self._dictionary = load_dictionary(self.source, self.packed)
+        return self._dictionary
+
+    def __contains__(self, word: object) -> bool:
+        return word in self.get()
+
+    def __len__(self) -> int:
+        return len(self.get())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.get())
+
+    def match(
+        self, pattern: str, rack: Iterable[str] | None = None, limit: int | None = None
+    ) -> list[str]:
+        return self.get().match(pattern, rack, limit)
+
+
+def _checksum(data: bytes | memoryview) -> bytes:
+    # Imported here, hashlib is a noticeable part of the cost of importing the game
+    import hashlib
+
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def pack(words: Iterable[str]) -> bytes:
+    """Pack words into the binary layout read by ``Dictionary``.
+
+    Args:
+        words (Iterable[str]): The words to pack. Duplicates are dropped.
+
+    Raises:
+        DictionaryError: A word is empty or contains something other than A-Z.
+
+    Returns:
+        bytes: The packed word list.
+    """
+    by_length: dict[int, set[bytes]] = {}
+    for word in words:
+        key = word.encode("ascii", errors="replace")
+        if not key or key.strip(LETTERS):
+            raise DictionaryError(f"Cannot pack {word!r}, words may only contain A-Z.")
+        by_length.setdefault(len(key), set()).add(key)
+
+    lengths = sorted(by_length)
+    index_offset = _HEADER.size + len(lengths) * _GROUP.size
+    offset = index_offset + len(lengths) * (_BUCKETS + 1) * 4
+    groups = []
+    indexes = []
+    records = []
+    for length in lengths:
+        group = sorted(by_length[length])
+
+        # Record where each two-letter prefix starts, so lookups can skip to it
+        index = array("I", [len(group)] * (_BUCKETS + 1))
+        for i in range(len(group) - 1, -1, -1):
+            index[_bucket(group[i])] = i
+        for bucket in range(_BUCKETS - 1, -1, -1):
+            index[bucket] = min(index[bucket], index[bucket + 1])
+        if sys.byteorder == "big":  # pragma: no cover
+            index.byteswap()
+
+        groups.append(_GROUP.pack(length, len(group), offset, index_offset))
+        indexes.append(index.tobytes())
+        records.append(b"".join(group))
+        index_offset += (_BUCKETS + 1) * 4
+        offset += length * len(group)
+    body = b"".join(groups + indexes + records)
+    n_words = sum(len(group) for group in by_length.values())
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, len(lengths), n_words, _checksum(body)) + body
+
+
+def read_words(source: str) -> Iterator[str]:
+    """Read the words out of a plain text word list.
+
+    Lines that are not a single word (e.g. the title line at the top of the
+    list) are skipped.
+
+    Args:
+        source (str): Path to the text word list, one word per line.
+
+    Yields:
+        str: Each word, upper cased.
+    """
+    with open(source) as file:
+        for line in file:
+            word = line.strip().upper()
+            if word.isascii() and word.isalpha():
+                yield word
+
+
+def build(source: str, packed: str | None = None) -> str:
+    """Pack a plain text word list and write it to disk.
+
+    The file is written to a temporary file and moved into place so that
+    concurrent workers never map a partially written file.
+
+    Args:
+        source (str): Path to the text word list, one word per line.
+        packed (str, optional): Path to write the packed word list to. Defaults to
+            the source path with a ``.bin`` extension.
+
+    Returns:
+        str: Path of the packed word list.
+    """
+    if packed is None:
+        packed = os.path.splitext(source)[0] + ".bin"
+    data = pack(read_words(source))
+    tmp = f"{packed}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as file:
+        file.write(data)
+    os.replace(tmp, packed)
+    return packed
+
+
+def load_dictionary(source: str, packed: str | None = None) -> Dictionary:
+    """Load the packed form of a plain text word list, packing it first if needed.
+
+    The packed file is rebuilt when it is missing, older than the source, or
+    cannot be read (e.g. it was written by another version of this module).
+
+    Args:
+        source (str): Path to the text word list, one word per line.
+        packed (str, optional): Path to the packed word list. Defaults to the source
+            path with a ``.bin`` extension.
+
+    Returns:
+        Dictionary: The mapped dictionary.
+    """
+    if packed is None:
+        packed = os.path.splitext(source)[0] + ".bin"
+    if os.path.exists(packed) and os.path.getmtime(packed) >= os.path.getmtime(source):
+        try:
+            return Dictionary.open(packed)
+        except DictionaryError:
+            pass
+    return Dictionary.open(build(source, packed))
+
+
+def main(argv: list[str] | None = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the packed word list used by the game.")
+    parser.add_argument("--source", default="words/words.txt", help="text word list")
+    parser.add_argument("--output", help="packed word list, defaults to SOURCE with .bin")
+    parser.add_argument(
+        "--check", action="store_true", help="verify an existing packed word list instead"
+    )
+    args = parser.parse_args(argv)
+
+    packed = args.output or os.path.splitext(args.source)[0] + ".bin"
+    if not args.check:
+        build(args.source, packed)
+    try:
+        dictionary = Dictionary.open(packed)
+    except (OSError, DictionaryError) as e:
+        sys.exit(f"{packed}: {e}")
+    print(f"{packed}: {len(dictionary)} words, format version {FORMAT_VERSION}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""Socket event handlers, declared with the schema of their payload.
+
+Every game event goes through the same steps: check the payload against the
+event's JSON schema, check that the socket plays as the player it acts for,
+find the game it names, run the handler and report any ``GameError`` to the
+game's room. ``GameEvents.on`` declares a handler along
+with its schema and takes care of the rest, so handlers only hold what is
+particular to their event.
+
+Schemas are checked and compiled once, when the handler is declared.
+``jsonschema.validate`` checks the schema against the metaschema and builds a
+new validator on every call, which costs far more than validating the payload
+itself, and even a prebuilt ``Draft7Validator`` walks the schema afresh for
+each payload. So ``compile_schema`` turns the keywords the app's schemas use
+into a tree of plain Python checks, which is what payloads are checked with.
+A ``Draft7Validator`` is kept for the rest: schemas with other keywords, and
+the message for an invalid payload, the same one ``validate`` gives, which is
+only worked out when it is needed.
+"""
+
+import functools
+import logging
+import re
+import time
+from collections.abc import Callable, Hashable, Mapping
+from types import FrameType
+from typing import Any
+
+from flask import request
+from flask_socketio import SocketIO, emit
+from jsonschema import Draft7Validator
+from jsonschema.exceptions import best_match
+
+from game import Game, GameError
+from metrics import Registry
+
+Check = Callable[[Any], bool]
+
+
+def _is_integer(value: Any) -> bool:
+    if isinstance(value, float):
+        return value.is_integer()
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+# JSON schema types, as draft 7 checks them: booleans are not numbers, 1.0 is an integer
+_TYPES: dict[str, Check] = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "integer": _is_integer,
+    "number": lambda value: isinstance(value, int | float) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+}
+
+_NUMBER = _TYPES["number"]
+
+
+def _type(types: str | list[str]) -> Check:
+    if isinstance(types, str):
+        return _TYPES[types]
+    checks = [_TYPES[name] for name in types]
+    return lambda value: any(check(value) for check in checks)
+
+
+def _properties(properties: dict[str, Any]) -> Check | None:
+    compiled = {name: compile_schema(schema) for name, schema in properties.items()}
+    if None in compiled.values():
+        return None
+    checks = list(compiled.items())
+
+    def check(value: Any) -> bool:
+        if not isinstance(value, dict):
+            return True
+        for name, check_property in checks:
+            if name in value and not check_property(value[name]):  # type: ignore[misc]
+                return False
+        return True
+
+    return check
+
+
+def _required(names: list[str]) -> Check:
+    return lambda value: not isinstance(value, dict) or all(name in value for name in names)
+
+
+def _items(schema: Any) -> Check | None:
+    item = compile_schema(schema) if isinstance(schema, dict) else None
+    if item is None:
+        return None
+    return lambda value: not isinstance(value, list) or all(item(element) for element in value)
+
+
+def _any_of(schemas: list[Any]) -> Check | None:
+    checks = [compile_schema(schema) for schema in schemas]
+    if None in checks:
+        return None
+    return lambda value: any(check(value) for check in checks)  # type: ignore[misc]
+
+
+def _enum(values: list[Any]) -> Check | None:
+    # Only strings, so that True and 1 never need telling apart
+    if not all(isinstance(value, str) for value in values):
+        return None
+    allowed = frozenset(values)
+    return lambda value: isinstance(value, str) and value in allowed
+
+
+def _pattern(pattern: str) -> Check:
+    search = re.compile(pattern).search
+    return lambda value: not isinstance(value, str) or search(value) is not None
+
+
+# Makes the check of each supported keyword from its value, None if it cannot
+_KEYWORDS: dict[str, Callable[[Any], Check | None]] = {
+    "type": _type,
+    "properties": _properties,
+    "required": _required,
+    "items": _items,
+    "anyOf": _any_of,
+    "enum": _enum,
+    "pattern": _pattern,
+    "minItems": lambda n: lambda value: not isinstance(value, list) or len(value) >= n,
+    "maxItems": lambda n: lambda value: not isinstance(value, list) or len(value) <= n,
+    "maxLength": lambda n: lambda value: not isinstance(value, str) or len(value) <= n,
+    "minimum": lambda n: lambda value: not _NUMBER(value) or value >= n,
+    "maximum": lambda n: lambda value: not _NUMBER(value) or value <= n,
+    "exclusiveMinimum": lambda n: lambda value: not _NUMBER(value) or value > n,
+}
+
+
+def compile_schema(schema: dict[str, Any]) -> Check | None:
+    """Turn a JSON schema into a function that checks whether a value is valid.
+
+    Only the keywords in ``_KEYWORDS`` are supported, with the meaning draft 7
+    gives them.
+
+    Args:
+        schema (Dict[str, Any]): A valid draft 7 JSON schema.
+
+    Returns:
+        Callable[[Any], bool]: The check, or None when the schema uses a keyword
+            that is not supported.
+    """
+    checks = []
+    for keyword, value in schema.items():
+        make = _KEYWORDS.get(keyword)
+        check = make(value) if make is not None else None
+        if check is None:
+            return None
+        checks.append(check)
+    if len(checks) == 1:
+        return checks[0]
+    return lambda value: all(check(value) for check in checks)
+
+
+def running_event(frame: FrameType | None) -> str | None:
+    """The socket event a stack is handling, if it is running a ``GameEvents`` handler.
+
+    Args:
+        frame (FrameType, optional): The innermost frame of the stack.
+
+    Returns:
+        str: The name of the event, or None.
+    """
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name == "run" and code.co_filename == __file__:
+            return frame.f_locals.get("event")
+        frame = frame.f_back
+    return None
+
+
+class GameEvents:
+    """Declares socket event handlers that share validation, game lookup and error reporting.
+
+    Attributes:
+        socketio (SocketIO): Where handlers are registered.
+        games (Mapping[Hashable, Game]): The games handlers are given, by name.
+        emit_error (Callable[[Hashable, str], None]): Reports an error to a game's room.
+        logger (logging.Logger): Where invalid payloads, missing games and errors are
+            logged, with the event as ``extra``.
+        sessions (Mapping[str, Tuple[Hashable, Hashable]]): The game name and player ID
+            each socket plays as, by session ID.
+        validators (Dict[str, Draft7Validator]): The compiled schema of each event.
+        metrics (metrics.Registry): Where the time taken by each event, and the errors
+            reported, are recorded.
+    """
+
+    def __init__(
+        self,
+        socketio: SocketIO,
+        games: Mapping[Hashable, Game],
+        emit_error: Callable[[Hashable, str], None],
+        logger: logging.Logger,
+        metrics: Registry | None = None,
+        sessions: Mapping[str, tuple[Hashable, Hashable]] | None = None,
+    ):
+        self.socketio = socketio
+        self.games = games
+        self.emit_error = emit_error
+        self.logger = logger
+        self.sessions = sessions if sessions is not None else {}
+        self.validators: dict[str, Draft7Validator] = {}
+        self.metrics = metrics if metrics is not None else Registry()
+        self._seconds = self.metrics.histogram(
+            "bananagrams_event_seconds", "Time taken to handle a socket event.", ["event"]
+        )
+        self._errors = self.metrics.counter(
+            "bananagrams_event_errors_total",
+            "Errors reported for socket events, by reason: the reason of the GameError, "
+            "or invalid for an invalid payload, not_player for a player the socket does "
+            "not play as and no_game for a missing game.",
+            ["event", "reason"],
+        )
+
+    def on(
+        self,
+        event: str,
+        schema: dict[str, Any],
+        key: str = "name",
+        find_game: bool = True,
+        player: str | None = None,
+    ) -> Callable[[Callable[..., Any]], Callable[[Any], None]]:
+        """Declare the handler of an event.
+
+        The handler is only called with valid payloads, as
+        ``handler(data, game_name, game)``, or ``handler(data, game_name)`` when
+        the event does not need the game to exist. When the event acts for a
+        player, the handler is only called if the socket plays as that player in
+        the game, and the socket alone is sent an ``error`` otherwise.
+
+        Args:
+            event (str): The name of the event.
+            schema (Dict[str, Any]): The JSON schema of the payload, which must
+                require ``key``.
+            key (str): The field of the payload that names the game. Defaults to "name".
+            find_game (bool): Whether to look the game up, and report a missing game
+                rather than call the handler. Defaults to True.
+            player (str, optional): The field of the payload that names the player the
+                event acts for, which must be the one the socket joined as. Defaults to
+                None, for events that do not act for a player.
+
+        Raises:
+            jsonschema.SchemaError: The schema is not a valid JSON schema.
+
+        Returns:
+            Callable: Registers the handler, and returns the function socketio calls.
+        """
+        Draft7Validator.check_schema(schema)
+        validator = self.validators[event] = Draft7Validator(schema)
+        is_valid = compile_schema(schema) or validator.is_valid
+        seconds = self._seconds.labels(event)
+
+        def decorator(handler: Callable[..., Any]) -> Callable[[Any], None]:
+            def run(data: Any):
+                if not is_valid(data):
+                    self._errors.labels(event, "invalid").inc()
+                    if isinstance(data, dict) and key in data:
+                        self.emit_error(data[key], str(best_match(validator.iter_errors(data))))
+                    else:
+                        self.logger.error(
+                            "No game specified in input. from %s", event, extra={"event": event}
+                        )
+                    return
+                game_name = data[key]
+                if player is not None and self.sessions.get(request.sid) != (
+                    game_name,
+                    data[player],
+                ):
+                    self._errors.labels(event, "not_player").inc()
+                    self.logger.warning(
+                        "The socket does not play as %s in the game named %s. from %s",
+                        data[player],
+                        game_name,
+                        event,
+                        extra={"event": event},
+                    )
+                    # Only to the socket, the players of the game did nothing wrong
+                    emit("error", {"message": f"You are not playing as {data[player]}."})
+                    return
+                try:
+                    if not find_game:
+                        handler(data, game_name)
+                        return
+                    try:
+                        game = self.games[game_name]
+                    except KeyError:
+                        self._errors.labels(event, "no_game").inc()
+                        self.logger.warning(
+                            "Could not find the game named %s. from %s",
+                            game_name,
+                            event,
+                            extra={"event": event},
+                        )
+                        self.emit_error(game_name, f"Could not find the game named {game_name}.")
+                        return
+                    handler(data, game_name, game)
+                except GameError as e:
+                    self._errors.labels(event, e.reason).inc()
+                    # Routine, so without the traceback
+                    self.logger.warning(
+                        "%s failed for the game named %s: %s",
+                        event,
+                        game_name,
+                        e,
+                        extra={"event": event},
+                    )
+                    self.emit_error(game_name, str(e))
+
+            @functools.wraps(handler)
+            def dispatch(data: Any):
+                start = time.perf_counter()
+                try:
+                    run(data)
+                finally:
+                    seconds.observe(time.perf_counter() - start)
+
+            self.socketio.on(event)(dispatch)
+            return dispatch
+
+        return decorator
@@ -1,26 +1,79 @@
 import datetime
-import random
+import functools
+import logging
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from enum import Enum
-from threading import Lock
-from typing import Any
-
-TILE_FREQUENCIES = {
-    2: ["J", "K", "Q", "X", "Z"],
-    3: ["B", "C", "F", "H", "M", "P", "V", "W", "Y"],
-    4: ["G"],
-    5: ["L"],
-    6: ["D", "S", "U"],
-    8: ["N"],
-    9: ["T", "R"],
-    11: ["O"],
-    12: ["I"],
-    13: ["A"],
-    18: ["E"],
-}
-
-# Read in the word list
-with open("words/words.txt") as file:
-    WORDS = {x.strip() for x in file.readlines()}
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from actor import Mailbox, MailboxTimeoutError
+from board import Board, BoardError, Verdict, grid_placements
+from dictionary import DictionaryError, LazyDictionary
+from metrics import Buckets, Registry
+from tiles import TEST_TILES, Rack, SeededRandom, TileBag
+
+if TYPE_CHECKING:
+    from journal import Journal
+
+logger = logging.getLogger(__name__)
+
+# The packed word list, mapped in on the first lookup
+WORDS = LazyDictionary("words/words.txt")
+
+# Number of recent word verdicts kept, shared by every game in the process
+WORD_CACHE_SIZE = 16384
+
+# Number of recent changes each game keeps to bring stale clients up to date
+CHANGE_LOG_SIZE = 64
+
+# Commands that keep their game for longer than this many seconds are logged
+SLOW_COMMAND = 0.1
+
+
+# simplejson and msgpack are imported where they are used, as they are half of
+# what importing the game costs beyond the standard library
+def _encode_json(state: Any) -> bytes:
+    import simplejson
+
+    return simplejson.dumps(state, separators=(",", ":")).encode()
+
+
+def _encode_msgpack(state: Any) -> bytes:
+    import msgpack
+
+    return msgpack.packb(state)
+
+
+# How the shared state can be encoded for clients, by wire format
+ENCODERS: dict[str, Callable[[Any], bytes]] = {"json": _encode_json, "msgpack": _encode_msgpack}
+
+
+@lru_cache(maxsize=WORD_CACHE_SIZE)
+def is_word(word: str) -> bool:
+    """Check a single word against the dictionary.
+
+    Args:
+        word (str): The word to check, in any case.
+
+    Returns:
+        bool: Whether the word is in the dictionary.
+    """
+    return word.upper() in WORDS
+
+
+def validate_words(words: list[str]) -> list[tuple[str, bool]]:
+    """Check a batch of words against the dictionary.
+
+    Args:
+        words (List[str]): The words to check.
+
+    Returns:
+        List[Tuple[str, bool]]: Each word paired with whether it is valid.
+    """
+    return [(word, is_word(word)) for word in words]
 
 
 class State(Enum):
@@ -40,7 +93,181 @@ class State(Enum):
 
 
 class GameError(Exception):
-    pass
+    """A command that cannot be carried out, reported to the players.
+
+    Attributes:
+        reason (str): The kind of error, the same for every game and player, so
+            that errors can be counted by kind.
+    """
+
+    def __init__(self, message: str, reason: str = "other"):
+        super().__init__(message)
+        self.reason = reason
+
+
+class CommandTimer:
+    """Records how long commands wait for their game's mailbox, and how long they keep it.
+
+    Attributes:
+        wait (metrics.Histogram): Seconds from sending a command to its start, by command.
+        run (metrics.Histogram): Seconds a command kept its game, by command.
+        slow (float): Commands that keep their game for longer than this many seconds
+            are logged.
+    """
+
+    def __init__(self, metrics: Registry | None = None, slow: float = SLOW_COMMAND):
+        metrics = metrics if metrics is not None else Registry()
+        self.wait = metrics.histogram(
+            "bananagrams_command_wait_seconds",
+            "Time a game command waited for the game's other commands to finish.",
+            ["command"],
+        )
+        self.run = metrics.histogram(
+            "bananagrams_command_run_seconds",
+            "Time a game command kept the game to itself.",
+            ["command"],
+        )
+        self.slow = slow
+        # The wait and run histograms of each command
+        self._commands: dict[str, tuple[Buckets, Buckets]] = {}
+
+    def record(self, game: "Game", name: str, waited: float, ran: float):
+        """Record a command that has run.
+
+        Args:
+            game (Game): The game.
+            name (str): The command.
+            waited (float): Seconds it waited for its turn.
+            ran (float): Seconds it ran for.
+        """
+        histograms = self._commands.get(name)
+        if histograms is None:
+            histograms = self._commands[name] = (self.wait.labels(name), self.run.labels(name))
+        histograms[0].observe(waited)
+        histograms[1].observe(ran)
+        game.wait_seconds += waited
+        game.run_seconds += ran
+        if ran > self.slow:
+            logger.warning(
+                "%s kept the game named %s for %.1f ms, after waiting %.1f ms for it.",
+                name,
+                game.id,
+                ran * 1000,
+                waited * 1000,
+            )
+
+
+_timer = CommandTimer()
+
+
+def time_commands(metrics: Registry, slow: float = SLOW_COMMAND):
+    """Record the wait and run time of every game's commands in the server's metrics.
+
+    Args:
+        metrics (metrics.Registry): Where the histograms are added.
+        slow (float): Commands that keep their game for longer than this many seconds
+            are logged. Defaults to ``SLOW_COMMAND``.
+    """
+    global _timer
+    _timer = CommandTimer(metrics, slow)
+
+
+def _run(method: Callable[..., Any], name: str, game: "Game", sent: float, *args, **kwargs) -> Any:
+    start = time.perf_counter()
+    game.running = (name, start)
+    try:
+        if game.retired:
+            raise GameError("The game was put away while idle, please try again.", "retired")
+        return method(game, *args, **kwargs)
+    finally:
+        game.running = None
+        _timer.record(game, name, start - sent, time.perf_counter() - start)
+
+
+def command(method: Callable[..., Any]) -> Callable[..., Any]:
+    """Run a method of a game through the game's mailbox, one command at a time."""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self: "Game", *args, **kwargs):
+        self.last_active = time.monotonic()
+        try:
+            return self.mailbox.call(_run, method, name, self, time.perf_counter(), *args, **kwargs)
+        except MailboxTimeoutError as e:
+            running = self.running
+            if running is not None:
+                logger.warning(
+                    "%s timed out waiting for the game named %s, where %s has run for %.1f ms.",
+                    name,
+                    self.id,
+                    running[0],
+                    (time.perf_counter() - running[1]) * 1000,
+                )
+            raise GameError(
+                "Could not get a turn on the game - operation timed out", "timeout"
+            ) from e
+
+    return wrapper
+
+
+# The commands that change a game, undecorated, by name, to replay a journal with
+JOURNALED: dict[str, Callable[..., Any]] = {}
+
+
+def journaled(method: Callable[..., Any] | None = None, *, draws: bool = False) -> Any:
+    """Record each call of a method that succeeds in the game's journal, if it has one.
+
+    Args:
+        draws (bool): Whether the method draws tiles. If so the position of the
+            game's random numbers before the call is recorded with it, so replaying
+            the call draws the same tiles.
+    """
+    if method is None:
+        return functools.partial(journaled, draws=draws)
+    JOURNALED[method.__name__] = method
+
+    @functools.wraps(method)
+    def wrapper(self: "Game", *args, **kwargs):
+        if self.journal is None:
+            return method(self, *args, **kwargs)
+        position = self.rng.draws if draws else None
+        result = method(self, *args, **kwargs)
+        self.journal_seq = self.journal.append(self.id, method.__name__, args, kwargs, position)
+        return result
+
+    return wrapper
+
+
+@dataclass
+class Change:
+    """What one update did to a game.
+
+    Attributes:
+        version (int): The version of the game after the update.
+        state (Dict[str, Any]): The new value of each shared field that changed.
+        players (Dict[str, int]): The new size of each rack that changed, other than
+            through ``dealt``.
+        dealt (int): The number of tiles every player was given.
+        racks (Dict[str, Dict[str, List[str]]]): The tiles added to and removed from
+            each player's rack, only ever sent to that player.
+    """
+
+    version: int
+    state: dict[str, Any] = field(default_factory=dict)
+    players: dict[str, int] = field(default_factory=dict)
+    dealt: int = 0
+    racks: dict[str, dict[str, list[str]]] = field(default_factory=dict)
+
+    def delta(self) -> dict[str, Any]:
+        """The shared part of the change, as sent to every client in the game."""
+        delta: dict[str, Any] = {"base": self.version - 1, "version": self.version}
+        if self.state:
+            delta["state"] = self.state
+        if self.players:
+            delta["players"] = self.players
+        if self.dealt:
+            delta["dealt"] = self.dealt
+        return delta
 
 
 class Game:
@@ -49,24 +276,49 @@ class Game:
 
     Attributes:
         id (str): Id of a game.
-        tiles (List[str]): The list of tiles for a game.
+        rng (SeededRandom): Where the game's randomness comes from. Its seed and the
+            number of draws made from it are saved with the game, so the game's
+            tiles can be reproduced.
+        tiles (TileBag): The pile of tiles players draw from.
         tiles_remaining (int): The number of tiles left in the game.
         num_players (int): The number of players.
-        player_tiles (Dict[str, List[str]]): A dictionary mapping each player to their tiles.
+        players (Dict[str, Rack]): A dictionary mapping each player to their tiles.
+        boards (Dict[str, Board]): The tiles each player has placed on their board.
         last_peel (datetime.datetime): The time of the last peel, used to prevent overlapping peels.
+        last_active (float): The ``time.monotonic()`` of the last command, used to expire
+            abandoned games.
         winning_words (List[Tuple[str, bool]]): List of words from the (potentially) winning player
+        verdict (Verdict): The check of the (potentially) winning player's board.
+        version (int): Increases with every change to the shared state or a rack.
+        changes (Deque[Change]): The most recent changes, oldest first.
+        snapshot_hits (int): The number of times the encoded shared state was reused.
+        snapshot_misses (int): The number of times the shared state had to be encoded.
         winning_player (str): ID of the (potentially) winning player
-        lock (threading.Lock): A lock to keep the game state synchronized.
+        mailbox (Mailbox): Runs the game's commands one at a time.
+        running (Tuple[str, float]): The command running and the ``time.perf_counter()``
+            it started at, or None.
+        wait_seconds (float): The total time commands waited for their turn.
+        run_seconds (float): The total time commands kept the game.
+        retired (bool): Whether the game has been packed away with ``retire``, after
+            which this copy takes no more commands.
+        journal (Journal): Where the game's commands are recorded, or None.
+        journal_seq (int): The sequence number of the game's last journal entry.
 
     """
 
-    def __init__(self, id: str, test_mode: bool = False):
+    def __init__(
+        self,
+        id: str,
+        test_mode: bool = False,
+        journal: "Journal | None" = None,
+        seed: int | None = None,
+    ):
         self.id: str = id
         self.test_mode: bool = test_mode
 
-        # Tile generation
+        # Tile generation, reproducible from the seed when one is given
+        self.rng = SeededRandom(seed)
         self.tiles = self._generate_tiles()
-        random.shuffle(self.tiles)
 
         # General game fields
         self.state = State.IDLE
@@ -76,52 +328,59 @@ class Game:
 
         # Date created.
         self.date_created = datetime.datetime.now()
+        self.last_active = time.monotonic()
 
         # Player tile tracking
-        self.players: dict[str, list[str]] = {}
+        self.players: dict[str, Rack] = {}
+        self.boards: dict[str, Board] = {}
 
         # Data for the end of the game
         self.winning_words: list[tuple[str, bool]] | None = None
         self.winning_player: str | None = None
+        self.verdict: Verdict | None = None
 
-        # Lock for synchronization
-        self.lock = Lock()
+        # Versioning of the state sent to clients
+        self.version = 0
+        self.changes: deque[Change] = deque(maxlen=CHANGE_LOG_SIZE)
 
-    def _generate_tiles(self) -> list[str]:
+        # The shared state in each wire format, and the version it was encoded at
+        self._snapshots: dict[str, tuple[int, bytes]] = {}
+        self.snapshot_hits = 0
+        self.snapshot_misses = 0
+
+        # Commands that read or change the game run one at a time
+        self.mailbox = Mailbox()
+        self.running: tuple[str, float] | None = None
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+        self.retired = False
+
+        # Commands are journaled once the game itself is
+        self.journal = journal
+        self.journal_seq = 0
+        if journal is not None:
+            self.journal_seq = journal.append(
+                id, "create", kwargs={"test_mode": test_mode, "seed": self.rng.initial_seed}
+            )
+
+    def _generate_tiles(self) -> TileBag:
         """Generate the initial set of tiles for the game.
 
         Returns:
-            List[str]: List of tiles for the game.
+            TileBag: The tiles for the game.
         """
-        tiles = []
         if self.test_mode:
             # For test mode, use a minimal set of tiles for quick testing
-            test_tiles = [
-                "A",
-                "E",
-                "T",
-                "S",
-                "R",
-                "N",
-                "O",
-                "I",
-                "L",
-                "C",
-            ]
-            tiles = test_tiles.copy()
-        else:
-            for count, letters in TILE_FREQUENCIES.items():
-                for letter in letters:
-                    for _ in range(count):
-                        tiles.append(letter)
-        return tiles
+            return TileBag.from_letters(TEST_TILES, self.rng)
+        return TileBag.from_frequencies(rng=self.rng)
 
+    @command
+    @journaled
     def reset(
         self,
     ):
         # Tile generation
         self.tiles = self._generate_tiles()
-        random.shuffle(self.tiles)
 
         # General game fields
         self.state = State.IDLE
@@ -134,10 +393,136 @@ class Game:
         # Reset end of game data
         self.winning_words = None
         self.winning_player = None
+        self.verdict = None
+
+        # Changes from before the reset cannot be replayed
+        self.version += 1
+        self.changes.clear()
 
         # Reset player tiles
         for player in self.players:
-            self.players[player] = []
+            self.players[player] = Rack()
+            self.boards[player] = Board(is_word)
+
+    @command
+    def retire(self) -> bytes:
+        """Pack the game away, e.g. to disk while nobody is playing it.
+
+        This copy of the game takes no more commands afterwards, the game
+        carries on from ``from_bytes``. The change log is not kept, so clients
+        that come back get a full snapshot.
+
+        Returns:
+            bytes: The game, as MessagePack.
+        """
+        self.retired = True
+        return self._pack()
+
+    @command
+    def pack(self) -> bytes:
+        """Pack up a copy of the game, e.g. for a snapshot. The game carries on.
+
+        Returns:
+            bytes: The game, as MessagePack, read back with ``from_bytes``.
+        """
+        return self._pack()
+
+    def _pack(self) -> bytes:
+        return _encode_msgpack(
+            {
+                "id": self.id,
+                "test_mode": self.test_mode,
+                "seed": self.rng.initial_seed,
+                "draws": self.rng.draws,
+                "tiles": bytes(self.tiles.tiles),
+                "state": self.state.value,
+                "num_players": self.num_players,
+                "tiles_remaining": self.tiles_remaining,
+                "last_peel": self.last_peel.isoformat(),
+                "date_created": self.date_created.isoformat(),
+                "players": {player: bytes(rack.counts) for player, rack in self.players.items()},
+                "boards": {
+                    player: [
+                        (row, col, letter, board.tile_ids.get((row, col)))
+                        for row, col, letter in board
+                    ]
+                    for player, board in self.boards.items()
+                },
+                "winning_words": self.winning_words,
+                "winning_player": self.winning_player,
+                "verdict": self.verdict.for_json() if self.verdict is not None else None,
+                "version": self.version,
+                "journal_seq": self.journal_seq,
+            }
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Game":
+        """Bring back a game packed away by ``retire``.
+
+        Args:
+            data (bytes): The packed game.
+
+        Returns:
+            Game: The game, as it was when it was retired.
+        """
+        import msgpack
+
+        record = msgpack.unpackb(data, strict_map_key=False)
+        game = cls(record["id"], record["test_mode"], seed=record.get("seed"))
+        game.rng.draws = record.get("draws", 0)
+        game.tiles = TileBag(record["tiles"], game.rng)
+        game.state = State(record["state"])
+        game.num_players = record["num_players"]
+        game.tiles_remaining = record["tiles_remaining"]
+        game.last_peel = datetime.datetime.fromisoformat(record["last_peel"])
+        game.date_created = datetime.datetime.fromisoformat(record["date_created"])
+        game.players = {
+            player: Rack.from_counts(counts) for player, counts in record["players"].items()
+        }
+        for player, placements in record["boards"].items():
+            board = Board.from_placements(
+                [(row, col, letter) for row, col, letter, _ in placements], is_word
+            )
+            board.tile_ids = {
+                (row, col): tile_id for row, col, _, tile_id in placements if tile_id is not None
+            }
+            game.boards[player] = board
+        if record["winning_words"] is not None:
+            game.winning_words = [tuple(pair) for pair in record["winning_words"]]
+        game.winning_player = record["winning_player"]
+        if record["verdict"] is not None:
+            game.verdict = Verdict(**record["verdict"])
+        game.version = record["version"]
+        # Games packed before they were journaled
+        game.journal_seq = record.get("journal_seq", 0)
+        return game
+
+    def replay(
+        self, seq: int, command: str, args: list[Any], kwargs: dict[str, Any], draws: int | None
+    ):
+        """Apply a command read back from a journal, see ``journal.Journal.recover``.
+
+        The command does not go through the mailbox, the game must not be in use yet.
+
+        Args:
+            seq (int): The sequence number of the journal entry.
+            command (str): The name of the command.
+            args (List[Any]): The positional arguments it was called with.
+            kwargs (Dict[str, Any]): The keyword arguments it was called with.
+            draws (int): The game's ``rng.draws`` before the command, None if it drew
+                no tiles.
+
+        Raises:
+            GameError: The command failed, which it did not when it was journaled.
+        """
+        if command == "peel":
+            # Peels were spaced out when they were made, their replays are not
+            kwargs = {**kwargs, "test": True}
+        if draws is not None:
+            self.rng.draws = draws
+        JOURNALED[command](self, *args, **kwargs)
+        self.journal_seq = seq
 
     def __str__(self) -> str:  # pragma: no cover
         return (
@@ -160,45 +545,150 @@ class Game:
             # End of game
             "winning_words": self.winning_words,
             "winning_player": self.winning_player,
+            "verdict": self.verdict,
         }
 
     for_json = __json__
 
+    def shared_state(self) -> dict[str, Any]:
+        """The state of the game every player can see.
+
+        Each player's rack is replaced by its number of tiles, a player's own
+        tiles are sent to them separately.
+
+        Returns:
+            Dict[str, Any]: The shared state, ready to be sent as JSON.
+        """
+        state = self.__json__()
+        state["players"] = {player: len(rack) for player, rack in self.players.items()}
+        if self.verdict is not None:
+            state["verdict"] = self.verdict.for_json()
+        state["version"] = self.version
+        return state
+
+    def encoded_state(self, wire_format: str = "json") -> bytes:
+        """The shared state, encoded for sending.
+
+        The encoding is kept until the version changes, so sending an unchanged
+        game to many clients, e.g. when they all reconnect, only encodes it once.
+
+        Args:
+            wire_format (str): A key of ``ENCODERS``. Defaults to "json".
+
+        Returns:
+            bytes: ``shared_state`` as UTF-8 JSON or MessagePack.
+        """
+        snapshot = self._snapshots.get(wire_format)
+        if snapshot is not None and snapshot[0] == self.version:
+            self.snapshot_hits += 1
+            return snapshot[1]
+
+        return self._encode_state(wire_format)
+
+    @command
+    def _encode_state(self, wire_format: str) -> bytes:
+        self.snapshot_misses += 1
+        encoded = ENCODERS[wire_format](self.shared_state())
+        self._snapshots[wire_format] = (self.version, encoded)
+        return encoded
+
+    def _record(self, state: dict[str, Any] | None = None, **kwargs) -> Change:
+        """Bump the version and remember what changed. Call from a command.
+
+        Args:
+            state (Dict[str, Any], optional): The new value of each shared field that
+                changed.
+            **kwargs: The other fields of the ``Change``.
+
+        Returns:
+            Change: The change.
+        """
+        self.version += 1
+        change = Change(self.version, state or {}, **kwargs)
+        self.changes.append(change)
+        return change
+
+    def _end_state(self) -> dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "winning_words": self.winning_words,
+            "winning_player": self.winning_player,
+            "verdict": self.verdict.for_json() if self.verdict is not None else None,
+        }
+
+    @command
+    def changes_since(self, version: int) -> dict[str, Any] | None:
+        """The shared changes a client at an older version has missed, merged into one.
+
+        Args:
+            version (int): The version the client has.
+
+        Returns:
+            Dict[str, Any]: The merged delta, or None when the changes are no longer
+                kept and the client needs a full snapshot.
+        """
+        if version == self.version:
+            return {"base": version, "version": version}
+        if version > self.version or not self.changes or version < self.changes[0].version - 1:
+            return None
+
+        # Send the current value of everything that changed since
+        fields, players = set(), set()
+        for change in self.changes:
+            if change.version > version:
+                fields.update(change.state)
+                players.update(self.players if change.dealt else change.players)
+        shared = self.shared_state()
+        delta: dict[str, Any] = {"base": version, "version": self.version}
+        if fields:
+            delta["state"] = {key: shared[key] for key in fields}
+        if players:
+            delta["players"] = {player: shared["players"][player] for player in players}
+        return delta
+
+    @command
+    @journaled
     def join_game(self, player_id: str):
         """Add a player to the players roster.
 
         Args:
             player_id (str): The ID of the player to add.
         """
-        if not self.lock.acquire(timeout=2):
-            raise GameError("Could not acquire game lock - operation timed out")
-        try:
-            num_players = len(self.players)
-            if num_players == 8:
-                raise GameError("Maximum number of player reached.")
+        num_players = len(self.players)
+        if num_players == 8:
+            raise GameError("Maximum number of player reached.", "full")
 
-            if self.state != State.IDLE:
-                raise GameError(f"Cannot add players, game state is {self.state}. Should be 'IDLE'")
-            if player_id not in self.players:
-                self.players[player_id] = []
-        finally:
-            self.lock.release()
+        if self.state != State.IDLE:
+            raise GameError(
+                f"Cannot add players, game state is {self.state}. Should be 'IDLE'", "state"
+            )
+        if player_id not in self.players:
+            self.players[player_id] = Rack()
+            self.boards[player_id] = Board(is_word)
+            self._record(players={player_id: 0})
 
+    @command
+    @journaled(draws=True)
     def start_game(self):
         """Starts the game by setting the number of players and divvying out tiles."""
-        if not self.lock.acquire(timeout=2):
-            raise GameError("Could not acquire game lock - operation timed out")
-        try:
-            if self.state != State.IDLE:
-                raise GameError(f"Cannot start game, game state is {self.state}. Should be 'IDLE'")
-            self.num_players = len(self.players)
-            # In test mode, allow single player games
-            if not self.test_mode and self.num_players < 2:
-                raise GameError("Need at least 2 players to start a game")
-            self._divy_out_tiles()
-            self.state = State.ACTIVE
-        finally:
-            self.lock.release()
+        if self.state != State.IDLE:
+            raise GameError(
+                f"Cannot start game, game state is {self.state}. Should be 'IDLE'", "state"
+            )
+        self.num_players = len(self.players)
+        # In test mode, allow single player games
+        if not self.test_mode and self.num_players < 2:
+            raise GameError("Need at least 2 players to start a game", "players")
+        self._divy_out_tiles()
+        self.state = State.ACTIVE
+        self._record(
+            {
+                "state": self.state.value,
+                "num_players": self.num_players,
+                "tiles_remaining": self.tiles_remaining,
+            },
+            players={player: len(rack) for player, rack in self.players.items()},
+        )
 
     def _divy_out_tiles(self):
         """Divy out the correct number of tiles to each player.
@@ -218,58 +708,65 @@ class Game:
             elif 7 <= self.num_players <= 8:
                 num_tiles = 11
             else:
-                raise GameError("Invalid number of players.")
+                raise GameError("Invalid number of players.", "players")
 
-        for player in self.players:
-            for _ in range(num_tiles):
-                if len(self.tiles) == 0:
-                    raise GameError("Not enough tiles available to distribute to all players")
-                self.players[player].append(self.tiles.pop())
+        if len(self.tiles) < num_tiles * len(self.players):
+            raise GameError("Not enough tiles available to distribute to all players", "tiles")
+        hands = self.tiles.deal(len(self.players), num_tiles)
+        for player, hand in zip(self.players, hands, strict=True):
+            self.players[player].extend(hand)
 
         self.tiles_remaining = len(self.tiles)
 
-    def peel(self, test: bool = False):
+    @command
+    @journaled(draws=True)
+    def peel(self, test: bool = False) -> Change:
         """
         Give a new tile to each player.
 
         Args:
             test (bool): Bypasses the time restriction for testing, defaults to False.
+
+        Returns:
+            Change: What the peel changed.
         """
-        if not self.lock.acquire(timeout=2):
-            raise GameError("Could not acquire game lock - operation timed out")
-        try:
-            if self.state != State.ACTIVE:
-                raise GameError(f"Cannot peel, game state is {self.state}. Should be 'ACTIVE'")
-            # Make sure a peel hasn't happened within a fraction of a second to prevent overlap
-            if (datetime.datetime.now() - self.last_peel).total_seconds() <= 0.75 and not test:
-                raise GameError("Peel occuring too frequently.")
-
-            # Update the time of the last peel
-            self.last_peel = datetime.datetime.now()
-
-            # Make sure there are enough tiles to make a peel.
-            if self.num_players is not None and self.num_players > self.tiles_remaining:
-                raise GameError("Not enough tiles to deal.")
-
-            # Check if this peel will transition to endgame
-            will_be_endgame = (
-                self.num_players is not None
-                and (self.tiles_remaining - self.num_players) < self.num_players
-            )
+        if self.state != State.ACTIVE:
+            raise GameError(f"Cannot peel, game state is {self.state}. Should be 'ACTIVE'", "state")
+        # Make sure a peel hasn't happened within a fraction of a second to prevent overlap
+        if (datetime.datetime.now() - self.last_peel).total_seconds() <= 0.75 and not test:
+            raise GameError("Peel occuring too frequently.", "too_soon")
 
-            # Give a new tile to each player.
-            for player in self.players:
-                self.players[player].append(self.tiles.pop())
-            self.tiles_remaining = len(self.tiles)
+        # Update the time of the last peel
+        self.last_peel = datetime.datetime.now()
+
+        # Make sure there are enough tiles to make a peel.
+        if self.num_players is not None and self.num_players > self.tiles_remaining:
+            raise GameError("Not enough tiles to deal.", "tiles")
 
-            # Update state if necessary
-            if will_be_endgame:
-                self.state = State.ENDGAME
+        # Check if this peel will transition to endgame
+        will_be_endgame = (
+            self.num_players is not None
+            and (self.tiles_remaining - self.num_players) < self.num_players
+        )
 
-        finally:
-            self.lock.release()
+        # Give a new tile to each player.
+        racks = {}
+        for player, tile in zip(self.players, self.tiles.draw(len(self.players)), strict=True):
+            self.players[player].append(tile)
+            racks[player] = {"add": [tile]}
+        self.tiles_remaining = len(self.tiles)
+        state = {"tiles_remaining": self.tiles_remaining}
 
-    def swap(self, letter, player):
+        # Update state if necessary
+        if will_be_endgame:
+            self.state = State.ENDGAME
+            state["state"] = self.state.value
+
+        return self._record(state, dealt=1, racks=racks)
+
+    @command
+    @journaled(draws=True)
+    def swap(self, letter, player) -> Change:
         """Swap a given tile for three tiles for a player.
 
         Args:
@@ -278,81 +775,257 @@ class Game:
 
         Raises:
             GameError: The player does not have an instance of that tile.
+
+        Returns:
+            Change: What the swap changed.
         """
-        if not self.lock.acquire(timeout=2):
-            raise GameError("Could not acquire game lock - operation timed out")
-        try:
-            if self.state not in [State.ACTIVE, State.ENDGAME]:
-                raise GameError(
-                    f"Cannot swap, game state is {self.state}. Should be 'ACTIVE' or 'ENDGAME'"
-                )
-            if letter not in self.players[player]:
-                raise GameError("Player does not have this letter to remove.")
-
-            # Check if this swap will transition to endgame
-            tiles_to_give = min(3, self.tiles_remaining)
-            will_be_endgame = (
-                self.num_players is not None
-                and (self.tiles_remaining - tiles_to_give + 1) < self.num_players
+        if self.state not in [State.ACTIVE, State.ENDGAME]:
+            raise GameError(
+                f"Cannot swap, game state is {self.state}. Should be 'ACTIVE' or 'ENDGAME'", "state"
             )
+        if letter not in self.players[player]:
+            raise GameError("Player does not have this letter to remove.", "no_tile")
+        board = self.boards.get(player)
+        if board is not None and self.players[player].count(letter) <= board.letters[letter]:
+            raise GameError("Take the letter off the board before swapping it.", "on_board")
+
+        # Check if this swap will transition to endgame
+        tiles_to_give = min(3, self.tiles_remaining)
+        will_be_endgame = (
+            self.num_players is not None
+            and (self.tiles_remaining - tiles_to_give + 1) < self.num_players
+        )
 
-            # Add new tiles to the player
-            for _ in range(tiles_to_give):
-                self.players[player].append(self.tiles.pop())
+        # Add new tiles to the player
+        drawn = self.tiles.draw(tiles_to_give)
+        self.players[player].extend(drawn)
 
-            # Remove one instance of the given letter from the player
-            self.players[player].remove(letter)
+        # Remove one instance of the given letter from the player
+        self.players[player].remove(letter)
 
-            # Add the letter back to the tile pile and shuffle
-            self.tiles.append(letter)
-            random.shuffle(self.tiles)
+        # Add the letter back to the tile pile
+        self.tiles.put(letter)
 
-            # Update number of tiles
-            self.tiles_remaining = len(self.tiles)
+        # Update number of tiles
+        self.tiles_remaining = len(self.tiles)
+        state = {"tiles_remaining": self.tiles_remaining}
 
-            # Update state if necessary
-            if will_be_endgame:
-                self.state = State.ENDGAME
-        finally:
-            self.lock.release()
+        # Update state if necessary
+        if will_be_endgame:
+            self.state = State.ENDGAME
+            state["state"] = self.state.value
+
+        return self._record(
+            state,
+            players={player: len(self.players[player])},
+            racks={player: {"add": drawn, "remove": [letter]}},
+        )
 
-    def bananagrams(self, player_id: str, word_list: list[str]):
+    @command
+    @journaled
+    def bananagrams(
+        self,
+        player_id: str,
+        word_list: list[str] | None = None,
+        board: list[str] | list[tuple[int, int, str]] | None = None,
+    ) -> Verdict:
         """
         End the game (someone has bananagrams)
 
+        The player's board is checked against their tiles: it must use every tile
+        exactly once, be a single connected group and every run on it must be a
+        word. The board is the one the player claims, or the one the server has
+        tracked from their tile placements.
+
         Args:
             player_id (str): The ID of the potentially winning player.
-            word_list (List[str]): The list of the winning words.
+            word_list (List[str], optional): The list of the winning words. Defaults to
+                the words on the board.
+            board (List[str] | List[Tuple[int, int, str]], optional): The claimed board,
+                either as rows of text or as the (row, column, letter) of each tile.
+
+        Raises:
+            GameError: The player is not in the game, or the claimed board is malformed.
+
+        Returns:
+            Verdict: The outcome of checking the board.
         """
-        if not self.lock.acquire(timeout=2):
-            raise GameError("Could not acquire game lock - operation timed out")
-        try:
-            winning_words = []
-            if self.state != State.ENDGAME:
+        if self.state != State.ENDGAME:
+            raise GameError(
+                f"Cannot call bananagrams, game state is {self.state}. Should be 'ENDGAME'", "state"
+            )
+        if player_id not in self.players:
+            raise GameError(f"Player {player_id} is not in the game.", "no_player")
+
+        if board is None:
+            claimed = self.boards[player_id]
+        else:
+            rows = all(isinstance(row, str) for row in board)
+            # Refuse a board with more tiles than the player has before checking it,
+            # as checking a huge board keeps the game busy for seconds
+            if rows:
+                tiles = sum(len(row) - row.count(" ") - row.count(".") for row in board)
+            else:
+                tiles = len(board)
+            if tiles > len(self.players[player_id]) + len(self.boards[player_id]):
                 raise GameError(
-                    f"Cannot call bananagrams, game state is {self.state}. Should be 'ENDGAME'"
+                    f"The board has {tiles} tiles, more than player {player_id} has.", "board"
                 )
-            self.state = State.OVER
-            self.winning_player = player_id
+            if rows:
+                board = grid_placements(board)
+            try:
+                claimed = Board.from_placements(board, is_word)
+            except BoardError as e:
+                raise GameError(str(e), "board") from e
+        verdict = claimed.verify(self.players[player_id])
+
+        self.state = State.OVER
+        self.winning_player = player_id
+        self.verdict = verdict
+
+        # Check each of the winning words against the dictionary
+        if word_list is None:
+            word_list = verdict.words
+        self.winning_words = validate_words(word_list)
+        self._record(self._end_state())
+        return verdict
+
+    @command
+    def rack(self, player_id: str) -> list[str]:
+        """Get a copy of a player's tiles.
+
+        Args:
+            player_id (str): The ID of the player.
+
+        Raises:
+            GameError: The player is not in the game.
+
+        Returns:
+            List[str]: The player's tiles.
+        """
+        if player_id not in self.players:
+            raise GameError(f"Player {player_id} is not in the game.", "no_player")
+        return self.players[player_id].letters()
+
+    def find_words(self, player_id: str, pattern: str, limit: int | None = None) -> list[str]:
+        """Find the words that fit a pattern using a player's tiles.
+
+        Args:
+            player_id (str): The ID of the player whose tiles fill the pattern.
+            pattern (str): The pattern to match, e.g. ``"??A?E"`` where ``?`` is a
+                tile from the player's rack and letters are already on the board.
+            limit (int, optional): The maximum number of words to return.
+
+        Raises:
+            GameError: The player is not in the game or the pattern is invalid.
+
+        Returns:
+            List[str]: The matching words, in alphabetical order.
+        """
+        # Search outside of the mailbox, the rack is a copy
+        rack = self.rack(player_id)
+        try:
+            return WORDS.match(pattern, rack, limit)
+        except DictionaryError as e:
+            raise GameError(str(e), "dictionary") from e
+
+    def _board(self, player_id: str) -> Board:
+        """Get a player's board while the game is being played. Call from a command."""
+        if self.state not in [State.ACTIVE, State.ENDGAME]:
+            raise GameError(
+                f"Cannot change the board, game state is {self.state}. Should be 'ACTIVE' or 'ENDGAME'",
+                "state",
+            )
+        if player_id not in self.boards:
+            raise GameError(f"Player {player_id} is not in the game.", "no_player")
+        return self.boards[player_id]
+
+    @command
+    @journaled
+    def place_tile(
+        self, player_id: str, row: int, col: int, letter: str, tile_id: str | None = None
+    ) -> dict[str, Any]:
+        """Place one of a player's tiles on their board.
+
+        Args:
+            player_id (str): The ID of the player.
+            row (int): The row to place the tile in.
+            col (int): The column to place the tile in.
+            letter (str): The letter of the tile.
+            tile_id (str, optional): The client's ID of the tile.
+
+        Raises:
+            GameError: The player has no such tile left to place, or the cell is taken.
+
+        Returns:
+            Dict[str, Any]: A summary of the player's board.
+        """
+        board = self._board(player_id)
+        letter = letter.upper()
+        if self.players[player_id].count(letter) <= board.letters[letter]:
+            raise GameError(f"Player has no {letter} tile left to place.", "no_tile")
+        try:
+            board.place(row, col, letter, tile_id)
+        except BoardError as e:
+            raise GameError(str(e), "board") from e
+        return board.summary(len(self.players[player_id]))
+
+    @command
+    @journaled
+    def move_tiles(self, player_id: str, moves: list[tuple[int, int, int, int]]) -> dict[str, Any]:
+        """Move tiles around a player's board, all at once.
 
-            # Iterate over the winning words and check each against the dictionary
-            for word in word_list:
-                winning_words.append((word, word.upper() in WORDS))
-            self.winning_words = winning_words
-        finally:
-            self.lock.release()
+        Args:
+            player_id (str): The ID of the player.
+            moves (List[Tuple[int, int, int, int]]): (from row, from column, to row,
+                to column) of each tile.
 
+        Raises:
+            GameError: A source cell is empty or a target cell is taken.
+
+        Returns:
+            Dict[str, Any]: A summary of the player's board.
+        """
+        board = self._board(player_id)
+        try:
+            board.move(moves)
+        except BoardError as e:
+            raise GameError(str(e), "board") from e
+        return board.summary(len(self.players[player_id]))
+
+    @command
+    @journaled
+    def remove_tile(self, player_id: str, row: int, col: int) -> dict[str, Any]:
+        """Take a tile off a player's board and back to their rack.
+
+        Args:
+            player_id (str): The ID of the player.
+            row (int): The row of the tile.
+            col (int): The column of the tile.
+
+        Raises:
+            GameError: The cell is empty.
+
+        Returns:
+            Dict[str, Any]: A summary of the player's board.
+        """
+        board = self._board(player_id)
+        try:
+            board.remove(row, col)
+        except BoardError as e:
+            raise GameError(str(e), "board") from e
+        return board.summary(len(self.players[player_id]))
+
+    @command
+    @journaled
     def continue_game(self):
         """Continue the game (false alarm on banagrams)"""
-        if not self.lock.acquire(timeout=2):
-            raise GameError("Could not acquire game lock - operation timed out")
-        try:
-            if self.state != State.OVER:
-                raise GameError(
-                    f"Cannot continue game, game state is {self.state}. Should be 'OVER'"
-                )
-            self.state = State.ENDGAME
-            self.winning_player = None
-            self.winning_words = None
-        finally:
-            self.lock.release()
+        if self.state != State.OVER:
+            raise GameError(
+                f"Cannot continue game, game state is {self.state}. Should be 'OVER'", "state"
+            )
+        self.state = State.ENDGAME
+        self.winning_player = None
+        self.winning_words = None
+        self.verdict = None
+        self._record(self._end_state())
@@ -0,0 +1,210 @@
+"""Idle games, packed away in SQLite until someone comes back to them.
+
+A game that has gone quiet is packed with ``Game.retire`` (a few hundred
+bytes of MessagePack) into a single table keyed by the game's name, and
+taken out of memory. The first event that names it again brings it back with
+``Game.from_bytes``: one primary key lookup and an unpack, timed so that slow
+resumes show up in the logs.
+
+With a journal, games leave it while they are on disk. The ``retire`` entry is
+only made once the game is saved, and the ``restore`` entry is on disk before
+the game is deleted here, so a crash in between leaves the game in both places
+rather than neither, and the journal's copy wins.
+
+Every statement commits, and a commit waits on the disk, so under eventlet
+the statements run through ``hubwatch.off_hub`` on a real OS thread. They
+take turns on the one connection under a green lock, which parks the
+handlers waiting for it rather than blocking the hub.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Hashable
+from typing import TYPE_CHECKING, Any
+
+import simplejson
+
+from game import Game, GameError
+from hubwatch import off_hub
+
+if TYPE_CHECKING:
+    from journal import Journal
+
+logger = logging.getLogger(__name__)
+
+# Resumes slower than this many seconds are logged
+RESUME_BUDGET = 0.05
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    name TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    hibernated REAL NOT NULL
+)
+"""
+
+
+class Hibernator:
+    """The games that are packed away on disk.
+
+    Attributes:
+        path (str): The SQLite database, or ":memory:".
+        hibernated (int): The number of games packed away.
+        resumed (int): The number of games brought back.
+        resume_seconds (float): The total time spent bringing games back.
+        slowest_resume (float): The longest time spent bringing back one game.
+        journal (Journal): Where games are recorded leaving and coming back, or None.
+    """
+
+    def __init__(self, path: str, journal: "Journal | None" = None):
+        self.path = path
+        self.journal = journal
+        # One connection, shared by the handlers and the scheduler's thread
+        self._db = sqlite3.connect(path, timeout=1, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            if path != ":memory:":
+                self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(_SCHEMA)
+        self.hibernated = 0
+        self.resumed = 0
+        self.resume_seconds = 0.0
+        self.slowest_resume = 0.0
+
+    @staticmethod
+    def _key(name: Hashable) -> str:
+        # Games can be named by numbers as well as strings, 1 and "1" are different
+        return simplejson.dumps(name)
+
+    def _execute(
+        self,
+        sql: str,
+        parameters: tuple = (),
+        result: Callable[[sqlite3.Cursor], Any] | None = None,
+    ) -> Any:
+        """Run a statement in its own transaction, off the hub.
+
+        Args:
+            sql (str): The statement.
+            parameters (tuple): Its parameters.
+            result (Callable[[sqlite3.Cursor], Any], optional): Reads the result from
+                the cursor, before the transaction commits.
+
+        Returns:
+            Any: What ``result`` read, or None without it.
+        """
+
+        def run() -> Any:
+            with self._db:
+                cursor = self._db.execute(sql, parameters)
+                return result(cursor) if result is not None else None
+
+        with self._lock:
+            return off_hub(run)
+
+    def __len__(self) -> int:
+        return self._execute("SELECT COUNT(*) FROM games", result=lambda c: c.fetchone()[0])
+
+    def __contains__(self, name: Hashable) -> bool:
+        row = self._execute(
+            "SELECT 1 FROM games WHERE name = ?", (self._key(name),), lambda c: c.fetchone()
+        )
+        return row is not None
+
+    def names(self) -> list[Hashable]:
+        """The names of every game on disk."""
+        rows = self._execute("SELECT name FROM games", result=lambda c: c.fetchall())
+        return [simplejson.loads(name) for (name,) in rows]
+
+    def save(self, name: Hashable, game: Game) -> bool:
+        """Pack a game away. The game takes no more commands afterwards.
+
+        Args:
+            name (Hashable): The name the game is registered under.
+            game (Game): The game.
+
+        Returns:
+            bool: Whether the game was saved. It is not when it is too busy to
+                be packed, or cannot be written, and it carries on in memory.
+        """
+        # Retired as it is packed, so that no command can slip in between
+        try:
+            data = game.retire()
+        except GameError:
+            logger.warning(f"Could not hibernate the game named {name}, it is busy.")
+            return False
+        try:
+            self._execute(
+                "INSERT OR REPLACE INTO games VALUES (?, ?, ?)",
+                (self._key(name), data, time.time()),
+            )
+        except sqlite3.Error:
+            # Nothing ran on the game since it was packed, so it carries on as it was
+            game.retired = False
+            logger.error(f"Could not hibernate the game named {name}.", exc_info=True)
+            return False
+        if self.journal is not None:
+            self.journal.append(name, "retire")
+        self.hibernated += 1
+        return True
+
+    def restore(self, name: Hashable) -> Game | None:
+        """Take a game off disk.
+
+        Args:
+            name (Hashable): The name of the game.
+
+        Returns:
+            Game: The game, or None when there is no such game on disk.
+        """
+        start = time.perf_counter()
+        if self.journal is None:
+            row = self._execute(
+                "DELETE FROM games WHERE name = ? RETURNING data",
+                (self._key(name),),
+                lambda c: c.fetchone(),
+            )
+            if row is None:
+                return None
+            game = Game.from_bytes(row[0])
+        else:
+            row = self._execute(
+                "SELECT data FROM games WHERE name = ?", (self._key(name),), lambda c: c.fetchone()
+            )
+            if row is None:
+                return None
+            game = Game.from_bytes(row[0])
+            game.journal = self.journal
+            game.journal_seq = self.journal.append(name, "restore", row, sync=True)
+            self.discard(name)
+
+        seconds = time.perf_counter() - start
+        self.resumed += 1
+        self.resume_seconds += seconds
+        self.slowest_resume = max(self.slowest_resume, seconds)
+        if seconds > RESUME_BUDGET:
+            logger.warning(f"Resuming the game named {name} took {seconds * 1000:.1f} ms.")
+        return game
+
+    def discard(self, name: Hashable):
+        """Delete a game from disk, if it is there.
+
+        Args:
+            name (Hashable): The name of the game.
+        """
+        self._execute("DELETE FROM games WHERE name = ?", (self._key(name),))
+
+    def purge(self, older_than: float) -> int:
+        """Delete the games that have been on disk for too long.
+
+        Args:
+            older_than (float): The ``time.time()`` before which games were hibernated.
+
+        Returns:
+            int: The number of games deleted.
+        """
+        return self._execute(
+            "DELETE FROM games WHERE hibernated < ?", (older_than,), lambda c: c.rowcount
+        )
@@ -0,0 +1,168 @@
+"""Find the words a player can build from their rack.
+
+Every dictionary word is precomputed as a row of 26 letter counts, plus a bit
+mask of which letters it contains. A word can be built from a rack when none of
+its counts exceed the rack's, so answering a query is a couple of vectorized
+comparisons over the whole dictionary instead of a Python loop over 279k words:
+
+1. words longer than the rack are cut off (rows are ordered by length),
+2. words containing a letter the rack does not have are dropped with one bit
+   mask comparison,
+3. the few thousand survivors have their counts compared against the rack.
+"""
+
+from collections.abc import Iterable, Mapping
+from threading import Lock
+
+import numpy as np
+
+from dictionary import Dictionary
+from game import WORDS
+from tiles import TILE_FREQUENCIES, Rack
+
+# How each ranking scores a word
+RANKINGS = ("length", "letters")
+
+# Weight of each letter when ranking by letters used, rarer tiles are worth more
+_LETTER_WEIGHTS = np.zeros(26, dtype=np.float32)
+for _count, _letters in TILE_FREQUENCIES.items():
+    for _letter in _letters:
+        _LETTER_WEIGHTS[ord(_letter) - 65] = 1 / _count
+
+
+class HintEngine:
+    """Letter count matrix of a dictionary.
+
+    Attributes:
+        counts (np.ndarray): (words, 26) matrix of letter counts.
+        masks (np.ndarray): Bit mask of the letters in each word.
+        lengths (np.ndarray): Length of each word, in ascending order.
+    """
+
+    def __init__(self, dictionary: Dictionary):
+        self._groups = [dictionary.groups[length] for length in sorted(dictionary.groups)]
+        n = sum(group.count for group in self._groups)
+
+        self.counts = np.zeros((n, 26), dtype=np.uint8)
+        self.lengths = np.empty(n, dtype=np.uint8)
+        self._starts = np.empty(len(self._groups), dtype=np.int64)
+        row = 0
+        for i, group in enumerate(self._groups):
+            letters = np.frombuffer(group.records(), dtype=np.uint8).reshape(
+                group.count, group.length
+            )
+            rows = np.arange(row, row + group.count)
+            for column in range(group.length):
+                self.counts[rows, letters[:, column] - 65] += 1
+            self.lengths[row : row + group.count] = group.length
+            self._starts[i] = row
+            row += group.count
+
+        bits = np.left_shift(np.uint32(1), np.arange(26, dtype=np.uint32))
+        self.masks = ((self.counts > 0) * bits).sum(axis=1, dtype=np.uint32)
+        self._letter_scores = self.counts @ _LETTER_WEIGHTS
+
+    def _word(self, row: int) -> str:
+        i = int(np.searchsorted(self._starts, row, side="right")) - 1
+        return self._groups[i][row - int(self._starts[i])].decode("ascii")
+
+    def words_for_rack(
+        self, rack: Iterable[str], limit: int | None = None, rank: str = "length"
+    ) -> list[str]:
+        """Find the words that can be built from a rack.
+
+        Args:
+            rack (Iterable[str]): The letters in the rack.
+            limit (int, optional): Only return the best ``limit`` words.
+            rank (str): ``"length"`` to rank longer words first, or ``"letters"`` to
+                rank words by the letters they use, where rarer tiles count for more.
+                Defaults to ``"length"``.
+
+        Returns:
+            List[str]: The words, best first.
+        """
+        return self.words_for_racks([rack], limit, rank)[0]
+
+    def words_for_racks(
+        self, racks: Iterable[Iterable[str]], limit: int | None = None, rank: str = "length"
+    ) -> list[list[str]]:
+        """Find the words that can be built from each of a batch of racks.
+
+        Args:
+            racks (Iterable[Iterable[str]]): The letters in each rack.
+            limit (int, optional): Only return the best ``limit`` words of each rack.
+            rank (str): How to order the words, see ``words_for_rack``.
+
+        Raises:
+            ValueError: Unknown ranking.
+
+        Returns:
+            List[List[str]]: The words of each rack, best first.
+        """
+        if rank not in RANKINGS:
+            raise ValueError(f"Unknown ranking {rank!r}, expected one of {RANKINGS}.")
+        rack_counts = np.array([_rack_counts(rack) for rack in racks], dtype=np.uint8)
+        if not len(rack_counts):
+            return []
+        bits = np.left_shift(np.uint32(1), np.arange(26, dtype=np.uint32))
+        rack_masks = ((rack_counts > 0) * bits).sum(axis=1, dtype=np.uint32)
+
+        results = []
+        for counts, mask in zip(rack_counts, rack_masks, strict=True):
+            # Rows are sorted by length, so words longer than the rack are a suffix
+            end = int(np.searchsorted(self.lengths, counts.sum(), side="right"))
+            rows = np.flatnonzero((self.masks[:end] & ~mask) == 0)
+            rows = rows[(self.counts[rows] <= counts).all(axis=1)]
+
+            if rank == "length":
+                scores = self.lengths[rows].astype(np.float32)
+            else:
+                scores = self._letter_scores[rows]
+            if limit is not None and limit < len(rows):
+                best = np.argpartition(-scores, limit - 1)[:limit]
+                rows, scores = rows[best], scores[best]
+            # Best score first, ties in dictionary order
+            rows = rows[np.lexsort((rows, -scores))]
+            results.append([self._word(int(row)) for row in rows])
+        return results
+
+    def words_for_players(
+        self, racks: Mapping[str, Iterable[str]], limit: int | None = None, rank: str = "length"
+    ) -> dict[str, list[str]]:
+        """Find the words each player in a game can build, in one call.
+
+        Args:
+            racks (Mapping[str, Iterable[str]]): The rack of each player.
+            limit (int, optional): Only return the best ``limit`` words of each player.
+            rank (str): How to order the words, see ``words_for_rack``.
+
+        Returns:
+            Dict[str, List[str]]: The words of each player, best first.
+        """
+        players = list(racks)
+        words = self.words_for_racks([racks[player] for player in players], limit, rank)
+        return dict(zip(players, words, strict=True))
+
+
+def _rack_counts(rack: Iterable[str]) -> list[int]:
+    if isinstance(rack, Rack):
+        return list(rack.counts)
+    counts = [0] * 26
+    for letter in rack:
+        if len(letter) == 1 and "A" <= letter.upper() <= "Z":
+            counts[ord(letter.upper()) - 65] += 1
+    return counts
+
+
+_engine: HintEngine | None = None
+_engine_lock = Lock()
+
+
+def get_engine() -> HintEngine:
+    """Return the hint engine of the game dictionary, building it on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = HintEngine(WORDS.get())
+    return _engine
@@ -0,0 +1,162 @@
+"""Finds the code that blocks the eventlet hub.
+
+The server runs every socket handler as a green thread of a single eventlet
+hub, so a handler that blocks (on the disk, a real lock or a long
+computation) stalls every room until it returns. ``HubWatchdog`` measures
+how long the hub takes to get back to a green thread that sleeps for
+``INTERVAL`` seconds: that lag is what every event waits on top of its own
+work.
+
+The green thread cannot see what blocked the hub, as it only runs again once
+the hub is free. So a real OS thread, outside of eventlet, checks that the
+green thread keeps beating, and when it misses a beat by more than the
+threshold, takes the stack of the hub's thread while it is still blocked,
+with the socket event it is handling. Once the hub is back, the green thread
+logs the stall with that stack. The OS thread never logs itself, as logging
+takes green locks, which only the hub's thread can use.
+
+Code that has to block on the disk, like the journal and the hibernated
+games, goes through ``off_hub``, which hands it to a real OS thread of
+``eventlet.tpool`` and lets the hub carry on until it returns.
+"""
+
+import logging
+import sys
+import time
+import traceback
+from collections.abc import Callable
+from types import FrameType
+from typing import TypeVar
+
+import eventlet
+from eventlet import patcher, tpool
+
+from metrics import Registry
+
+# The threading module eventlet leaves alone, for a thread the hub cannot block
+_threading = patcher.original("threading")
+
+logger = logging.getLogger(__name__)
+
+# Seconds between beats of the watchdog's green thread
+INTERVAL = 0.05
+
+# Seconds the hub can be blocked before the stall is reported
+STALL = 0.25
+
+# Seconds, from the lag of a busy hub to a stall every room notices
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+T = TypeVar("T")
+
+
+def off_hub(function: Callable[[], T]) -> T:
+    """Call a function that blocks on the disk, on a real OS thread under eventlet.
+
+    Without monkey patching there is no hub to keep free, and the function is
+    called directly. Locks the function takes must come from the threading
+    module eventlet leaves alone.
+
+    Args:
+        function (Callable[[], T]): What to call.
+
+    Returns:
+        T: What the function returned. What it raised is raised here.
+    """
+    if patcher.is_monkey_patched("thread"):
+        return tpool.execute(function)
+    return function()
+
+
+class HubWatchdog:
+    """Measures the lag of the eventlet hub, and reports what blocks it.
+
+    Attributes:
+        interval (float): Seconds between beats of the green thread.
+        threshold (float): Seconds the hub can be blocked before it is reported.
+        describe (Callable[[FrameType], str | None], optional): What the hub's
+            thread is doing, from its innermost frame, such as the socket event
+            it is handling. See ``events.running_event``.
+        lag (metrics.Histogram): Seconds each beat came late.
+        stalls (metrics.Counter): The number of times the hub was blocked for
+            longer than ``threshold``.
+    """
+
+    def __init__(
+        self,
+        metrics: Registry | None = None,
+        threshold: float = STALL,
+        interval: float = INTERVAL,
+        describe: Callable[[FrameType], str | None] | None = None,
+    ):
+        metrics = metrics if metrics is not None else Registry()
+        self.interval = interval
+        self.threshold = threshold
+        self.describe = describe
+        self.lag = metrics.histogram(
+            "bananagrams_hub_lag_seconds",
+            "Time the eventlet hub took past when a green thread was due to run.",
+            buckets=LAG_BUCKETS,
+        )
+        self.stalls = metrics.counter(
+            "bananagrams_hub_stalls_total",
+            "Times the eventlet hub was blocked for longer than the stall threshold.",
+        )
+        self._beat = time.monotonic()
+        # What the hub's thread was doing when last seen stalled, for the next beat
+        self._stalled: tuple[str | None, str] | None = None
+        self._hub_thread: int | None = None
+        self._stop = _threading.Event()
+        self._watcher: _threading.Thread | None = None
+
+    def start(self):
+        """Start the green thread on the hub of the calling thread, and the OS thread."""
+        self._hub_thread = _threading.get_ident()
+        self._beat = time.monotonic()
+        eventlet.spawn(self._beat_forever)
+        self._watcher = _threading.Thread(target=self._watch_forever, daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        """Stop both threads. The green thread stops at its next beat."""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+
+    def _beat_forever(self):
+        while not self._stop.is_set():
+            due = time.monotonic() + self.interval
+            eventlet.sleep(self.interval)
+            self._beat = now = time.monotonic()
+            lag = max(now - due, 0.0)
+            self.lag.observe(lag)
+            if lag > self.threshold:
+                self._report(lag)
+            else:
+                self._stalled = None
+
+    def _report(self, lag: float):
+        self.stalls.inc()
+        stalled, self._stalled = self._stalled, None
+        event, stack = stalled if stalled is not None else (None, "")
+        logger.warning(
+            "The eventlet hub was blocked for %.0f ms, handling %s.%s",
+            lag * 1000,
+            event or "no socket event",
+            f" Blocked at:\n{stack}" if stack else "",
+            extra={"event": event, "lag": lag},
+        )
+
+    def _watch_forever(self):
+        """Take the stack of the hub's thread when it misses a beat. Runs outside eventlet."""
+        while not self._stop.wait(self.interval):
+            if self._stalled is not None:
+                # Already taken for this stall
+                continue
+            if time.monotonic() - self._beat < self.interval + self.threshold:
+                continue
+            frame = sys._current_frames().get(self._hub_thread)  # type: ignore[arg-type]
+            if frame is None:
+                continue
+            event = self.describe(frame) if self.describe is not None else None
+            self._stalled = (event, "".join(traceback.format_stack(frame)))
@@ -0,0 +1,297 @@
+"""A write-ahead journal of game commands, to bring games back after a restart.
+
+Every command that changes a game is appended to the journal once it has
+succeeded. A game's tiles come from its seeded ``tiles.SeededRandom``: the
+entry that creates a game records the seed, and the entry of a command that
+draws tiles records how many draws the game had made before it, so replaying
+the journal in order rebuilds each game exactly.
+
+Appending only adds the entry to a buffer. A background thread writes the
+buffer out and fsyncs it every ``FLUSH_INTERVAL`` seconds, so one fsync covers
+every command made in that time (group commit) and a crash loses at most the
+last interval.
+
+Under eventlet that thread is a green thread, and a green thread blocked on
+the disk blocks the whole hub. So every write and fsync, whether from the
+background thread, an append that has to wait for the disk or a snapshot,
+is handed to ``eventlet.tpool`` and runs on a real OS thread while the hub
+carries on. The locks those writes take are therefore real locks, from the
+threading module eventlet leaves alone. The hub only ever waits on them for
+the moment it takes to swap the buffer.
+
+The journal is a directory of numbered segment files, each a stream of
+MessagePack entries. A snapshot starts a new segment, then packs every game in
+memory with ``Game.pack``. Each packed game carries the sequence number of its
+last entry, so replay starts from the snapshot, skips the entries it already
+covers and the segments before it can be deleted. Recovery therefore only
+replays the commands made since the last snapshot.
+
+Games are kept out of the journal while they are hibernated:
+``hibernate.Hibernator`` records a ``retire`` entry once a game is safely on
+disk, and a ``restore`` entry carrying the packed game before it takes one off.
+"""
+
+import logging
+import os
+import threading
+from collections.abc import Callable, Hashable, Iterable
+from typing import Any
+
+import msgpack
+from eventlet import patcher
+
+from game import Game, GameError
+from hubwatch import off_hub
+
+# The threading module eventlet leaves alone, for locks held by tpool's threads
+_threading = patcher.original("threading")
+
+logger = logging.getLogger(__name__)
+
+# Seconds between writes of the journal to disk
+FLUSH_INTERVAL = 0.05
+
+# Write the journal straight away once this many bytes are waiting
+FLUSH_BYTES = 1 << 20
+
+SNAPSHOT = "snapshot.msgpack"
+
+
+class Journal:
+    """The journal of every game, in a directory.
+
+    Call ``recover`` before journaling any games, then ``start`` to flush the
+    journal in the background.
+
+    Attributes:
+        directory (str): Where the segments and the snapshot are kept.
+        segment (int): The number of the segment being appended to.
+        seq (int): The sequence number of the last entry.
+        entries (int): The number of entries appended.
+        flushes (int): The number of times the journal was written and fsynced.
+        snapshots (int): The number of snapshots taken.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        # Appends only wait on the buffer, never on the disk
+        self._lock = _threading.Lock()
+        self._pending = bytearray()
+        # Held while writing to the current segment, only ever off the hub
+        self._flush_lock = _threading.Lock()
+        segments = self._segments()
+        # Always a new segment, never one cut short by a crash
+        self.segment = segments[-1] + 1 if segments else 1
+        self._file = open(self._path(self.segment), "ab")  # noqa: SIM115
+        self.seq = 0
+        self.entries = 0
+        self.flushes = 0
+        self.snapshots = 0
+        self._stop = threading.Event()
+        self._flusher: threading.Thread | None = None
+
+    def _path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{segment:08d}.log")
+
+    def _segments(self) -> list[int]:
+        """The numbers of the segments on disk, in order."""
+        return sorted(
+            int(name[:-4])
+            for name in os.listdir(self.directory)
+            if name.endswith(".log") and name[:-4].isdigit()
+        )
+
+    def append(
+        self,
+        name: Hashable,
+        command: str,
+        args: Iterable[Any] = (),
+        kwargs: dict[str, Any] | None = None,
+        draws: int | None = None,
+        sync: bool = False,
+    ) -> int:
+        """Add an entry to the journal.
+
+        Args:
+            name (Hashable): The name of the game.
+            command (str): The command, see ``Game.replay``, or one of "create",
+                "retire" and "restore".
+            args (Iterable[Any]): The positional arguments of the command.
+            kwargs (Dict[str, Any], optional): The keyword arguments of the command.
+            draws (int, optional): The game's ``rng.draws`` before the command, for
+                commands that draw tiles.
+            sync (bool): Whether to wait for the entry to be on disk. Defaults to
+                False, the entry is written with the next flush.
+
+        Returns:
+            int: The sequence number of the entry.
+        """
+        with self._lock:
+            self.seq += 1
+            seq = self.seq
+            self._pending += msgpack.packb([seq, name, command, list(args), kwargs or {}, draws])
+            self.entries += 1
+            full = len(self._pending) >= FLUSH_BYTES
+        if sync or full:
+            off_hub(self.flush)
+        return seq
+
+    def flush(self):
+        """Write every entry appended so far to disk, with a single fsync.
+
+        This blocks on the disk, under eventlet call it through ``hubwatch.off_hub``.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, bytearray()
+            if pending:
+                self._file.write(pending)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self.flushes += 1
+
+    def _flush_forever(self):
+        while not self._stop.wait(FLUSH_INTERVAL):
+            try:
+                off_hub(self.flush)
+            except OSError:
+                logger.error("Could not write the game journal", exc_info=True)
+
+    def start(self):
+        """Flush the journal every ``FLUSH_INTERVAL`` seconds, in a background thread."""
+        self._flusher = threading.Thread(target=self._flush_forever, daemon=True)
+        self._flusher.start()
+
+    def close(self):
+        """Stop flushing in the background and write out what is left."""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        # On the way out, when blocking the hub no longer matters
+        self.flush()
+        self._file.close()
+
+    def snapshot(self, games: Callable[[], Iterable[Game]]) -> bool:
+        """Save every game in memory, and delete the segments the snapshot covers.
+
+        Args:
+            games (Callable[[], Iterable[Game]]): Gives every game in memory. It is
+                called once the new segment is started, as a game made or restored
+                before then, even while the segment is being started, has entries
+                in the segments that are deleted.
+
+        Returns:
+            bool: Whether the snapshot was taken. It is not when a game is too busy
+                to be packed, as the game would be lost with the old segments.
+        """
+        segment = off_hub(self._next_segment)
+        packed = []
+        for game in games():
+            try:
+                packed.append(game.pack())
+            except GameError:
+                if game.retired:
+                    # Hibernated, with its retire entry in the new segment
+                    continue
+                logger.warning(f"Could not snapshot the game named {game.id}, it is busy.")
+                return False
+
+        data = msgpack.packb({"segment": segment, "seq": self.seq, "games": packed})
+        off_hub(lambda: self._write_snapshot(segment, data))
+        self.snapshots += 1
+        return True
+
+    def _next_segment(self) -> int:
+        """Write out what is left of the current segment and start the next one."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, bytearray()
+            self._file.write(pending)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self.segment += 1
+            self._file = open(self._path(self.segment), "ab")  # noqa: SIM115
+            return self.segment
+
+    def _write_snapshot(self, segment: int, data: bytes):
+        """Replace the snapshot, then delete the segments before the one it starts at."""
+        path = os.path.join(self.directory, SNAPSHOT)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        self._sync_directory()
+
+        for old in self._segments():
+            if old < segment:
+                os.remove(self._path(old))
+
+    def _sync_directory(self):
+        # Make the rename itself durable, where the platform allows it
+        if hasattr(os, "O_DIRECTORY"):
+            fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def recover(self) -> dict[Hashable, Game]:
+        """Rebuild the games from the latest snapshot and the segments after it.
+
+        Returns:
+            Dict[Hashable, Game]: The games that were in memory, by name, journaled
+                here from now on.
+        """
+        games: dict[Hashable, Game] = {}
+        first = 0
+        path = os.path.join(self.directory, SNAPSHOT)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                snapshot = msgpack.unpackb(f.read(), strict_map_key=False)
+            first, self.seq = snapshot["segment"], snapshot["seq"]
+            for data in snapshot["games"]:
+                game = Game.from_bytes(data)
+                games[game.id] = game
+
+        replayed = 0
+        for segment in self._segments():
+            if first <= segment < self.segment:
+                replayed += self._replay(segment, games)
+        for game in games.values():
+            game.journal = self
+        logger.info(f"Recovered {len(games)} games, replaying {replayed} journal entries.")
+        return games
+
+    def _replay(self, segment: int, games: dict[Hashable, Game]) -> int:
+        """Apply the entries of one segment to the games. Returns how many were applied."""
+        replayed = 0
+        with open(self._path(segment), "rb") as f:
+            entries = msgpack.Unpacker(f, strict_map_key=False)
+            try:
+                # An entry cut short by a crash ends the segment
+                for seq, name, command, args, kwargs, draws in entries:
+                    self.seq = max(self.seq, seq)
+                    game = games.get(name)
+                    if game is not None and seq <= game.journal_seq:
+                        # Already in the snapshot
+                        continue
+                    replayed += 1
+                    if command == "create":
+                        games[name] = Game(name, *args, **kwargs)
+                        games[name].journal_seq = seq
+                    elif command == "restore":
+                        games[name] = Game.from_bytes(args[0])
+                        games[name].journal_seq = seq
+                    elif command == "retire":
+                        games.pop(name, None)
+                    elif game is not None:
+                        try:
+                            game.replay(seq, command, args, kwargs, draws)
+                        except GameError:
+                            logger.error(f"Could not replay {command} on {name}.", exc_info=True)
+            except (ValueError, msgpack.UnpackException):
+                logger.error(f"Damaged entry in journal segment {segment}, skipping the rest.")
+        return replayed
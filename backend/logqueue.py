@@ -0,0 +1,211 @@
+"""Logging that stays off the request path.
+
+Handlers only put records on a queue, through a ``QueueHandler``. A
+``QueueListener`` on its own thread formats them and writes them out: as one
+JSON object per line to a log file that rotates by size, and as plain text to
+stdout. A socket event that logs therefore never waits on the disk, and
+tracebacks are only formatted on the listener's thread.
+
+Under eventlet that thread has to be a real OS thread, outside of the hub: a
+green thread writing to the disk would block every other one. So the queue,
+the listener's thread and the locks of the handlers it writes with all come
+from the modules eventlet leaves alone, as in hubwatch.py. The queue is a
+``SimpleQueue``, which takes no Python lock to put a record on it.
+
+Records can name the socket event they come from with ``extra={"event":
+...}``. Busy events are sampled, keeping one record in every ``n``, and every
+event (or logger, for records without one) is rate limited with a token
+bucket, so a flood of errors from one event cannot swamp the log. Records
+are sampled and limited before they are queued, so the ones dropped cost a
+counter and nothing more. The next record let through says how many were
+dropped before it.
+"""
+
+import json
+import logging
+import logging.handlers
+import sys
+import threading
+import time
+from collections.abc import Hashable, Iterable, Mapping
+from typing import Any
+
+from eventlet import patcher
+
+# The modules eventlet leaves alone, for a thread the hub cannot block
+_queue = patcher.original("queue")
+_threading = patcher.original("threading")
+
+# Size of the log file before it is rotated, and the number of old files kept
+MAX_BYTES = 10 << 20
+BACKUPS = 5
+
+# Records a second let through for each event, and the burst allowed above that
+RATE = 50.0
+BURST = 100
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# The attributes every LogRecord has, to tell them from those given in ``extra``
+_STANDARD = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as a single line of JSON.
+
+    Besides the time, level, logger and message, the line has every field
+    given in ``extra`` and the formatted traceback, if any.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        line: dict[str, Any] = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD:
+                line[key] = value
+        if record.exc_info:
+            line["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            line["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(line, default=str)
+
+
+class SampleFilter(logging.Filter):
+    """Samples and rate limits records, by the event they come from.
+
+    Warnings and errors are never sampled, only rate limited.
+
+    Attributes:
+        sample (Mapping[str, int]): Keep one record in every ``n`` from each of
+            these events.
+        rate (float): Records a second let through for each event.
+        burst (int): The number of records let through at once, above the rate.
+        dropped (int): The number of records dropped.
+    """
+
+    def __init__(
+        self, sample: Mapping[str, int] | None = None, rate: float = RATE, burst: int = BURST
+    ):
+        super().__init__()
+        self.sample = dict(sample or {})
+        self.rate = rate
+        self.burst = burst
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._counts: dict[str, int] = {}
+        # Tokens left and when they were last topped up, by event or logger
+        self._buckets: dict[Hashable, list[float]] = {}
+        # Records dropped since the last one let through, by event or logger
+        self._skipped: dict[Hashable, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "event", None)
+        key = event or record.name
+        with self._lock:
+            every = self.sample.get(event) if event else None
+            if every and record.levelno < logging.WARNING:
+                count = self._counts.get(event, 0)
+                self._counts[event] = count + 1
+                if count % every:
+                    return self._drop(key)
+
+            now = time.monotonic()
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                return self._drop(key)
+            bucket[0] = tokens - 1
+
+            skipped = self._skipped.pop(key, 0)
+        if skipped:
+            record.dropped = skipped
+        return True
+
+    def _drop(self, key: Hashable) -> bool:
+        self._skipped[key] = self._skipped.get(key, 0) + 1
+        self.dropped += 1
+        return False
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The records never leave the process, so unlike the base class, leave the
+        # traceback to be formatted on the listener's thread. Only the message is
+        # merged with its arguments, as they may change once the call returns.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    def start(self):
+        # A real thread, where the base class would start a green one under eventlet
+        self._thread = _threading.Thread(target=self._monitor, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        # Stopped early by the app's tests and then again at exit, which the base
+        # class does not allow
+        if self._thread is not None:
+            super().stop()
+
+
+def setup(
+    loggers: Iterable[logging.Logger],
+    path: str,
+    level: int | str = logging.INFO,
+    sample: Mapping[str, int] | None = None,
+    rate: float = RATE,
+    burst: int = BURST,
+    max_bytes: int = MAX_BYTES,
+    backups: int = BACKUPS,
+) -> logging.handlers.QueueListener:
+    """Send the records of some loggers, and of their children, through a queue.
+
+    Args:
+        loggers (Iterable[logging.Logger]): The loggers, usually the app's own. Not
+            the root logger, which would take in every library's records too.
+        path (str): The log file, written as JSON lines and rotated by size.
+        level (int | str): The level of the logger. Defaults to INFO.
+        sample (Mapping[str, int], optional): Keep one record in every ``n``
+            below WARNING from each of these events.
+        rate (float): Records a second let through for each event.
+        burst (int): The number of records let through at once, above the rate.
+        max_bytes (int): The size at which the log file is rotated.
+        backups (int): The number of rotated log files kept.
+
+    Returns:
+        logging.handlers.QueueListener: The listener writing the records out, already
+            started. Stop it to write out the records still queued.
+    """
+    file_handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backups
+    )
+    file_handler.setFormatter(JsonFormatter())
+    shell_handler = logging.StreamHandler(sys.stdout)
+    shell_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    # Only ever used on the listener's thread, which cannot take green locks
+    for output in (file_handler, shell_handler):
+        output.lock = _threading.RLock()
+
+    records: _queue.SimpleQueue[logging.LogRecord] = _queue.SimpleQueue()
+    handler = _QueueHandler(records)
+    handler.addFilter(SampleFilter(sample, rate, burst))
+    for logger in loggers:
+        logger.addHandler(handler)
+        logger.setLevel(level)
+
+    listener = _QueueListener(records, file_handler, shell_handler)
+    listener.start()
+    return listener
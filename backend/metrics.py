@@ -0,0 +1,296 @@
+"""Counters, gauges and histograms, served in the Prometheus text format.
+
+Metrics are recorded where the work happens and read when ``/metrics`` is
+scraped. Recording is a few attribute updates: a metric's ``labels`` are
+looked up once, where a handler is declared, and the value it returns is
+updated in place, without a lock. Under eventlet every handler runs on the
+same OS thread, so updates never interleave. An update made from a real
+thread at the same moment could in the worst case be lost, which is fine for
+statistics.
+
+Metrics whose value is kept elsewhere, like the number of games in memory or
+the counters of the journal, are given a ``function`` instead, called when the
+metrics are scraped, so they cost nothing in between.
+"""
+
+import math
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+
+# Seconds, from a fast socket event to one that waits on a busy game
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+# Bytes, from a small delta to the state of a game with many players
+SIZE_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 65536)
+
+# Values by the values of their labels, or a single value
+Values = float | Mapping[tuple[str, ...], float]
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Value:
+    """The value of a counter or gauge, for one set of labels."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Buckets:
+    """The observations of a histogram, for one set of labels."""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        # The count of each bucket on its own, the last one for +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Metric:
+    """A metric, with a value for each set of values of its labels.
+
+    Attributes:
+        name (str): The name of the metric.
+        help (str): What the metric measures.
+        kind (str): "counter", "gauge" or "histogram".
+        label_names (Tuple[str, ...]): The names of the labels.
+        function (Callable[[], Values], optional): Gives the values when scraped,
+            rather than recording them.
+    """
+
+    kind = ""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        function: Callable[[], Values] | None = None,
+    ):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.function = function
+        self._children: dict[tuple[str, ...], Value | Buckets] = {}
+
+    def _child(self) -> Value | Buckets:
+        return Value()
+
+    def labels(self, *values: str) -> Value | Buckets:
+        """The value for a set of labels, to record it. Keep it rather than look it up each time.
+
+        Args:
+            *values (str): The value of each label, in order.
+
+        Raises:
+            ValueError: The wrong number of values was given.
+
+        Returns:
+            Value | Buckets: Updated in place.
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} has labels {self.label_names}, got {values}.")
+            child = self._children.setdefault(values, self._child())
+        return child
+
+    def _values(self) -> Iterator[tuple[tuple[str, ...], Value | Buckets]]:
+        if self.function is None:
+            yield from list(self._children.items())
+            return
+        values = self.function()
+        if not isinstance(values, Mapping):
+            values = {(): values}
+        for labels, value in values.items():
+            child = Value()
+            child.value = value
+            yield labels, child
+
+    def _lines(self, labels: tuple[str, ...], child) -> Iterable[str]:
+        yield f"{self.name}{_labels(self.label_names, labels)} {_number(child.value)}"
+
+    def expose(self) -> str:
+        """The metric in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, child in self._values():
+            lines.extend(self._lines(labels, child))
+        return "\n".join(lines) + "\n"
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1):
+        """Add to the counter of a metric without labels."""
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1):
+        """Add to the gauge of a metric without labels."""
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1):
+        """Take from the gauge of a metric without labels."""
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        """Set the gauge of a metric without labels."""
+        self.labels().set(value)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _child(self) -> Buckets:
+        return Buckets(self.buckets)
+
+    def observe(self, value: float):
+        """Record an observation of a metric without labels."""
+        self.labels().observe(value)
+
+    def _lines(self, labels: tuple[str, ...], child) -> Iterable[str]:
+        names = (*self.label_names, "le")
+        counts = list(child.counts)
+        total = 0
+        for bound, count in zip((*self.buckets, math.inf), counts):
+            total += count
+            yield f"{self.name}_bucket{_labels(names, (*labels, _number(bound)))} {total}"
+        yield f"{self.name}_sum{_labels(self.label_names, labels)} {_number(child.sum)}"
+        yield f"{self.name}_count{_labels(self.label_names, labels)} {total}"
+
+
+class Registry:
+    """The metrics of the server, to be scraped together."""
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def _add(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"A metric named {metric.name} already exists.")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        function: Callable[[], Values] | None = None,
+    ) -> Counter:
+        """Add a counter, which only ever goes up. Its name should end with ``_total``.
+
+        Args:
+            name (str): The name of the metric.
+            help (str): What it counts.
+            labels (Sequence[str]): The names of its labels.
+            function (Callable[[], Values], optional): Gives the count when scraped,
+                by the values of the labels if it has any.
+
+        Raises:
+            ValueError: There is already a metric with the name.
+
+        Returns:
+            Counter: The counter.
+        """
+        return self._add(Counter(name, help, labels, function))
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        function: Callable[[], Values] | None = None,
+    ) -> Gauge:
+        """Add a gauge, which goes up and down.
+
+        Args:
+            name (str): The name of the metric.
+            help (str): What it measures.
+            labels (Sequence[str]): The names of its labels.
+            function (Callable[[], Values], optional): Gives the value when scraped,
+                by the values of the labels if it has any.
+
+        Raises:
+            ValueError: There is already a metric with the name.
+
+        Returns:
+            Gauge: The gauge.
+        """
+        return self._add(Gauge(name, help, labels, function))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Add a histogram, counting observations by the buckets they fall in.
+
+        Args:
+            name (str): The name of the metric.
+            help (str): What it measures.
+            labels (Sequence[str]): The names of its labels.
+            buckets (Iterable[float]): The upper bound of each bucket. Defaults to
+                ``LATENCY_BUCKETS``, in seconds.
+
+        Raises:
+            ValueError: There is already a metric with the name.
+
+        Returns:
+            Histogram: The histogram.
+        """
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def expose(self) -> str:
+        """Every metric in the Prometheus text format, as served at ``/metrics``."""
+        return "".join(metric.expose() for metric in list(self.metrics.values()))
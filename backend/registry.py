@@ -0,0 +1,331 @@
+"""The games the server is hosting, by name.
+
+Socket handlers look games up and add them while the scheduler's background
+thread sweeps out old ones, so the registry is split into shards, each with
+its own lock. Adding or removing a game only locks the one shard its name
+hashes to, and lookups, the bulk of the traffic, take no lock at all (a
+single dictionary read is atomic). Iterating works on a copy of each shard
+taken under its lock, so games can be added and removed while another thread
+walks the registry.
+
+Games can also expire after a time without activity. Each game gets an entry
+in a heap ordered by when it is due to expire, as of when the entry was made.
+Activity only ever pushes a game's expiry later, so an entry that comes due
+is re-checked against the game's ``last_active`` and pushed back if the game
+has been used since. An expiry sweep therefore only touches the games that
+are due, rather than every game, and the heap's smallest up to date entry is
+always the least recently used game, which is what a ceiling on the number
+of games evicts first.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections.abc import Callable, Hashable, Iterator, MutableMapping
+from typing import Generic, Protocol, TypeVar
+
+# Number of shards, enough that handlers rarely wait on each other
+SHARDS = 64
+
+
+class Expirable(Protocol):
+    # time.monotonic() of the game's last command
+    last_active: float
+
+
+V = TypeVar("V")
+
+
+class GameStore(Protocol[V]):
+    """Where games go when they leave memory, see ``hibernate.Hibernator``."""
+
+    def save(self, name: Hashable, game: V) -> bool: ...
+
+    def restore(self, name: Hashable) -> V | None: ...
+
+    def __contains__(self, name: Hashable) -> bool: ...
+
+
+class GameRegistry(MutableMapping, Generic[V]):
+    """A thread safe dictionary of games, split into independently locked shards.
+
+    Besides the usual dictionary operations, ``get_or_create`` adds a game only
+    if none has the name yet, and ``remove_if`` takes games out only if they
+    still match a condition, both as a single step.
+
+    When ``ttl`` or ``max_games`` is set, games must have a ``last_active``
+    time and ``expire`` removes the ones that have gone quiet. With a ``store``
+    they are saved to it first, and looking up a game that is not in memory
+    brings it back from the store.
+
+    Attributes:
+        ttl (float): Seconds without activity after which a game expires, or None.
+        max_games (int): The most games to keep, or None. Games idle for at least
+            ``idle_after`` seconds are evicted, least recently used first, to stay
+            under it.
+        idle_after (float): Seconds without activity before a game can be evicted.
+        expired (int): The number of games removed for inactivity.
+        evicted (int): The number of games removed to stay under ``max_games``.
+        store (GameStore): Where expired and evicted games are saved, or None.
+    """
+
+    def __init__(
+        self,
+        shards: int = SHARDS,
+        ttl: float | None = None,
+        max_games: int | None = None,
+        idle_after: float = 0,
+        store: GameStore[V] | None = None,
+    ):
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._shards: list[dict[Hashable, V]] = [{} for _ in range(shards)]
+        # The number of games, changed with the count lock held
+        self._size = 0
+        self._size_lock = threading.Lock()
+
+        # (expiry as of when pushed, tiebreak, name, game) of every game
+        self.ttl = ttl
+        self.max_games = max_games
+        self.idle_after = idle_after
+        self.expired = 0
+        self.evicted = 0
+        self._tracked = ttl is not None or max_games is not None
+        self._heap: list[tuple[float, int, Hashable, V]] = []
+        self._heap_lock = threading.Lock()
+        self._tiebreak = itertools.count()
+        self.store = store
+
+    def _resize(self, change: int):
+        with self._size_lock:
+            self._size += change
+
+    def _shard(self, name: Hashable) -> tuple[threading.Lock, dict[Hashable, V]]:
+        i = hash(name) % len(self._shards)
+        return self._locks[i], self._shards[i]
+
+    def __getitem__(self, name: Hashable) -> V:
+        game = self._shards[hash(name) % len(self._shards)].get(name)
+        if game is None:
+            game = self._restore(name)
+            if game is None:
+                raise KeyError(name)
+        return game
+
+    def get(self, name: Hashable, default: V | None = None) -> V | None:  # type: ignore[override]
+        game = self._shards[hash(name) % len(self._shards)].get(name)
+        if game is None:
+            game = self._restore(name)
+        return default if game is None else game
+
+    def __contains__(self, name: object) -> bool:
+        if name in self._shards[hash(name) % len(self._shards)]:
+            return True
+        return self.store is not None and name in self.store
+
+    def _restore(self, name: Hashable) -> V | None:
+        """Bring a game back from the store, if it is there."""
+        if self.store is None:
+            return None
+        lock, shard = self._shard(name)
+        with lock:
+            # Someone else may have brought it back while this waited for the lock
+            game = shard.get(name)
+            if game is not None:
+                return game
+            game = self.store.restore(name)
+            if game is None:
+                return None
+            shard[name] = game
+        self._resize(1)
+        self._track(name, game)
+        return game
+
+    def __setitem__(self, name: Hashable, game: V):
+        lock, shard = self._shard(name)
+        with lock:
+            added = name not in shard
+            shard[name] = game
+        if added:
+            self._resize(1)
+        self._track(name, game)
+
+    def __delitem__(self, name: Hashable):
+        lock, shard = self._shard(name)
+        with lock:
+            del shard[name]
+        self._resize(-1)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Hashable]:
+        """The names of the games, as they were when each shard was reached."""
+        for lock, shard in zip(self._locks, self._shards, strict=True):
+            with lock:
+                names = list(shard)
+            yield from names
+
+    def items(self) -> list[tuple[Hashable, V]]:  # type: ignore[override]
+        """A copy of every (name, game) pair."""
+        items: list[tuple[Hashable, V]] = []
+        for lock, shard in zip(self._locks, self._shards, strict=True):
+            with lock:
+                items.extend(shard.items())
+        return items
+
+    def get_or_create(self, name: Hashable, factory: Callable[[], V]) -> tuple[V, bool]:
+        """Get a game, adding a new one if there is none with the name.
+
+        Args:
+            name (Hashable): The name of the game.
+            factory (Callable[[], V]): Makes the new game. Called with the shard
+                locked, at most once.
+
+        Returns:
+            Tuple[V, bool]: The game, and whether it was just created.
+        """
+        game = self.get(name)
+        if game is not None:
+            return game, False
+        lock, shard = self._shard(name)
+        with lock:
+            # Someone else may have added it while this waited for the lock
+            game = shard.get(name)
+            if game is not None:
+                return game, False
+            game = shard[name] = factory()
+        self._resize(1)
+        self._track(name, game)
+        return game, True
+
+    def remove_if(self, condition: Callable[[V], bool]) -> list[Hashable]:
+        """Remove every game that matches a condition.
+
+        Each game is checked with its shard locked, so a game replaced under the
+        same name in the meantime is checked afresh.
+
+        Args:
+            condition (Callable[[V], bool]): Whether to remove a game.
+
+        Returns:
+            List[Hashable]: The names of the removed games.
+        """
+        removed = []
+        for lock, shard in zip(self._locks, self._shards, strict=True):
+            with lock:
+                names = [name for name, game in shard.items() if condition(game)]
+                for name in names:
+                    del shard[name]
+            removed.extend(names)
+        self._resize(-len(removed))
+        return removed
+
+    # Expiry
+
+    def _track(self, name: Hashable, game: V):
+        if self._tracked:
+            with self._heap_lock:
+                self._push(name, game)
+
+    def _push(self, name: Hashable, game: V):
+        """Schedule a game by its last activity. Call with the heap lock held."""
+        due = game.last_active + (self.ttl or 0)  # type: ignore[attr-defined]
+        heapq.heappush(self._heap, (due, next(self._tiebreak), name, game))
+
+    def _pop_oldest(self) -> tuple[Hashable, V] | None:
+        """Take the least recently used game off the heap, or None when it is empty.
+
+        Entries of games that are gone or were used since are dropped or pushed
+        back on the way. Call with the heap lock held.
+        """
+        heap = self._heap
+        while heap:
+            due, _, name, game = heap[0]
+            if self._shards[hash(name) % len(self._shards)].get(name) is not game:
+                # Removed, or replaced by a game with its own entry
+                heapq.heappop(heap)
+            elif game.last_active + (self.ttl or 0) > due:  # type: ignore[attr-defined]
+                heapq.heappop(heap)
+                self._push(name, game)
+            else:
+                heapq.heappop(heap)
+                return name, game
+        return None
+
+    def _remove_if_unused(self, name: Hashable, game: V, since: float) -> bool:
+        """Remove a game that has not been used since a time, if it is still there.
+
+        With a store the game is saved to it first, with the shard locked, so
+        looking the game up never finds it in neither place. Saving may wait on
+        the disk, so call this without the heap lock held.
+        """
+        lock, shard = self._shard(name)
+        with lock:
+            if shard.get(name) is not game or game.last_active > since:  # type: ignore[attr-defined]
+                return False
+            if self.store is not None and not self.store.save(name, game):
+                return False
+            del shard[name]
+        self._resize(-1)
+        return True
+
+    def expire(self, now: float | None = None) -> list[Hashable]:
+        """Remove the games that have been inactive for ``ttl`` seconds, then evict
+        the least recently used idle games while there are more than ``max_games``.
+
+        Only games that are due, and the ones evicted, are looked at.
+
+        Args:
+            now (float, optional): The ``time.monotonic()`` to expire games as of.
+
+        Returns:
+            List[Hashable]: The names of the removed games.
+        """
+        if not self._tracked:
+            return []
+        now = time.monotonic() if now is None else now
+        removed, kept = [], []
+        try:
+            while True:
+                with self._heap_lock:
+                    if not self._heap or not (
+                        (self.ttl is not None and self._heap[0][0] <= now)
+                        or (self.max_games is not None and len(self) > self.max_games)
+                    ):
+                        break
+                    oldest = self._pop_oldest()
+                    if oldest is None:
+                        break
+                    name, game = oldest
+                    last_active = game.last_active  # type: ignore[attr-defined]
+                    if self.ttl is not None and last_active + self.ttl <= now:
+                        expiring = True
+                    elif self.max_games is not None and len(self) > self.max_games:
+                        if last_active + self.idle_after > now:
+                            # Every other game was used more recently still
+                            self._push(name, game)
+                            break
+                        expiring = False
+                    else:
+                        # Used while being checked, so not due after all
+                        kept.append((name, game))
+                        continue
+                # Saving the game to the store waits on the disk, so it is done with
+                # the heap unlocked, and the game checked again with its shard locked
+                if self._remove_if_unused(name, game, last_active):
+                    with self._heap_lock:
+                        if expiring:
+                            self.expired += 1
+                        else:
+                            self.evicted += 1
+                    removed.append(name)
+                else:
+                    # Used or replaced meanwhile, or the store would not take it
+                    kept.append((name, game))
+        finally:
+            # Put back once done, so they are not looked at again now
+            with self._heap_lock:
+                for name, game in kept:
+                    self._push(name, game)
+        return removed
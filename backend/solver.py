@@ -0,0 +1,246 @@
+"""Arrange a player's tiles into a single connected grid of valid words.
+
+The solver is a depth first search: it lays the longest word it can build
+from the rack, then repeatedly crosses a new word through a tile already on
+the grid, preferring long words, until every tile is used. Candidate words
+come from the hint engine, and every word created across a newly placed tile
+is checked against the dictionary, so any grid the solver returns is valid.
+
+The search checks a deadline at every step and keeps the grid that used the
+most tiles, which it returns when the time budget runs out. Searches are
+CPU bound, so the server runs them in a process pool (see ``submit``) to keep
+the event loop free.
+"""
+
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from threading import Lock
+
+from game import WORDS
+from hints import get_engine
+
+# How many candidate words are tried at each step of the search
+BRANCHING = 12
+
+# Number of processes searching for grids
+SOLVER_WORKERS = int(os.environ.get("SOLVER_WORKERS", "1"))
+
+Cell = tuple[int, int]
+
+
+@dataclass
+class SolveResult:
+    """The outcome of a search.
+
+    Attributes:
+        placements (List[Tuple[int, int, str]]): The (row, column, letter) of every
+            placed tile, with the top left of the grid at (0, 0).
+        remaining (List[str]): The tiles that could not be placed.
+        complete (bool): Whether every tile was placed.
+        timed_out (bool): Whether the search ran out of time.
+        elapsed (float): Time spent searching, in seconds.
+    """
+
+    placements: list[tuple[int, int, str]] = field(default_factory=list)
+    remaining: list[str] = field(default_factory=list)
+    complete: bool = False
+    timed_out: bool = False
+    elapsed: float = 0.0
+
+    def rows(self) -> list[str]:
+        """Render the grid as text, with spaces for empty cells."""
+        if not self.placements:
+            return []
+        height = max(row for row, _, _ in self.placements) + 1
+        width = max(col for _, col, _ in self.placements) + 1
+        grid = [[" "] * width for _ in range(height)]
+        for row, col, letter in self.placements:
+            grid[row][col] = letter
+        return ["".join(line).rstrip() for line in grid]
+
+
+class _OutOfTimeError(Exception):
+    pass
+
+
+class _Search:
+    def __init__(self, tiles: list[str], deadline: float):
+        self.deadline = deadline
+        self.grid: dict[Cell, str] = {}
+        self.remaining = Counter(tile.upper() for tile in tiles)
+        self.best: dict[Cell, str] = {}
+        self.engine = get_engine()
+
+    def _run(self, cell: Cell, step: Cell) -> str:
+        """The letters of the run through a cell in one direction."""
+        (row, col), (dr, dc) = cell, step
+        while (row - dr, col - dc) in self.grid:
+            row, col = row - dr, col - dc
+        letters = []
+        while (row, col) in self.grid:
+            letters.append(self.grid[(row, col)])
+            row, col = row + dr, col + dc
+        return "".join(letters)
+
+    def _place(self, word: str, start: Cell, step: Cell) -> list[Cell] | None:
+        """Place a word if it fits, returning the newly filled cells."""
+        (row, col), (dr, dc) = start, step
+        # The word must not run into tiles at either end
+        if (row - dr, col - dc) in self.grid or (
+            row + dr * len(word),
+            col + dc * len(word),
+        ) in self.grid:
+            return None
+
+        cross = (dc, dr)
+        placed: list[Cell] = []
+        for i, letter in enumerate(word):
+            cell = (row + dr * i, col + dc * i)
+            existing = self.grid.get(cell)
+            if existing is not None:
+                if existing != letter:
+                    break
+                continue
+            if not self.remaining[letter]:
+                break
+            self.grid[cell] = letter
+            self.remaining[letter] -= 1
+            placed.append(cell)
+            # Any word formed across the new tile must be valid
+            run = self._run(cell, cross)
+            if len(run) > 1 and run not in WORDS:
+                break
+        else:
+            if placed:
+                return placed
+        self._remove(placed)
+        return None
+
+    def _remove(self, cells: list[Cell]):
+        for cell in cells:
+            self.remaining[self.grid.pop(cell)] += 1
+
+    def _check(self):
+        if len(self.grid) > len(self.best):
+            self.best = dict(self.grid)
+        if time.monotonic() > self.deadline:
+            raise _OutOfTimeError
+
+    def _candidates(self) -> list[tuple[str, Cell, Cell]]:
+        """The placements worth trying next, longest words first."""
+        rack = list(self.remaining.elements())
+        anchors: dict[str, list[Cell]] = {}
+        for cell, letter in self.grid.items():
+            anchors.setdefault(letter, []).append(cell)
+        letters = list(anchors)
+        found = self.engine.words_for_racks([[*rack, letter] for letter in letters], 200)
+
+        moves = []
+        for letter, words in zip(letters, found, strict=True):
+            words = [word for word in words if letter in word][:BRANCHING]
+            for word in words:
+                for cell in anchors[letter]:
+                    for step in ((0, 1), (1, 0)):
+                        # Only cross words that run the other way through the anchor
+                        if len(self._run(cell, step)) > 1:
+                            continue
+                        for i, c in enumerate(word):
+                            if c == letter:
+                                start = (cell[0] - step[0] * i, cell[1] - step[1] * i)
+                                moves.append((word, start, step))
+        moves.sort(key=lambda move: -len(move[0]))
+        return moves
+
+    def _extend(self) -> bool:
+        self._check()
+        if not any(self.remaining.values()):
+            return True
+        for word, start, step in self._candidates():
+            placed = self._place(word, start, step)
+            if placed is None:
+                continue
+            if self._extend():
+                return True
+            self._remove(placed)
+        return False
+
+    def run(self) -> bool:
+        rack = list(self.remaining.elements())
+        for word in self.engine.words_for_rack(rack, BRANCHING):
+            placed = self._place(word, (0, 0), (0, 1))
+            if placed is None:
+                continue
+            if self._extend():
+                return True
+            self._remove(placed)
+        return False
+
+
+def solve(tiles: list[str], time_budget: float = 3.0) -> SolveResult:
+    """Arrange tiles into a single connected grid of valid words.
+
+    Args:
+        tiles (List[str]): The tiles to arrange.
+        time_budget (float): The maximum time to search, in seconds. Defaults to 3.
+
+    Returns:
+        SolveResult: The complete grid, or the grid that used the most tiles when
+            no complete grid was found in time.
+    """
+    start = time.monotonic()
+    search = _Search(tiles, start + time_budget)
+    timed_out = False
+    try:
+        search.run()
+    except _OutOfTimeError:
+        timed_out = True
+    grid = search.best
+
+    remaining = Counter(tile.upper() for tile in tiles)
+    remaining.subtract(grid.values())
+    top = min((row for row, _ in grid), default=0)
+    left = min((col for _, col in grid), default=0)
+    return SolveResult(
+        placements=sorted((row - top, col - left, letter) for (row, col), letter in grid.items()),
+        remaining=sorted(remaining.elements()),
+        complete=not any(remaining.values()),
+        timed_out=timed_out,
+        elapsed=time.monotonic() - start,
+    )
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = Lock()
+
+
+def submit(tiles: list[str], time_budget: float = 3.0) -> "Future[SolveResult]":
+    """Search for a grid in the solver's process pool.
+
+    Args:
+        tiles (List[str]): The tiles to arrange.
+        time_budget (float): The maximum time to search, in seconds. Defaults to 3.
+
+    Returns:
+        Future[SolveResult]: The result of the search.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawn rather than fork, the server process runs an event loop
+            _pool = ProcessPoolExecutor(
+                max_workers=SOLVER_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool.submit(solve, tiles, time_budget)
+
+
+def shutdown():
+    """Stop the process pool, if it was started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# Keep the stores of the app under test apart for each test process: hibernated
+# games in memory, the journal in a directory of its own
+os.environ.setdefault("HIBERNATE_PATH", ":memory:")
+os.environ.setdefault("JOURNAL_DIR", tempfile.mkdtemp(prefix="journal-"))
@@ -0,0 +1,63 @@
+import threading
+import time
+import unittest
+
+from actor import Mailbox, MailboxTimeoutError
+
+
+class TestMailbox(unittest.TestCase):
+    def test_call(self):
+        mailbox = Mailbox()
+        with self.subTest("Test result."):
+            self.assertEqual(mailbox.call(sum, [1, 2], start=3), 6)
+        with self.subTest("Test error."), self.assertRaises(ZeroDivisionError):
+            mailbox.call(lambda: 1 / 0)
+        with self.subTest("Test idle after an error."):
+            self.assertEqual(mailbox.call(len, "ab"), 2)
+
+    def test_serial(self):
+        mailbox = Mailbox()
+        running, overlaps, order = [0], [], []
+
+        def work(i: int) -> int:
+            running[0] += 1
+            overlaps.append(running[0])
+            time.sleep(0.001)
+            order.append(i)
+            running[0] -= 1
+            return i
+
+        results = [None] * 16
+
+        def client(i: int):
+            results[i] = mailbox.call(work, i)
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with self.subTest("Test commands never overlap."):
+            self.assertEqual(max(overlaps), 1)
+        with self.subTest("Test every command ran once, for its own caller."):
+            self.assertEqual(sorted(order), list(range(16)))
+            self.assertEqual(results, list(range(16)))
+        with self.subTest("Test idle once drained."):
+            self.assertEqual(len(mailbox), 0)
+            self.assertEqual(mailbox.call(len, "abc"), 3)
+
+    def test_timeout(self):
+        mailbox = Mailbox(timeout=0.05)
+        release, ran = threading.Event(), []
+        holder = threading.Thread(target=mailbox.call, args=(release.wait,))
+        holder.start()
+        time.sleep(0.01)
+
+        with self.subTest("Test busy mailbox."), self.assertRaises(MailboxTimeoutError):
+            mailbox.call(ran.append, "late")
+        release.set()
+        holder.join()
+        with self.subTest("Test timed out command is dropped."):
+            mailbox.call(ran.append, "next")
+            self.assertEqual(ran, ["next"])
@@ -2,10 +2,30 @@
 import json
 import time
 
+import msgpack
 import pytest
 
-from app import all_games, app, socketio
-from game import Game
+from app import (
+    all_games,
+    app,
+    hibernator,
+    journal,
+    log_listener,
+    msgpack_sessions,
+    player_sessions,
+    session_players,
+    socketio,
+)
+from game import Game, State
+from journal import Journal
+from tiles import Rack, TileBag
+
+
+@pytest.fixture(scope="module", autouse=True)
+def stop_logging():
+    yield
+    # Write out the app's last records while pytest's stdout is still open
+    log_listener.stop()
 
 
 @pytest.fixture
@@ -58,7 +78,7 @@ def socket_client_end():
     _ = socket_client_end.get_received()
     socket_client_end.emit("start_game", {"name": "TEST_GAME"})
     _ = socket_client_end.get_received()
-    all_games["TEST_GAME"].tiles = ["A", "B", "C"]
+    all_games["TEST_GAME"].tiles = TileBag.from_letters(["A", "B", "C"])
     all_games["TEST_GAME"].tiles_remaining = 3
     time.sleep(1)
     socket_client_end.emit("peel", {"name": "TEST_GAME"})
@@ -72,14 +92,30 @@ def test_get_names(client):
     assert json.loads(resp.data.decode("utf-8")) == {"ids": ["TEST_GAME"]}
 
 
-def test_load_game(socket_client):
+def test_hibernated_game(socket_client):
+    socket_client.emit("player_join", {"name": "TEST_GAME", "player_id": "p1"})
+    _ = socket_client.get_received()
+    game = all_games["TEST_GAME"]
+    assert hibernator.save("TEST_GAME", game)
+    del all_games["TEST_GAME"]
+
+    resp = app.test_client().get("/api/get_names")
+    assert json.loads(resp.data.decode("utf-8")) == {"ids": ["TEST_GAME"]}
+
     socket_client.emit("load_game", {"name": "TEST_GAME"})
     resp = socket_client.get_received()
-    assert resp[0]["name"] == "render_game"
-    assert len(resp[0]["args"][0]) == 3
-    assert resp[0]["args"][0]["status_code"] == 200
     assert resp[0]["args"][0]["message"] == "Game loaded."
-    assert json.loads(resp[0]["args"][0]["payload"]) == {
+    assert resp[0]["args"][0]["players"] == {"p1": 0}
+    assert all_games["TEST_GAME"] is not game
+    assert "TEST_GAME" not in hibernator.names()
+
+
+def test_load_game(socket_client):
+    socket_client.emit("load_game", {"name": "TEST_GAME"})
+    resp = socket_client.get_received()
+    assert resp[0]["name"] == "game_state"
+    assert resp[0]["args"][0].pop("message") == "Game loaded."
+    assert resp[0]["args"][0] == {
         "id": "test_game",
         "state": "IDLE",
         "num_players": None,
@@ -87,8 +123,35 @@ def test_load_game(socket_client):
         "players": {},
         "winning_words": None,
         "winning_player": None,
+        "verdict": None,
+        "version": 0,
     }
 
+    socket_client.emit("load_game", {"name": "TEST_GAME"})
+    resp = socket_client.get_received()
+    assert resp[0]["args"][0]["message"] == "Game loaded."
+    assert all_games["TEST_GAME"].snapshot_hits == 1
+
+
+def test_load_game_msgpack(socket_client):
+    client = socketio.test_client(app, auth={"format": "msgpack"})
+    assert client.get_received() == [
+        {"name": "wire_format", "args": [{"format": "msgpack"}], "namespace": "/"}
+    ]
+    client.emit("join", {"name": "TEST_GAME"})
+    socket_client.emit("load_game", {"name": "TEST_GAME"})
+
+    # JSON clients in the room still get JSON, MessagePack clients get one binary attachment
+    resp = socket_client.get_received()
+    assert len(resp) == 1
+    state = resp[0]["args"][0]
+    resp = client.get_received()
+    assert resp[0]["name"] == "game_state"
+    assert msgpack.unpackb(resp[0]["args"][0]) == state
+    assert len(msgpack_sessions) == 1
+    client.disconnect()
+    assert not msgpack_sessions
+
 
 def test_player_join_fail(socket_client):
     socket_client.emit("player_join", {"name": "TEST_GAME"})
@@ -103,21 +166,47 @@ def test_player_join_fail(socket_client):
 def test_player_join(socket_client):
     socket_client.emit("player_join", {"name": "TEST_GAME", "player_id": "p1"})
     resp = socket_client.get_received()
-    assert resp[0]["name"] == "render_game"
-    assert len(resp[0]["args"][0]) == 3
-    assert resp[0]["args"][0]["status_code"] == 200
-    assert resp[0]["args"][0]["message"].split("\n")[0] == "Added player p1 to game."
-    assert json.loads(resp[0]["args"][0]["payload"]) == {
+    assert resp[0]["name"] == "game_state"
+    assert resp[0]["args"][0].pop("message") == "Added player p1 to game."
+    assert resp[0]["args"][0] == {
         "id": "test_game",
         "state": "IDLE",
         "num_players": None,
         "tiles_remaining": 144,
-        "players": {"p1": []},
+        "players": {"p1": 0},
         "winning_words": None,
         "winning_player": None,
+        "verdict": None,
+        "version": 1,
     }
 
 
+def test_player_tiles():
+    app.config["TESTING"] = True
+    all_games["TEST_GAME"] = Game("test_game")
+    clients = {}
+    for player_id in ["p1", "p2"]:
+        clients[player_id] = socketio.test_client(app, flask_test_client=app.test_client())
+        clients[player_id].emit("join", {"name": "TEST_GAME"})
+        clients[player_id].emit("player_join", {"name": "TEST_GAME", "player_id": player_id})
+    for client in clients.values():
+        client.get_received()
+
+    clients["p1"].emit("start_game", {"name": "TEST_GAME"})
+    for player_id, client in clients.items():
+        resp = client.get_received()
+        assert [r["name"] for r in resp] == ["game_state", "player_tiles"]
+        assert resp[0]["args"][0]["players"] == {"p1": 21, "p2": 21}
+        # Each player is only sent their own tiles
+        assert resp[1]["args"][0] == {"version": 3, "tiles": all_games["TEST_GAME"].rack(player_id)}
+
+    clients["p2"].disconnect()
+    assert ("TEST_GAME", "p2") not in player_sessions
+    assert ("TEST_GAME", "p2") not in session_players.values()
+    assert ("TEST_GAME", "p1") in player_sessions
+    clients["p1"].disconnect()
+
+
 def test_start_game(socket_client):
     socket_client.emit("player_join", {"name": "TEST_GAME", "player_id": "p1"})
     _ = socket_client.get_received()
@@ -125,11 +214,9 @@ def test_start_game(socket_client):
     _ = socket_client.get_received()
     socket_client.emit("start_game", {"name": "TEST_GAME"})
     resp = socket_client.get_received()
-    assert resp[0]["name"] == "render_game"
-    assert len(resp[0]["args"][0]) == 3
-    assert resp[0]["args"][0]["status_code"] == 200
-    assert resp[0]["args"][0]["message"] == "Game started."
-    data = json.loads(resp[0]["args"][0]["payload"])
+    assert resp[0]["name"] == "game_state"
+    data = resp[0]["args"][0]
+    assert data.pop("message") == "Game started."
     assert len(data["players"]) == 2
     data.pop("players", None)
     assert data == {
@@ -139,6 +226,8 @@ def test_start_game(socket_client):
         "tiles_remaining": 102,
         "winning_words": None,
         "winning_player": None,
+        "verdict": None,
+        "version": 3,
     }
 
 
@@ -146,20 +235,17 @@ def test_peel(socket_client_init):
     time.sleep(1)
     socket_client_init.emit("peel", {"name": "TEST_GAME"})
     resp = socket_client_init.get_received()
-    assert resp[0]["name"] == "render_game"
-    assert len(resp[0]["args"][0]) == 3
-    assert resp[0]["args"][0]["status_code"] == 200
-    assert resp[0]["args"][0]["message"] == "New tile given out."
-    data = json.loads(resp[0]["args"][0]["payload"])
-    data.pop("players", None)
-    assert data == {
-        "id": "test_game",
-        "state": "ACTIVE",
-        "num_players": 2,
-        "tiles_remaining": 100,
-        "winning_words": None,
-        "winning_player": None,
+    assert [r["name"] for r in resp] == ["state_delta", "rack_update"]
+    assert resp[0]["args"][0] == {
+        "base": 3,
+        "version": 4,
+        "state": {"tiles_remaining": 100},
+        "dealt": 1,
     }
+    # The socket last joined as p2, so it is only sent p2's new tile
+    (tile,) = resp[1]["args"][0]["add"]
+    assert resp[1]["args"][0] == {"version": 4, "add": [tile]}
+    assert all_games["TEST_GAME"].players["p2"].count(tile) > 0
 
 
 def test_swap_fail(socket_client_init):
@@ -173,27 +259,67 @@ def test_swap_fail(socket_client_init):
 
 
 def test_swap(socket_client_init):
-    letter = all_games["TEST_GAME"].players["p1"][0]
-    socket_client_init.emit("swap", {"name": "TEST_GAME", "player_id": "p1", "letter": letter})
+    letter = all_games["TEST_GAME"].rack("p2")[0]
+    socket_client_init.emit("swap", {"name": "TEST_GAME", "player_id": "p2", "letter": letter})
     resp = socket_client_init.get_received()
-    assert resp[0]["name"] == "render_game"
-    assert len(resp[0]["args"][0]) == 3
-    assert resp[0]["args"][0]["status_code"] == 200
-    assert resp[0]["args"][0]["message"] == "Performed swap for player p1."
-    data = json.loads(resp[0]["args"][0]["payload"])
-    data.pop("players", None)
-    assert data == {
-        "id": "test_game",
-        "state": "ACTIVE",
-        "num_players": 2,
-        "tiles_remaining": 100,
-        "winning_words": None,
-        "winning_player": None,
+    assert [r["name"] for r in resp] == ["state_delta", "rack_update"]
+    assert resp[0]["args"][0] == {
+        "base": 3,
+        "version": 4,
+        "state": {"tiles_remaining": 100},
+        "players": {"p2": 23},
     }
+    assert resp[1]["args"][0]["remove"] == [letter]
+    assert len(resp[1]["args"][0]["add"]) == 3
+
+
+def test_sync(socket_client_init):
+    time.sleep(1)
+    socket_client_init.emit("peel", {"name": "TEST_GAME"})
+    _ = socket_client_init.get_received()
+
+    socket_client_init.emit("sync", {"name": "TEST_GAME", "player_id": "p2", "version": 2})
+    resp = socket_client_init.get_received()
+    assert [r["name"] for r in resp] == ["state_delta", "player_tiles"]
+    assert resp[0]["args"][0] == {
+        "base": 2,
+        "version": 4,
+        "state": {"state": "ACTIVE", "num_players": 2, "tiles_remaining": 100},
+        "players": {"p1": 22, "p2": 22},
+    }
+    assert resp[1]["args"][0] == {"version": 4, "tiles": all_games["TEST_GAME"].rack("p2")}
+
+    # Too far behind, or from another game
+    socket_client_init.emit("sync", {"name": "TEST_GAME", "version": 40})
+    resp = socket_client_init.get_received()
+    assert [r["name"] for r in resp] == ["game_state"]
+    assert resp[0]["args"][0]["version"] == 4
+
+
+def test_sync_other_player(socket_client_init):
+    # The fixture's socket plays as p2, another socket must not be sent p2's tiles
+    other = socketio.test_client(app, flask_test_client=app.test_client())
+    other.emit("join", {"name": "TEST_GAME"})
+    other.get_received()
+    other.emit("sync", {"name": "TEST_GAME", "player_id": "p2", "version": 2})
+    resp = other.get_received()
+    assert [r["name"] for r in resp] == ["state_delta"]
+
+    # Nor once it plays as p1, though it still gets its own
+    other.emit("player_join", {"name": "TEST_GAME", "player_id": "p1"})
+    other.get_received()
+    other.emit("sync", {"name": "TEST_GAME", "player_id": "p2", "version": 2})
+    resp = other.get_received()
+    assert [r["name"] for r in resp] == ["state_delta"]
+    other.emit("sync", {"name": "TEST_GAME", "player_id": "p1", "version": 2})
+    resp = other.get_received()
+    assert [r["name"] for r in resp] == ["state_delta", "player_tiles"]
+    assert resp[1]["args"][0]["tiles"] == all_games["TEST_GAME"].rack("p1")
+    other.disconnect()
 
 
 def test_bananagrams_fail(socket_client_end):
-    socket_client_end.emit("bananagrams", {"name": "TEST_GAME", "player_id": "p1"})
+    socket_client_end.emit("bananagrams", {"name": "TEST_GAME", "player_id": "p2"})
     resp = socket_client_end.get_received()
     assert resp[0]["name"] == "render_game"
     assert len(resp[0]["args"][0]) == 3
@@ -201,15 +327,34 @@ def test_bananagrams_fail(socket_client_end):
     assert resp[0]["args"][0]["message"].split("\n")[0] == "'words' is a required property"
     assert resp[0]["args"][0]["payload"] == {}
 
+    state = all_games["TEST_GAME"].state
+    for words, message in [
+        (["QI", 7], "7 is not of type 'string'"),
+        (["Q" * 33], f"'{'Q' * 33}' is too long"),
+        (["QI"] * 145, "is too long"),
+    ]:
+        socket_client_end.emit(
+            "bananagrams", {"name": "TEST_GAME", "player_id": "p2", "words": words}
+        )
+        resp = socket_client_end.get_received()
+        assert resp[0]["args"][0]["status_code"] == 400
+        assert message in resp[0]["args"][0]["message"].split("\n")[0]
+    for board in (["E" * 145], ["E" * 144] * 144):
+        socket_client_end.emit(
+            "bananagrams",
+            {"name": "TEST_GAME", "player_id": "p2", "words": [], "board": board},
+        )
+        resp = socket_client_end.get_received()
+        assert resp[0]["args"][0]["status_code"] == 400
+    assert all_games["TEST_GAME"].state == state
+
 
 def test_bananagrams(socket_client_end):
-    socket_client_end.emit("bananagrams", {"name": "TEST_GAME", "player_id": "p1", "words": []})
+    socket_client_end.emit("bananagrams", {"name": "TEST_GAME", "player_id": "p2", "words": []})
     resp = socket_client_end.get_received()
-    assert resp[0]["name"] == "render_game"
-    assert len(resp[0]["args"][0]) == 3
-    assert resp[0]["args"][0]["status_code"] == 200
-    assert resp[0]["args"][0]["message"] == "Bananagrams."
-    data = json.loads(resp[0]["args"][0]["payload"])
+    assert resp[0]["name"] == "game_state"
+    data = resp[0]["args"][0]
+    assert data.pop("message") == "Bananagrams."
     data.pop("players", None)
     assert data == {
         "id": "test_game",
@@ -217,20 +362,45 @@ def test_bananagrams(socket_client_end):
         "num_players": 2,
         "tiles_remaining": 1,
         "winning_words": [],
-        "winning_player": "p1",
+        "winning_player": "p2",
+        "verdict": {
+            "valid": False,
+            "missing": sorted(all_games["TEST_GAME"].players["p2"]),
+            "extra": [],
+            "components": 0,
+            "words": [],
+            "invalid_words": [],
+        },
+        "version": 5,
     }
 
 
+def test_bananagrams_board(socket_client_end):
+    all_games["TEST_GAME"].players["p2"] = Rack(["Q", "I"])
+    socket_client_end.emit(
+        "bananagrams",
+        {
+            "name": "TEST_GAME",
+            "player_id": "p2",
+            "words": ["QI"],
+            "board": [{"row": 0, "col": 0, "letter": "Q"}, {"row": 0, "col": 1, "letter": "I"}],
+        },
+    )
+    resp = socket_client_end.get_received()
+    assert resp[0]["name"] == "game_state"
+    data = resp[0]["args"][0]
+    assert data["verdict"]["valid"]
+    assert data["verdict"]["words"] == ["QI"]
+
+
 def test_continue_game(socket_client_end):
-    socket_client_end.emit("bananagrams", {"name": "TEST_GAME", "player_id": "p1", "words": []})
+    socket_client_end.emit("bananagrams", {"name": "TEST_GAME", "player_id": "p2", "words": []})
     _ = socket_client_end.get_received()
     socket_client_end.emit("continue_game", {"name": "TEST_GAME"})
     resp = socket_client_end.get_received()
-    assert resp[0]["name"] == "render_game"
-    assert len(resp[0]["args"][0]) == 3
-    assert resp[0]["args"][0]["status_code"] == 200
-    assert resp[0]["args"][0]["message"] == "Game 'TEST_GAME' continued."
-    data = json.loads(resp[0]["args"][0]["payload"])
+    assert resp[0]["name"] == "game_state"
+    data = resp[0]["args"][0]
+    assert data.pop("message") == "Game 'TEST_GAME' continued."
     data.pop("players", None)
     assert data == {
         "id": "test_game",
@@ -239,25 +409,268 @@ def test_continue_game(socket_client_end):
         "tiles_remaining": 1,
         "winning_words": None,
         "winning_player": None,
+        "verdict": None,
+        "version": 6,
     }
 
 
 def test_reset_game(socket_client_end):
-    socket_client_end.emit("bananagrams", {"name": "TEST_GAME", "player_id": "p1", "words": []})
+    socket_client_end.emit("bananagrams", {"name": "TEST_GAME", "player_id": "p2", "words": []})
     _ = socket_client_end.get_received()
     socket_client_end.emit("reset", {"name": "TEST_GAME"})
     resp = socket_client_end.get_received()
-    assert resp[0]["name"] == "render_game"
-    assert len(resp[0]["args"][0]) == 3
-    assert resp[0]["args"][0]["status_code"] == 200
-    assert resp[0]["args"][0]["message"] == "Game 'TEST_GAME' reset."
-    data = json.loads(resp[0]["args"][0]["payload"])
+    assert resp[0]["name"] == "game_state"
+    data = resp[0]["args"][0]
+    assert data.pop("message") == "Game 'TEST_GAME' reset."
     assert data == {
         "id": "test_game",
         "state": "IDLE",
         "num_players": None,
         "tiles_remaining": 144,
-        "players": {"p1": [], "p2": []},
+        "players": {"p1": 0, "p2": 0},
         "winning_words": None,
         "winning_player": None,
+        "verdict": None,
+        "version": 6,
+    }
+
+
+def test_validate_words(socket_client):
+    socket_client.emit(
+        "validate_words",
+        {"game_id": "TEST_GAME", "player_id": "p1", "valid_words": ["winning", "XDEFX", "QI"]},
+    )
+    resp = socket_client.get_received()
+    assert len(resp) == 1
+    assert resp[0]["name"] == "words_validated"
+    assert resp[0]["args"][0] == {
+        "game_id": "TEST_GAME",
+        "player_id": "p1",
+        "words": [["winning", True], ["XDEFX", False], ["QI", True]],
     }
+
+
+def test_validate_words_fail(socket_client):
+    socket_client.emit("validate_words", {"game_id": "TEST_GAME", "valid_words": "QI"})
+    resp = socket_client.get_received()
+    assert resp[0]["name"] == "render_game"
+    assert resp[0]["args"][0]["status_code"] == 400
+    assert resp[0]["args"][0]["message"].split("\n")[0] == "'QI' is not of type 'array'"
+
+    socket_client.emit("validate_words", {"game_id": "NO_GAME", "valid_words": ["QI"]})
+    resp = socket_client.get_received()
+    assert resp == []
+
+
+def test_find_words(socket_client_init):
+    all_games["TEST_GAME"].players["p2"] = Rack(["G", "R", "C", "D"])
+    socket_client_init.emit(
+        "find_words", {"name": "TEST_GAME", "player_id": "p2", "pattern": "??a?e"}
+    )
+    resp = socket_client_init.get_received()
+    assert resp[0]["name"] == "words_found"
+    assert resp[0]["args"][0] == {"pattern": "??a?e", "words": ["GRACE", "GRADE"]}
+
+
+def test_find_words_fail(socket_client_init):
+    socket_client_init.emit(
+        "find_words", {"name": "TEST_GAME", "player_id": "p2", "pattern": "A*E"}
+    )
+    resp = socket_client_init.get_received()
+    assert resp[0]["name"] == "render_game"
+    assert resp[0]["args"][0]["status_code"] == 400
+
+
+def test_rack_hints(socket_client_init):
+    all_games["TEST_GAME"].players["p2"] = Rack(["Q", "I", "Z", "A", "X"])
+    socket_client_init.emit("rack_hints", {"name": "TEST_GAME", "player_id": "p2", "limit": 2})
+    resp = socket_client_init.get_received()
+    assert resp[0]["name"] == "rack_hints"
+    assert resp[0]["args"][0] == {"player_id": "p2", "rank": "length", "words": ["ZAX", "AI"]}
+
+
+def test_rack_hints_fail(socket_client_init):
+    socket_client_init.emit("rack_hints", {"name": "TEST_GAME", "player_id": "p3"})
+    resp = socket_client_init.get_received()
+    assert resp == [
+        {"name": "error", "args": [{"message": "You are not playing as p3."}], "namespace": "/"}
+    ]
+
+
+def test_auto_arrange_fail(socket_client_init):
+    socket_client_init.emit(
+        "auto_arrange", {"name": "TEST_GAME", "player_id": "p2", "time_budget": 60}
+    )
+    resp = socket_client_init.get_received()
+    assert resp[0]["name"] == "render_game"
+    assert resp[0]["args"][0]["status_code"] == 400
+    assert resp[0]["args"][0]["message"].split("\n")[0] == "60 is greater than the maximum of 10"
+
+
+def test_place_tile(socket_client_init):
+    all_games["TEST_GAME"].players["p2"] = Rack(["Q", "I"])
+    socket_client_init.emit(
+        "place_tile",
+        {
+            "game_id": "TEST_GAME",
+            "player_id": "p2",
+            "tile_id": "t0",
+            "letter": "Q",
+            "row": 0,
+            "col": 0,
+        },
+    )
+    socket_client_init.emit(
+        "place_tile",
+        {"game_id": "TEST_GAME", "player_id": "p2", "letter": "I", "row": 0, "col": 1},
+    )
+    resp = socket_client_init.get_received()
+    assert [r["name"] for r in resp] == ["tile_update", "tile_update"]
+    assert resp[1]["args"][0] == {
+        "player_id": "p2",
+        "board": {
+            "tiles": 2,
+            "words": ["QI"],
+            "invalid_words": [],
+            "connected": True,
+            "complete": True,
+        },
+    }
+
+    socket_client_init.emit(
+        "move_tile",
+        {
+            "game_id": "TEST_GAME",
+            "player_id": "p2",
+            "moves": [
+                {"from_row": 0, "from_col": 0, "to_row": 0, "to_col": 1},
+                {"from_row": 0, "from_col": 1, "to_row": 0, "to_col": 0},
+            ],
+        },
+    )
+    resp = socket_client_init.get_received()
+    assert resp[0]["args"][0]["board"]["invalid_words"] == ["IQ"]
+
+    socket_client_init.emit(
+        "remove_tile", {"game_id": "TEST_GAME", "player_id": "p2", "row": 0, "col": 0}
+    )
+    resp = socket_client_init.get_received()
+    assert resp[0]["args"][0]["board"]["tiles"] == 1
+
+
+def test_place_tile_fail(socket_client_init):
+    all_games["TEST_GAME"].players["p2"] = Rack(["A"])
+    socket_client_init.emit(
+        "place_tile",
+        {"game_id": "TEST_GAME", "player_id": "p2", "letter": "Q", "row": 0, "col": 0},
+    )
+    resp = socket_client_init.get_received()
+    assert resp[0]["name"] == "render_game"
+    assert resp[0]["args"][0]["status_code"] == 400
+
+    socket_client_init.emit(
+        "move_tile", {"game_id": "TEST_GAME", "player_id": "p2", "from_row": 0, "from_col": 0}
+    )
+    resp = socket_client_init.get_received()
+    assert resp[0]["name"] == "render_game"
+    assert resp[0]["args"][0]["status_code"] == 400
+
+
+def test_other_player(socket_client_init):
+    # The fixture's socket plays as p2, another socket must not act for it
+    other = socketio.test_client(app, flask_test_client=app.test_client())
+    other.emit("join", {"name": "TEST_GAME"})
+    other.emit("player_join", {"name": "TEST_GAME", "player_id": "p1"})
+    socket_client_init.get_received()
+    other.get_received()
+    rack = all_games["TEST_GAME"].rack("p2")
+    payloads = {
+        "swap": {"name": "TEST_GAME", "player_id": "p2", "letter": rack[0]},
+        "bananagrams": {"name": "TEST_GAME", "player_id": "p2", "words": []},
+        "find_words": {"name": "TEST_GAME", "player_id": "p2", "pattern": "??A?E"},
+        "rack_hints": {"name": "TEST_GAME", "player_id": "p2"},
+        "auto_arrange": {"name": "TEST_GAME", "player_id": "p2"},
+        "place_tile": {
+            "game_id": "TEST_GAME",
+            "player_id": "p2",
+            "letter": "A",
+            "row": 0,
+            "col": 0,
+        },
+        "move_tile": {
+            "game_id": "TEST_GAME",
+            "player_id": "p2",
+            "from_row": 0,
+            "from_col": 0,
+            "to_row": 0,
+            "to_col": 1,
+        },
+        "remove_tile": {"game_id": "TEST_GAME", "player_id": "p2", "row": 0, "col": 0},
+    }
+    for event, payload in payloads.items():
+        other.emit(event, payload)
+        resp = other.get_received()
+        assert [r["name"] for r in resp] == ["error"], event
+        assert resp[0]["args"][0] == {"message": "You are not playing as p2."}
+    # Nothing reached the room or the game
+    assert socket_client_init.get_received() == []
+    assert len(all_games["TEST_GAME"].boards["p2"]) == 0
+    assert all_games["TEST_GAME"].rack("p2") == rack
+    assert all_games["TEST_GAME"].state == State.ACTIVE
+    other.disconnect()
+
+
+def test_create_test_game(socket_client):
+    socket_client.emit("create_test_game", {"name": "TEST_GAME", "player_id": "p1"})
+    resp = socket_client.get_received()
+    assert resp[0]["name"] == "render_game"
+    assert resp[0]["args"][0]["message"] == "Game TEST_GAME already exists."
+    assert not all_games["TEST_GAME"].test_mode
+
+    all_games["TEST_GAME"] = Game("test_game", test_mode=True)
+    socket_client.emit("create_test_game", {"name": "TEST_GAME", "player_id": "p1"})
+    resp = socket_client.get_received()
+    assert resp[0]["name"] == "game_state"
+    assert resp[0]["args"][0]["state"] == "ACTIVE"
+    assert list(all_games["TEST_GAME"].players) == ["p1"]
+
+
+def test_journaled_game(socket_client):
+    socket_client.emit("create_test_game", {"name": "JOURNALED_GAME", "player_id": "p1"})
+    _ = socket_client.get_received()
+    game = all_games["JOURNALED_GAME"]
+    journal.flush()
+
+    recovered = Journal(journal.directory).recover()["JOURNALED_GAME"]
+    assert recovered.shared_state() == game.shared_state()
+    assert recovered.players == game.players
+    del all_games["JOURNALED_GAME"]
+
+
+def test_metrics(socket_client_init):
+    socket_client_init.emit("start_game", {"name": "TEST_GAME"})
+    all_games["TEST_GAME"].players["p2"] = Rack(["Q"])
+    socket_client_init.emit(
+        "place_tile",
+        {"game_id": "TEST_GAME", "player_id": "p2", "letter": "Q", "row": 0, "col": 0},
+    )
+    received = socket_client_init.get_received()
+    resp = app.test_client().get("/metrics")
+    assert resp.status_code == 200
+    assert resp.content_type.startswith("text/plain; version=0.0.4")
+    samples = dict(
+        line.rsplit(" ", 1)
+        for line in resp.data.decode("utf-8").splitlines()
+        if not line.startswith("#")
+    )
+    assert float(samples['bananagrams_event_errors_total{event="start_game",reason="state"}']) >= 1
+    assert float(samples['bananagrams_event_seconds_count{event="start_game"}']) >= 2
+    assert float(samples['bananagrams_games{state="ACTIVE"}']) >= 1
+    assert float(samples["bananagrams_games_in_memory"]) >= 1
+    assert float(samples["bananagrams_sessions"]) >= 1
+    assert "tile_update" in [message["name"] for message in received]
+    for event in ("game_state", "tile_update"):
+        assert (
+            float(samples[f'bananagrams_emitted_bytes_count{{event="{event}",format="json"}}']) >= 1
+        )
+    assert float(samples["bananagrams_journal_entries_total"]) >= 1
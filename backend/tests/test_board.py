@@ -0,0 +1,138 @@
+import random
+import unittest
+
+from board import Board, BoardError
+from game import is_word
+
+
+def full_scan(board: Board) -> tuple[list[str], int]:
+    """Every run of two or more tiles and the number of components, from scratch."""
+    words = []
+    for step in ((0, 1), (1, 0)):
+        for row, col in board.cells:
+            if (row - step[0], col - step[1]) in board.cells:
+                continue
+            run = ""
+            while (row, col) in board.cells:
+                run += board.cells[(row, col)]
+                row, col = row + step[0], col + step[1]
+            if len(run) > 1:
+                words.append(run)
+
+    components = 0
+    seen = set()
+    for cell in board.cells:
+        if cell in seen:
+            continue
+        components += 1
+        stack = [cell]
+        while stack:
+            row, col = stack.pop()
+            if (row, col) in seen or (row, col) not in board.cells:
+                continue
+            seen.add((row, col))
+            stack.extend(((row + 1, col), (row - 1, col), (row, col + 1), (row, col - 1)))
+    return sorted(words), components
+
+
+class TestBoard(unittest.TestCase):
+    def test_place(self):
+        b = Board(is_word)
+        for col, letter in enumerate("CAT"):
+            b.place(0, col, letter)
+
+        with self.subTest("Test word across."):
+            self.assertEqual(b.summary(3)["words"], ["CAT"])
+        with self.subTest("Test complete board."):
+            self.assertTrue(b.complete(3))
+
+        b.place(1, 0, "X")
+        with self.subTest("Test invalid word down."):
+            self.assertEqual(b.invalid_words(), ["CX"])
+            self.assertFalse(b.complete(4))
+        with self.subTest("Test occupied cell."), self.assertRaises(BoardError):
+            b.place(0, 0, "A")
+
+    def test_remove(self):
+        b = Board(is_word)
+        for col, letter in enumerate("CATS"):
+            b.place(0, col, letter)
+        b.place(1, 3, "O")
+
+        self.assertEqual(b.remove(0, 1), "A")
+        with self.subTest("Test words after splitting a run."):
+            self.assertEqual(sorted(b.words.values()), ["SO", "TS"])
+        with self.subTest("Test connectivity after splitting a run."):
+            self.assertEqual(b.components, 2)
+            self.assertFalse(b.connected)
+        with self.subTest("Test empty cell."), self.assertRaises(BoardError):
+            b.remove(0, 1)
+
+    def test_move(self):
+        b = Board(is_word)
+        for col, letter in enumerate("TA"):
+            b.place(0, col, letter, f"id_{col}")
+
+        b.move([(0, 0, 0, 1), (0, 1, 0, 0)])
+        with self.subTest("Test swapping two tiles."):
+            self.assertEqual(b.summary(2)["words"], ["AT"])
+            self.assertEqual(b.tile_ids, {(0, 0): "id_1", (0, 1): "id_0"})
+        with self.subTest("Test moving into an occupied cell."):
+            with self.assertRaises(BoardError):
+                b.move([(0, 0, 0, 1)])
+            self.assertEqual(b.cells, {(0, 0): "A", (0, 1): "T"})
+        with self.subTest("Test moving from an empty cell."), self.assertRaises(BoardError):
+            b.move([(5, 5, 6, 6)])
+
+    def test_random_updates(self):
+        rng = random.Random(0)
+        b = Board(is_word)
+        for i in range(2000):
+            cell = (rng.randrange(6), rng.randrange(6))
+            if cell in b.cells and rng.random() < 0.5:
+                b.remove(*cell)
+            elif cell not in b.cells:
+                b.place(*cell, rng.choice("AEIOST"))
+            if i % 50 == 0:
+                words, components = full_scan(b)
+                with self.subTest(i=i):
+                    self.assertEqual(sorted(b.words.values()), words)
+                    self.assertEqual(b.components, components)
+                    self.assertEqual(
+                        b.invalid_words(), sorted(word for word in words if not is_word(word))
+                    )
+                    rebuilt = Board.from_placements(list(b), is_word)
+                    self.assertEqual(rebuilt.words, b.words)
+                    self.assertEqual(rebuilt.components, components)
+
+    def test_random_moves(self):
+        rng = random.Random(1)
+        b = Board.from_placements(
+            [(row, col, "E") for row in range(8) for col in range(8) if rng.random() < 0.6], is_word
+        )
+        for i in range(1000):
+            source = rng.choice(list(b.cells))
+            target = (rng.randrange(-1, 9), rng.randrange(-1, 9))
+            if target in b.cells:
+                continue
+            b.move([(*source, *target)])
+            _, components = full_scan(b)
+            with self.subTest(i=i):
+                self.assertEqual(b.components, components)
+                # Neighbours share a label, so with the right count every label is a component
+                for row, col in b.cells:
+                    for neighbour in ((row + 1, col), (row, col + 1)):
+                        if neighbour in b.cells:
+                            self.assertEqual(b._label[(row, col)], b._label[neighbour])
+
+    def test_verify(self):
+        b = Board.from_placements([(0, 0, "q"), (0, 1, "i")], is_word)
+        with self.subTest("Test winning board."):
+            self.assertTrue(b.verify(["Q", "I"]).valid)
+        with self.subTest("Test tile counts."):
+            verdict = b.verify(["Q", "I", "I", "Z"])
+            self.assertFalse(verdict.valid)
+            self.assertEqual(verdict.missing, ["I", "Z"])
+            self.assertEqual(b.verify(["Q"]).extra, ["I"])
+        with self.subTest("Test duplicate cells."), self.assertRaises(BoardError):
+            Board.from_placements([(0, 0, "Q"), (0, 0, "I")], is_word)
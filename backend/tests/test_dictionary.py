@@ -0,0 +1,154 @@
+import os
+import tempfile
+import unittest
+
+from dictionary import Dictionary, DictionaryError, LazyDictionary, load_dictionary, main, pack
+
+
+class TestDictionary(unittest.TestCase):
+    def test_lookup(self):
+        d = Dictionary(pack(["CAT", "DOG", "AA", "HORSE", "CAT", "ZEBRA"]))
+
+        with self.subTest("Test words are found."):
+            for word in ["AA", "CAT", "DOG", "HORSE", "ZEBRA"]:
+                self.assertIn(word, d)
+        with self.subTest("Test missing words are not found."):
+            for word in ["", "A", "CA", "CATS", "COW", "ZEBRAS", "cat", "CAFÉ"]:
+                self.assertNotIn(word, d)
+        with self.subTest("Test non-string lookups."):
+            self.assertNotIn(None, d)
+            self.assertNotIn(b"CAT", d)
+        with self.subTest("Test duplicates dropped."):
+            self.assertEqual(len(d), 5)
+        with self.subTest("Test iteration."):
+            self.assertEqual(list(d), ["AA", "CAT", "DOG", "HORSE", "ZEBRA"])
+
+    def test_prefix_scan(self):
+        # Overlapping records must not produce matches across record boundaries
+        d = Dictionary(pack(["ABAB", "ABBA", "ABCA", "BABA"]))
+        for word in ["ABAB", "ABBA", "ABCA", "BABA"]:
+            self.assertIn(word, d)
+        for word in ["ABAA", "BABB", "BAAB", "BCAA", "ABCB"]:
+            self.assertNotIn(word, d)
+
+    def test_match(self):
+        d = Dictionary(pack(["ABASE", "ABATE", "AGATE", "CRATE", "CREATE", "GRACE", "GRADE", "QI"]))
+
+        with self.subTest("Test wildcards match any letter without a rack."):
+            self.assertEqual(
+                d.match("??A?E"), ["ABASE", "ABATE", "AGATE", "CRATE", "GRACE", "GRADE"]
+            )
+        with self.subTest("Test wildcards limited to the rack."):
+            self.assertEqual(d.match("??A?E", rack=["G", "R", "C", "D"]), ["GRACE", "GRADE"])
+        with self.subTest("Test rack tiles used at most once."):
+            self.assertEqual(d.match("??A?E", rack="ABST"), ["ABASE", "ABATE"])
+            self.assertEqual(d.match("??A?E", rack="AB"), [])
+            self.assertEqual(d.match("??A?E", rack="abs"), ["ABASE"])
+        with self.subTest("Test fixed letters need no tiles."):
+            self.assertEqual(d.match("qi", rack=[]), ["QI"])
+        with self.subTest("Test limit."):
+            self.assertEqual(d.match("??A?E", limit=2), ["ABASE", "ABATE"])
+            self.assertEqual(d.match("??A?E", limit=0), [])
+        with self.subTest("Test no words of the pattern length."):
+            self.assertEqual(d.match("???"), [])
+        with self.subTest("Test invalid pattern."), self.assertRaises(DictionaryError):
+            d.match("A*E")
+        with self.subTest("Test non-ASCII letters are not wildcards."):
+            for pattern in ("GR\u00c9CE", "\u00e9\u00e9A?E", "G\u2603ACE"):
+                with self.assertRaises(DictionaryError):
+                    d.match(pattern)
+
+    def test_match_large(self):
+        # Ranges large enough to be searched rather than scanned
+        words = [a + b + c for a in "ABCD" for b in "EFGHIJKLMNOPQRSTUVWXYZ" for c in "AEIOU"]
+        d = Dictionary(pack(words))
+        with self.subTest("Test every word matches the open pattern."):
+            self.assertEqual(d.match("???"), sorted(words))
+        with self.subTest("Test fixed letters."):
+            self.assertEqual(d.match("?Q?", rack="CE"), ["CQE"])
+            self.assertEqual(len(d.match("B??")), 22 * 5)
+        with self.subTest("Test repeated rack tiles."):
+            self.assertEqual(d.match("???", rack="BEE"), ["BEE"])
+            self.assertEqual(d.match("???", rack="BE"), [])
+
+    def test_invalid(self):
+        with self.subTest("Test bad magic."), self.assertRaises(DictionaryError):
+            Dictionary(b"NOTWORDS" + bytes(8))
+        with self.subTest("Test truncated."), self.assertRaises(DictionaryError):
+            Dictionary(pack(["HELLO", "WORLD"])[:-3])
+        with self.subTest("Test checksum mismatch."), self.assertRaises(DictionaryError):
+            data = bytearray(pack(["HELLO", "WORLD"]))
+            data[-1] ^= 1
+            Dictionary(bytes(data))
+        with self.subTest("Test packing invalid words."):
+            for word in ["", "cat", "TWO WORDS", "CAFÉ"]:
+                with self.assertRaises(DictionaryError):
+                    pack([word])
+
+    def test_load_dictionary(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "words.txt")
+            with open(source, "w") as file:
+                file.write("Word list title.\n\nAA\naah\nZZZ\n")
+
+            d = load_dictionary(source)
+            with self.subTest("Test packed file written next to source."):
+                self.assertTrue(os.path.exists(os.path.join(tmp, "words.bin")))
+            with self.subTest("Test loaded words."):
+                self.assertEqual(list(d), ["AA", "AAH", "ZZZ"])
+
+            # Make the source newer than the packed file
+            with open(source, "a") as file:
+                file.write("QI\n")
+            packed_mtime = os.path.getmtime(os.path.join(tmp, "words.bin"))
+            os.utime(source, (packed_mtime + 10, packed_mtime + 10))
+            with self.subTest("Test stale packed file rebuilt."):
+                self.assertIn("QI", load_dictionary(source))
+
+            with open(os.path.join(tmp, "words.bin"), "r+b") as file:
+                file.seek(8)
+                file.write(b"\x01\x00")
+            with self.subTest("Test packed file from another version rebuilt."):
+                self.assertIn("QI", load_dictionary(source))
+
+    def test_lazy_dictionary(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "words.txt")
+            with open(source, "w") as file:
+                file.write("AA\nQI\n")
+
+            d = LazyDictionary(source)
+            with self.subTest("Test nothing loaded on creation."):
+                self.assertFalse(d.loaded)
+                self.assertFalse(os.path.exists(os.path.join(tmp, "words.bin")))
+            with self.subTest("Test loaded on first lookup."):
+                self.assertIn("QI", d)
+                self.assertTrue(d.loaded)
+                self.assertEqual(len(d), 2)
+
+    def test_build_cli(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "words.txt")
+            output = os.path.join(tmp, "out.bin")
+            with open(source, "w") as file:
+                file.write("Title line.\nqi\nAA\nQI\n")
+
+            main(["--source", source, "--output", output])
+            with self.subTest("Test words normalized and deduplicated."):
+                self.assertEqual(list(Dictionary.open(output)), ["AA", "QI"])
+            with self.subTest("Test check of a valid file."):
+                main(["--source", source, "--output", output, "--check"])
+
+            with open(output, "ab") as file:
+                file.write(b"X")
+            with self.subTest("Test check of a corrupt file."), self.assertRaises(SystemExit):
+                main(["--source", source, "--output", output, "--check"])
+
+    def test_game_words(self):
+        d = load_dictionary("words/words.txt")
+        with self.subTest("Test full word list loaded."):
+            self.assertGreater(len(d), 279000)
+        with self.subTest("Test lookups against full word list."):
+            self.assertIn("WINNING", d)
+            self.assertIn("ZYZZYVAS", d)
+            self.assertNotIn("XDEFX", d)
@@ -0,0 +1,204 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from flask import Flask, request
+from jsonschema import Draft7Validator, SchemaError, ValidationError, validate
+
+from events import GameEvents, compile_schema
+from game import Game, GameError
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "player_id": {"type": "string"}},
+    "required": ["name", "player_id"],
+}
+
+
+class FakeSocketIO:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event):
+        def register(handler):
+            self.handlers[event] = handler
+            return handler
+
+        return register
+
+
+class TestGameEvents(unittest.TestCase):
+    def setUp(self):
+        self.socketio = FakeSocketIO()
+        self.game = Game("game")
+        self.emit_error = MagicMock()
+        self.sessions = {}
+        self.events = GameEvents(
+            self.socketio, {"game": self.game}, self.emit_error, MagicMock(), sessions=self.sessions
+        )
+        self.calls = []
+
+        @self.events.on("join", SCHEMA)
+        def join(data, game_name, game):
+            self.calls.append((game_name, game))
+            game.join_game(data["player_id"])
+
+    def test_valid(self):
+        self.socketio.handlers["join"]({"name": "game", "player_id": "p1"})
+        with self.subTest("Test handler is given the game."):
+            self.assertEqual(self.calls, [("game", self.game)])
+            self.assertEqual(list(self.game.players), ["p1"])
+            self.emit_error.assert_not_called()
+
+    def test_invalid(self):
+        data = {"name": "game"}
+        self.socketio.handlers["join"](data)
+        with self.subTest("Test the error is the one validate gives."):
+            with self.assertRaises(ValidationError) as e:
+                validate(data, SCHEMA)
+            self.emit_error.assert_called_once_with("game", str(e.exception))
+            self.assertEqual(self.calls, [])
+        with self.subTest("Test payload without a game is only logged."):
+            self.socketio.handlers["join"]({"player_id": "p1"})
+            self.socketio.handlers["join"](None)
+            self.assertEqual(self.emit_error.call_count, 1)
+            self.assertEqual(self.events.logger.error.call_count, 2)
+
+    def test_missing_game(self):
+        self.socketio.handlers["join"]({"name": "other", "player_id": "p1"})
+        self.emit_error.assert_called_once_with("other", "Could not find the game named other.")
+        self.assertEqual(self.calls, [])
+
+    def test_game_error(self):
+        self.game.start_game = MagicMock(side_effect=GameError("Cannot start."))
+
+        @self.events.on("start_game", SCHEMA)
+        def start_game(data, game_name, game):
+            game.start_game()
+
+        self.socketio.handlers["start_game"]({"name": "game", "player_id": "p1"})
+        self.emit_error.assert_called_once_with("game", "Cannot start.")
+        with self.subTest("Test the error is logged without its traceback."):
+            _, kwargs = self.events.logger.warning.call_args
+            self.assertEqual(kwargs, {"extra": {"event": "start_game"}})
+        with self.subTest("Test the error is counted by reason."):
+            errors = self.events.metrics.metrics["bananagrams_event_errors_total"]
+            self.assertEqual(errors.labels("start_game", "other").value, 1)
+            seconds = self.events.metrics.metrics["bananagrams_event_seconds"]
+            self.assertEqual(sum(seconds.labels("start_game").counts), 1)
+
+    def test_without_game(self):
+        created = []
+
+        @self.events.on("create", SCHEMA, find_game=False)
+        def create(data, game_name):
+            created.append(game_name)
+
+        self.socketio.handlers["create"]({"name": "new", "player_id": "p1"})
+        self.assertEqual(created, ["new"])
+
+    def test_player(self):
+        hinted = []
+
+        @self.events.on("hints", SCHEMA, player="player_id")
+        def hints(data, game_name, game):
+            hinted.append(data["player_id"])
+
+        self.sessions.update({"sid_1": ("game", "p1"), "sid_2": ("other", "p2")})
+        for sid, player_id, allowed in [
+            ("sid_1", "p1", True),
+            ("sid_1", "p2", False),
+            ("sid_2", "p2", False),
+            ("sid_3", "p1", False),
+        ]:
+            with (
+                self.subTest(sid=sid, player_id=player_id),
+                Flask(__name__).test_request_context(),
+                patch("events.emit") as emit,
+            ):
+                request.sid = sid
+                hinted.clear()
+                self.socketio.handlers["hints"]({"name": "game", "player_id": player_id})
+                self.assertEqual(hinted, [player_id] if allowed else [])
+                if allowed:
+                    emit.assert_not_called()
+                else:
+                    emit.assert_called_once_with(
+                        "error", {"message": f"You are not playing as {player_id}."}
+                    )
+        with self.subTest("Test the socket alone is told, and the rejection counted."):
+            self.emit_error.assert_not_called()
+            errors = self.events.metrics.metrics["bananagrams_event_errors_total"]
+            self.assertEqual(errors.labels("hints", "not_player").value, 3)
+
+    def test_invalid_schema(self):
+        with self.assertRaises(SchemaError):
+            self.events.on("bad", {"type": "nothing"})
+
+
+# Every keyword compile_schema supports
+FULL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": ["string", "number"]},
+        "count": {"type": "integer", "minimum": 1, "maximum": 5},
+        "budget": {"type": "number", "exclusiveMinimum": 0},
+        "flag": {"type": "boolean"},
+        "rank": {"enum": ["length", "letters"]},
+        "word": {"type": "string", "pattern": "^[A-Z]+$", "maxLength": 4},
+        "board": {
+            "anyOf": [
+                {"type": "array", "items": {"type": "string"}, "maxItems": 2},
+                {"type": "array", "items": {"type": "null"}, "minItems": 1},
+            ]
+        },
+    },
+    "required": ["name"],
+}
+
+PAYLOADS = [
+    {"name": "game"},
+    {"name": 1.5},
+    {"name": True},
+    {"name": None},
+    {},
+    [],
+    "game",
+    None,
+    {"name": "game", "count": 3},
+    {"name": "game", "count": 3.0},
+    {"name": "game", "count": 3.5},
+    {"name": "game", "count": True},
+    {"name": "game", "count": 0},
+    {"name": "game", "count": 6},
+    {"name": "game", "budget": 0},
+    {"name": "game", "budget": 0.1},
+    {"name": "game", "budget": False},
+    {"name": "game", "flag": 1},
+    {"name": "game", "flag": False},
+    {"name": "game", "rank": "letters"},
+    {"name": "game", "rank": "size"},
+    {"name": "game", "word": "ABCD"},
+    {"name": "game", "word": "ABCDE"},
+    {"name": "game", "word": "abc"},
+    {"name": "game", "word": 7},
+    {"name": "game", "board": []},
+    {"name": "game", "board": ["A", "B"]},
+    {"name": "game", "board": ["A", "B", "C"]},
+    {"name": "game", "board": [None, None, None]},
+    {"name": "game", "board": ["A", None]},
+    {"name": "game", "board": {}},
+]
+
+
+class TestCompileSchema(unittest.TestCase):
+    def test_same_as_jsonschema(self):
+        check = compile_schema(FULL_SCHEMA)
+        validator = Draft7Validator(FULL_SCHEMA)
+        for payload in PAYLOADS:
+            with self.subTest(payload=payload):
+                self.assertEqual(check(payload), validator.is_valid(payload))
+
+    def test_unsupported_keyword(self):
+        self.assertIsNone(compile_schema({"type": "object", "minProperties": 1}))
+        self.assertIsNone(compile_schema({"properties": {"n": {"const": 1}}}))
+        self.assertIsNone(compile_schema({"enum": [1, True]}))
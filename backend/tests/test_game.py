@@ -1,7 +1,13 @@
+import json
+import threading
 import time
 import unittest
+from unittest.mock import patch
 
-from game import Game, GameError, State
+import game as game_module
+from game import CommandTimer, Game, GameError, State, command, is_word, validate_words
+from metrics import Registry
+from tiles import Rack
 
 
 class TestGameMethods(unittest.TestCase):
@@ -34,7 +40,7 @@ class TestGameMethods(unittest.TestCase):
         with self.subTest("Check number of players set to None."):
             self.assertEqual(g.num_players, None)
         with self.subTest("Check players have no tiles after reset"):
-            self.assertTrue(all(g.players[id_] == [] for id_ in ids))
+            self.assertTrue(all(len(g.players[id_]) == 0 for id_ in ids))
         g.join_game("id_2")
         with self.subTest("Check players can join after reset."):
             self.assertEqual(len(g.players), 3)
@@ -196,7 +202,7 @@ class TestGameMethods(unittest.TestCase):
         g.start_game()
         for _ in range((g.tiles_remaining // g.num_players) - 1):
             g.peel(test=True)
-        g.players["id_3"] = []
+        g.players["id_3"] = Rack()
         g.num_players = len(g.players)
         with self.subTest("Try peel with too many players."):
             try:
@@ -220,7 +226,7 @@ class TestGameMethods(unittest.TestCase):
                 self.fail()
 
         g.start_game()
-        g.players["id_0"] = ["A", "B", "C"]
+        g.players["id_0"] = Rack(["A", "B", "C"])
         with self.subTest("Remove an invalid letter."):
             try:
                 g.swap("D", "id_0")
@@ -234,7 +240,7 @@ class TestGameMethods(unittest.TestCase):
         for id_ in ids:
             g.join_game(id_)
         g.start_game()
-        g.swap(g.players["id_0"][0], "id_0")
+        g.swap(g.rack("id_0")[0], "id_0")
         with self.subTest("See if the letter length is correct for swap player."):
             self.assertEqual(len(g.players["id_0"]), 23)
         with self.subTest("See if the letter length is correct for non-swap player."):
@@ -248,18 +254,18 @@ class TestGameMethods(unittest.TestCase):
         with self.subTest("Test state not endgame pre-insufficient swap."):
             self.assertNotEqual(g.state, State.ENDGAME)
         prev_player_tiles = len(g.players["id_0"])
-        player_tile = g.players["id_0"][0]
+        player_tile = g.rack("id_0")[0]
         g.swap(player_tile, "id_0")
         with self.subTest("Test state in endgame after insufficient-swap"):
             self.assertEqual(g.state, State.ENDGAME)
         with self.subTest("Test that player got all remaining new tiles."):
             self.assertEqual(len(g.players["id_0"]) - prev_player_tiles, 1)
         with self.subTest("Make sure player tile still put on deck"):
-            self.assertEqual([player_tile], g.tiles)
+            self.assertEqual([player_tile], list(g.tiles))
 
         with self.subTest("Test swap in state 'ENDGAME'"):
             try:
-                g.swap(g.players["id_0"][0], "id_0")
+                g.swap(g.rack("id_0")[0], "id_0")
             except GameError:
                 self.fail()
 
@@ -285,17 +291,80 @@ class TestGameMethods(unittest.TestCase):
             self.assertEqual(g.winning_words, None)
 
         g.peel(test=True)
-        g.bananagrams("winning_player", ["winning", "words", "xdefx"])
+        g.bananagrams("id_0", ["winning", "words", "xdefx"])
 
         with self.subTest("Test game in over state."):
             self.assertEqual(g.state, State.OVER)
         with self.subTest("Test winning player after game over."):
-            self.assertEqual(g.winning_player, "winning_player")
+            self.assertEqual(g.winning_player, "id_0")
         with self.subTest("Test winning tiles after game over."):
             self.assertEqual(
                 g.winning_words, [("winning", True), ("words", True), ("xdefx", False)]
             )
 
+    def test_bananagrams_verdict(self):
+        g = Game("")
+        for id_ in ["id_0", "id_1"]:
+            g.join_game(id_)
+        g.start_game()
+        for _ in range((g.tiles_remaining // g.num_players) - 1):
+            g.peel(test=True)
+        g.peel(test=True)
+        g.players["id_0"] = Rack("CATSO")
+
+        with self.subTest("Test unknown player."):
+            try:
+                g.bananagrams("id_2", board=["CATS"])
+            except GameError:
+                pass
+            else:
+                self.fail()
+        with self.subTest("Test malformed board."):
+            try:
+                g.bananagrams("id_0", board=[(0, 0, "C"), (0, 0, "A")])
+            except GameError:
+                pass
+            else:
+                self.fail()
+
+        with self.subTest("Test more tiles than the player has."):
+            for board in (["CATS", "...OQ"], ["E" * 144] * 144):
+                with self.assertRaises(GameError):
+                    g.bananagrams("id_0", board=board)
+            self.assertEqual(g.state, State.ENDGAME)
+
+        verdict = g.bananagrams("id_0", board=["CATS", "...O"])
+        with self.subTest("Test valid grid."):
+            self.assertTrue(verdict.valid)
+            self.assertEqual(verdict.words, ["CATS", "SO"])
+            self.assertEqual(g.winning_words, [("CATS", True), ("SO", True)])
+        g.continue_game()
+
+        cases = [
+            ("Test missing tile.", ["CATS"], {"missing": ["O"]}),
+            (
+                "Test extra tile.",
+                ["CATS", "...Q"],
+                {"extra": ["Q"], "missing": ["O"], "invalid_words": ["SQ"]},
+            ),
+            ("Test disconnected board.", ["CAT", "", "SO"], {"components": 2}),
+            ("Test invalid word.", ["TACS", "...O"], {"invalid_words": ["TACS"]}),
+        ]
+        for name, board, expected in cases:
+            verdict = g.bananagrams("id_0", board=board)
+            g.continue_game()
+            with self.subTest(name):
+                self.assertFalse(verdict.valid)
+                for key, value in expected.items():
+                    self.assertEqual(getattr(verdict, key), value)
+
+        for col, letter in enumerate("CATS"):
+            g.place_tile("id_0", 0, col, letter)
+        g.place_tile("id_0", 1, 3, "O")
+        verdict = g.bananagrams("id_0", ["CATS", "SO"])
+        with self.subTest("Test board tracked by the server."):
+            self.assertTrue(verdict.valid)
+
     def test_continue(self):
         g = Game("")
         ids = [f"id_{x}" for x in range(2)]
@@ -314,7 +383,7 @@ class TestGameMethods(unittest.TestCase):
             else:
                 self.fail()
 
-        g.bananagrams("player_id", ["winning", "words", "xdefx"])
+        g.bananagrams("id_0", ["winning", "words", "xdefx"])
         g.continue_game()
 
         with self.subTest("Test game in endgame state."):
@@ -371,3 +440,224 @@ class TestGameMethods(unittest.TestCase):
             self.assertEqual(len(g_test.tiles), 10)
         with self.subTest("Test reset maintains test mode flag"):
             self.assertTrue(g_test.test_mode)
+
+    def test_validate_words(self):
+        is_word.cache_clear()
+        with self.subTest("Test verdicts for a batch of words."):
+            self.assertEqual(
+                validate_words(["winning", "WORDS", "xdefx", ""]),
+                [("winning", True), ("WORDS", True), ("xdefx", False), ("", False)],
+            )
+        validate_words(["winning", "xdefx"])
+        with self.subTest("Test repeated words served from the shared cache."):
+            self.assertEqual(is_word.cache_info().hits, 2)
+
+    def test_find_words(self):
+        g = Game("")
+        for id_ in ["id_0", "id_1"]:
+            g.join_game(id_)
+        g.start_game()
+        g.players["id_0"] = Rack(["G", "R", "C", "D", "X"])
+
+        with self.subTest("Test words built from the player's rack."):
+            self.assertEqual(g.find_words("id_0", "??A?E"), ["GRACE", "GRADE"])
+        with self.subTest("Test limit."):
+            self.assertEqual(g.find_words("id_0", "??A?E", limit=1), ["GRACE"])
+        with self.subTest("Test unknown player."):
+            try:
+                g.find_words("id_2", "??A?E")
+            except GameError:
+                pass
+            else:
+                self.fail()
+        with self.subTest("Test invalid pattern."):
+            try:
+                g.find_words("id_0", "A*E")
+            except GameError:
+                pass
+            else:
+                self.fail()
+
+    def test_place_tile(self):
+        g = Game("")
+        for id_ in ["id_0", "id_1"]:
+            g.join_game(id_)
+        with self.subTest("Test placing before the game starts."):
+            try:
+                g.place_tile("id_0", 0, 0, "A")
+            except GameError:
+                pass
+            else:
+                self.fail()
+
+        g.start_game()
+        g.players["id_0"] = Rack(["Q", "I", "T"])
+        g.place_tile("id_0", 0, 0, "Q")
+        board = g.place_tile("id_0", 0, 1, "i")
+        with self.subTest("Test board summary."):
+            self.assertEqual(board["words"], ["QI"])
+            self.assertFalse(board["complete"])
+        with self.subTest("Test placing a tile the player does not have."):
+            try:
+                g.place_tile("id_0", 1, 0, "Q")
+            except GameError:
+                pass
+            else:
+                self.fail()
+        with self.subTest("Test swapping a tile on the board."):
+            try:
+                g.swap("Q", "id_0")
+            except GameError:
+                pass
+            else:
+                self.fail()
+
+        board = g.move_tiles("id_0", [(0, 1, 1, 0)])
+        with self.subTest("Test moving a tile."):
+            self.assertEqual(board["words"], ["QI"])
+        board = g.place_tile("id_0", 0, 1, "T")
+        with self.subTest("Test complete board."):
+            self.assertEqual(board["invalid_words"], ["QT"])
+            self.assertFalse(board["complete"])
+        board = g.remove_tile("id_0", 0, 1)
+        with self.subTest("Test removing a tile."):
+            self.assertEqual(board["tiles"], 2)
+            self.assertEqual(board["invalid_words"], [])
+
+    def test_changes_since(self):
+        with patch("game.CHANGE_LOG_SIZE", 4):
+            g = Game("")
+        for id_ in ["id_0", "id_1"]:
+            g.join_game(id_)
+        g.start_game()
+        change = g.peel(test=True)
+
+        with self.subTest("Test peel delta."):
+            self.assertEqual(change.version, g.version)
+            self.assertEqual(
+                change.delta(),
+                {
+                    "base": g.version - 1,
+                    "version": g.version,
+                    "state": {"tiles_remaining": 100},
+                    "dealt": 1,
+                },
+            )
+            self.assertEqual(sorted(change.racks), ["id_0", "id_1"])
+        with self.subTest("Test merged changes."):
+            delta = g.changes_since(g.version - 2)
+            self.assertEqual(delta["players"], {"id_0": 22, "id_1": 22})
+            self.assertEqual(delta["state"]["tiles_remaining"], 100)
+        with self.subTest("Test up to date client."):
+            self.assertEqual(g.changes_since(g.version), {"base": g.version, "version": g.version})
+
+        for _ in range(4):
+            g.swap(g.rack("id_0")[0], "id_0")
+        with self.subTest("Test client older than the change log."):
+            self.assertIsNone(g.changes_since(1))
+        g.reset()
+        with self.subTest("Test client from before a reset."):
+            self.assertIsNone(g.changes_since(g.version - 1))
+
+    def test_last_active(self):
+        g = Game("")
+        before = g.last_active
+        time.sleep(0.01)
+        g.join_game("id_0")
+        self.assertGreater(g.last_active, before)
+
+    def test_retire(self):
+        g = Game("game")
+        g.join_game("id_0")
+        g.join_game("id_1")
+        g.start_game()
+        letter = g.rack("id_0")[0]
+        g.place_tile("id_0", 0, 0, letter, "tile_0")
+        g.state = State.ENDGAME
+        g.bananagrams("id_1", board=[])
+
+        restored = Game.from_bytes(g.retire())
+        with self.subTest("Test round trip."):
+            self.assertEqual(restored.shared_state(), g.shared_state())
+            self.assertEqual(restored.players, g.players)
+            self.assertEqual(list(restored.tiles), list(g.tiles))
+            self.assertEqual(restored.boards["id_0"].cells, {(0, 0): letter})
+            self.assertEqual(restored.boards["id_0"].tile_ids, {(0, 0): "tile_0"})
+            self.assertEqual(restored.date_created, g.date_created)
+        with (
+            self.subTest("Test retired game takes no more commands."),
+            self.assertRaises(GameError),
+        ):
+            g.rack("id_0")
+
+    def test_seed(self):
+        def play(game: Game) -> Game:
+            game.join_game("id_0")
+            game.join_game("id_1")
+            game.start_game()
+            game.peel(test=True)
+            game.swap(game.rack("id_0")[0], "id_0")
+            return game
+
+        g = play(Game("game", seed=7))
+        with self.subTest("Test same seed, same tiles."):
+            self.assertEqual(play(Game("other", seed=7)).players, g.players)
+            self.assertNotEqual(play(Game("other", seed=8)).players, g.players)
+        with self.subTest("Test seed and draws are kept when packed."):
+            restored = Game.from_bytes(g.pack())
+            self.assertEqual(restored.rng.getstate(), g.rng.getstate())
+            g.peel(test=True)
+            restored.peel(test=True)
+            self.assertEqual(restored.players, g.players)
+
+    def test_encoded_state(self):
+        g = Game("")
+        encoded = g.encoded_state()
+        with self.subTest("Test encoding."):
+            self.assertEqual(json.loads(encoded), g.shared_state())
+        with self.subTest("Test unchanged game is not encoded again."):
+            self.assertIs(g.encoded_state(), encoded)
+            self.assertEqual((g.snapshot_hits, g.snapshot_misses), (1, 1))
+
+        g.join_game("id_0")
+        with self.subTest("Test change invalidates the encoding."):
+            self.assertEqual(json.loads(g.encoded_state())["players"], {"id_0": 0})
+            self.assertEqual((g.snapshot_hits, g.snapshot_misses), (1, 2))
+
+    def test_command_times(self):
+        timer = CommandTimer(Registry(), slow=0)
+        g = Game("game")
+        with patch.object(game_module, "_timer", timer), self.assertLogs("game") as logs:
+            g.join_game("id_0")
+            g.join_game("id_1")
+        with self.subTest("Test times by command."):
+            self.assertEqual(sum(timer.wait.labels("join_game").counts), 2)
+            self.assertEqual(sum(timer.run.labels("join_game").counts), 2)
+            self.assertEqual(g.run_seconds, timer.run.labels("join_game").sum)
+            self.assertGreater(g.run_seconds, 0)
+        with self.subTest("Test slow commands are logged."):
+            self.assertEqual(len(logs.output), 2)
+            self.assertIn("join_game kept the game named game", logs.output[0])
+
+    def test_command_timeout(self):
+        class SlowGame(Game):
+            @command
+            def hold(self, release: threading.Event):
+                release.wait()
+
+        g = SlowGame("game")
+        g.mailbox.timeout = 0.05
+        release = threading.Event()
+        holder = threading.Thread(target=g.hold, args=(release,))
+        holder.start()
+        while g.running is None:
+            time.sleep(0.001)
+        try:
+            with self.assertLogs("game") as logs, self.assertRaises(GameError):
+                g.join_game("id_0")
+        finally:
+            release.set()
+            holder.join()
+        self.assertIn(
+            "join_game timed out waiting for the game named game, where hold", logs.output[0]
+        )
@@ -0,0 +1,80 @@
+import unittest
+
+from game import Game, GameError
+from hibernate import Hibernator
+from registry import GameRegistry
+
+
+class TestHibernator(unittest.TestCase):
+    def test_save_restore(self):
+        store = Hibernator(":memory:")
+        game = Game("game")
+        game.join_game("id_0")
+        game.join_game("id_1")
+        game.start_game()
+
+        self.assertTrue(store.save("game", game))
+        with self.subTest("Test packed away."):
+            self.assertIn("game", store)
+            self.assertNotIn(1, store)
+            self.assertEqual(store.names(), ["game"])
+            with self.assertRaises(GameError):
+                game.peel(test=True)
+
+        restored = store.restore("game")
+        with self.subTest("Test brought back."):
+            self.assertEqual(restored.players, game.players)
+            self.assertEqual(restored.shared_state(), game.shared_state())
+            self.assertEqual(len(store), 0)
+            self.assertEqual((store.hibernated, store.resumed), (1, 1))
+        with self.subTest("Test missing game."):
+            self.assertIsNone(store.restore("game"))
+
+    def test_save_fails(self):
+        store = Hibernator(":memory:")
+        store._db.execute(
+            "CREATE TRIGGER full BEFORE INSERT ON games BEGIN SELECT RAISE(ABORT, 'full'); END"
+        )
+        games = GameRegistry(ttl=60, store=store)
+        games["game"] = game = Game("game")
+        game.join_game("id_0")
+        game.join_game("id_1")
+        game.start_game()
+
+        with self.assertLogs("hibernate", "ERROR"):
+            self.assertFalse(store.save("game", game))
+        with self.subTest("Test the game carries on in memory."):
+            self.assertFalse(game.retired)
+            game.peel(test=True)
+            self.assertNotIn("game", store)
+            self.assertEqual(store.hibernated, 0)
+        with self.subTest("Test the registry keeps it."), self.assertLogs("hibernate", "ERROR"):
+            self.assertEqual(games.expire(now=game.last_active + 60), [])
+            self.assertIs(games["game"], game)
+
+    def test_purge(self):
+        store = Hibernator(":memory:")
+        store.save(1, Game("1"))
+        self.assertEqual(store.purge(0), 0)
+        self.assertEqual(store.purge(float("inf")), 1)
+        self.assertEqual(len(store), 0)
+
+    def test_registry(self):
+        store = Hibernator(":memory:")
+        games = GameRegistry(ttl=60, store=store)
+        games["game"] = game = Game("game")
+        game.join_game("id_0")
+
+        with self.subTest("Test expired game is hibernated."):
+            self.assertEqual(games.expire(now=game.last_active + 60), ["game"])
+            self.assertEqual(len(games), 0)
+            self.assertIn("game", games)
+        with self.subTest("Test lookup brings it back."):
+            restored = games["game"]
+            self.assertIsNot(restored, game)
+            self.assertEqual(list(restored.players), ["id_0"])
+            self.assertEqual(len(games), 1)
+            self.assertEqual(len(store), 0)
+        with self.subTest("Test get or create finds it."):
+            games.expire(now=restored.last_active + 60)
+            self.assertEqual(games.get_or_create("game", lambda: Game("new"))[0].id, "game")
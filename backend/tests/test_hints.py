@@ -0,0 +1,52 @@
+import unittest
+from collections import Counter
+
+from dictionary import Dictionary, pack
+from hints import HintEngine, get_engine
+
+WORDS = ["AA", "AB", "BA", "CAB", "ABBA", "BAA", "QI", "ZAX", "ABACA"]
+
+
+class TestHintEngine(unittest.TestCase):
+    def test_words_for_rack(self):
+        e = HintEngine(Dictionary(pack(WORDS)))
+
+        with self.subTest("Test every sub-anagram of the rack found."):
+            self.assertEqual(sorted(e.words_for_rack("BAAC")), ["AA", "AB", "BA", "BAA", "CAB"])
+        with self.subTest("Test longest words first."):
+            self.assertEqual(e.words_for_rack("BAAC", limit=2), ["BAA", "CAB"])
+        with self.subTest("Test rarer letters first."):
+            self.assertEqual(e.words_for_rack("ZAXQIB", limit=2, rank="letters"), ["ZAX", "QI"])
+        with self.subTest("Test tiles used at most once."):
+            self.assertEqual(e.words_for_rack("AB"), ["AB", "BA"])
+        with self.subTest("Test lower case and empty racks."):
+            self.assertEqual(e.words_for_rack("qi"), ["QI"])
+            self.assertEqual(e.words_for_rack(""), [])
+        with self.subTest("Test unknown ranking."), self.assertRaises(ValueError):
+            e.words_for_rack("AB", rank="score")
+
+    def test_batch(self):
+        e = HintEngine(Dictionary(pack(WORDS)))
+
+        with self.subTest("Test a batch of racks."):
+            self.assertEqual(
+                e.words_for_racks(["QI", "ZAXE", "ABBA"], limit=1), [["QI"], ["ZAX"], ["ABBA"]]
+            )
+        with self.subTest("Test empty batch."):
+            self.assertEqual(e.words_for_racks([]), [])
+        with self.subTest("Test every player of a game."):
+            self.assertEqual(
+                e.words_for_players({"p1": ["Q", "I"], "p2": ["Z"]}), {"p1": ["QI"], "p2": []}
+            )
+
+    def test_game_words(self):
+        e = get_engine()
+        rack = "RETAINSQ"
+        words = e.words_for_rack(rack)
+        with self.subTest("Test results are sub-anagrams of the rack."):
+            self.assertTrue(all(not Counter(word) - Counter(rack) for word in words))
+        with self.subTest("Test known words found."):
+            self.assertIn("RETAINS", words)
+            self.assertIn("QAT", words)
+        with self.subTest("Test longest first."):
+            self.assertEqual(len(words[0]), 7)
@@ -0,0 +1,52 @@
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import eventlet
+
+from events import GameEvents, running_event
+from hubwatch import HubWatchdog
+from metrics import Registry
+from tests.test_events import FakeSocketIO
+
+
+def block_hub(seconds: float):
+    # Not monkey patched, so the whole hub waits
+    time.sleep(seconds)
+
+
+class TestHubWatchdog(unittest.TestCase):
+    def setUp(self):
+        self.watchdog = HubWatchdog(
+            Registry(), threshold=0.1, interval=0.01, describe=running_event
+        )
+        self.watchdog.start()
+        self.addCleanup(self.watchdog.stop)
+        # Let it beat
+        eventlet.sleep(0.05)
+
+    def test_stall(self):
+        socketio = FakeSocketIO()
+        events = GameEvents(socketio, {}, MagicMock(), MagicMock())
+        events.on("slow", {"type": "object", "required": ["name"]}, find_game=False)(
+            lambda data, game_name: block_hub(0.3)
+        )
+        with self.assertLogs("hubwatch") as logs:
+            socketio.handlers["slow"]({"name": "game"})
+            eventlet.sleep(0.05)
+        with self.subTest("Test the stall is reported with its event and stack."):
+            self.assertEqual(len(logs.output), 1)
+            self.assertIn("handling slow", logs.output[0])
+            self.assertIn("in block_hub", logs.output[0])
+            self.assertEqual(logs.records[0].event, "slow")
+        with self.subTest("Test the lag is recorded."):
+            self.assertEqual(self.watchdog.stalls.labels().value, 1)
+            self.assertGreaterEqual(self.watchdog.lag.labels().sum, 0.2)
+
+    def test_no_stall(self):
+        with self.assertNoLogs("hubwatch"):
+            for _ in range(10):
+                block_hub(0.005)
+                eventlet.sleep(0.01)
+        self.assertEqual(self.watchdog.stalls.labels().value, 0)
+        self.assertGreater(sum(self.watchdog.lag.labels().counts), 0)
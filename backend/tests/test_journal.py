@@ -0,0 +1,135 @@
+import os
+import tempfile
+import unittest
+
+from game import Game, State
+from hibernate import Hibernator
+from journal import Journal
+
+
+def play(journal: Journal, name: str) -> Game:
+    """A game partway through, with every kind of journaled command."""
+    game = Game(name, journal=journal)
+    for player in ("id_0", "id_1", "id_2"):
+        game.join_game(player)
+    game.start_game()
+    game.peel(test=True)
+    game.swap(game.rack("id_0")[0], "id_0")
+    letters = game.rack("id_1")
+    game.place_tile("id_1", 0, 0, letters[0], "tile_0")
+    game.place_tile("id_1", 0, 1, letters[1], "tile_1")
+    game.move_tiles("id_1", [(0, 1, 1, 0)])
+    game.remove_tile("id_1", 0, 0)
+    return game
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def assert_same_game(self, recovered: Game, game: Game):
+        self.assertEqual(recovered.shared_state(), game.shared_state())
+        self.assertEqual(recovered.players, game.players)
+        self.assertEqual(list(recovered.tiles), list(game.tiles))
+        self.assertEqual(
+            {player: board.cells for player, board in recovered.boards.items()},
+            {player: board.cells for player, board in game.boards.items()},
+        )
+
+    def test_recover(self):
+        journal = Journal(self.directory)
+        games = [play(journal, f"game_{i}") for i in range(2)]
+        # A quick game that reaches the end
+        games.append(Game("game_2", test_mode=True, journal=journal))
+        games[2].join_game("id_0")
+        games[2].start_game()
+        while games[2].state == State.ACTIVE:
+            games[2].peel(test=True)
+        games[2].bananagrams("id_0", board=[])
+        games[2].continue_game()
+        journal.flush()
+
+        recovered = Journal(self.directory).recover()
+        with self.subTest("Test every game is rebuilt."):
+            self.assertEqual(sorted(recovered), ["game_0", "game_1", "game_2"])
+            for game in games:
+                self.assert_same_game(recovered[game.id], game)
+        with self.subTest("Test unflushed commands are lost."):
+            games[0].peel(test=True)
+            self.assertEqual(Journal(self.directory).recover()["game_0"].version, 6)
+
+    def test_recovered_games_are_journaled(self):
+        journal = Journal(self.directory)
+        play(journal, "game")
+        journal.close()
+
+        journal = Journal(self.directory)
+        game = journal.recover()["game"]
+        game.peel(test=True)
+        journal.close()
+        self.assert_same_game(Journal(self.directory).recover()["game"], game)
+
+    def test_snapshot(self):
+        journal = Journal(self.directory)
+        games = [play(journal, f"game_{i}") for i in range(2)]
+        self.assertTrue(journal.snapshot(lambda: games))
+        games[0].peel(test=True)
+        games.append(play(journal, "game_2"))
+        journal.flush()
+
+        with self.subTest("Test older segments are deleted."):
+            self.assertEqual(
+                sorted(os.listdir(self.directory)), ["00000002.log", "snapshot.msgpack"]
+            )
+        recovered = Journal(self.directory).recover()
+        with self.subTest("Test snapshot plus the journal after it."):
+            self.assertEqual(len(recovered), 3)
+            for game in games:
+                self.assert_same_game(recovered[game.id], game)
+
+    def test_snapshot_during_rotation(self):
+        journal = Journal(self.directory)
+        games = [play(journal, "game_0")]
+        next_segment = journal._next_segment
+
+        def rotate():
+            # Under eventlet the hub runs other handlers while the segment is started
+            games.append(play(journal, "game_1"))
+            return next_segment()
+
+        journal._next_segment = rotate
+        self.assertTrue(journal.snapshot(lambda: games))
+        journal.close()
+        recovered = Journal(self.directory).recover()
+        self.assertEqual(sorted(recovered), ["game_0", "game_1"])
+        for game in games:
+            self.assert_same_game(recovered[game.id], game)
+
+    def test_damaged_segment(self):
+        journal = Journal(self.directory)
+        game = play(journal, "game")
+        journal.close()
+        with open(os.path.join(self.directory, "00000001.log"), "ab") as f:
+            # An entry cut short
+            f.write(b"\x96\x01")
+        self.assert_same_game(Journal(self.directory).recover()["game"], game)
+
+    def test_hibernation(self):
+        journal = Journal(self.directory)
+        store = Hibernator(os.path.join(self.directory, "games.sqlite3"), journal)
+        store.save("game_0", play(journal, "game_0"))
+        store.save("game_1", play(journal, "game_1"))
+        journal.flush()
+
+        with self.subTest("Test hibernated games are not recovered."):
+            self.assertEqual(Journal(self.directory).recover(), {})
+
+        game = store.restore("game_1")
+        game.peel(test=True)
+        journal.flush()
+        with self.subTest("Test resumed games are recovered."):
+            recovered = Journal(self.directory).recover()
+            self.assertEqual(list(recovered), ["game_1"])
+            self.assert_same_game(recovered["game_1"], game)
@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import logqueue
+from logqueue import JsonFormatter, SampleFilter
+
+
+def record(level: int = logging.INFO, event: str | None = None, msg: str = "message"):
+    record = logging.LogRecord("test", level, __file__, 1, msg, None, None)
+    if event is not None:
+        record.event = event
+    return record
+
+
+class TestJsonFormatter(unittest.TestCase):
+    def test_format(self):
+        data = record(event="peel")
+        data.msg, data.args = "peeled %s", ("game",)
+        line = json.loads(JsonFormatter().format(data))
+        with self.subTest("Test fields and extra."):
+            self.assertEqual(line["level"], "INFO")
+            self.assertEqual(line["logger"], "test")
+            self.assertEqual(line["message"], "peeled game")
+            self.assertEqual(line["event"], "peel")
+            self.assertNotIn("exc_info", line)
+        with self.subTest("Test traceback."):
+            try:
+                raise ValueError("bad")
+            except ValueError:
+                data = logging.LogRecord("test", logging.ERROR, "", 1, "failed", None, True)
+                data.exc_info = sys.exc_info()
+            line = json.loads(JsonFormatter().format(data))
+            self.assertIn("ValueError: bad", line["exc_info"])
+
+
+class TestSampleFilter(unittest.TestCase):
+    def test_sample(self):
+        sample = SampleFilter({"render": 10}, rate=1e9, burst=1000)
+        kept = [sample.filter(record(event="render")) for _ in range(30)]
+        with self.subTest("Test one in every n is kept."):
+            self.assertEqual(kept.count(True), 3)
+            self.assertTrue(kept[0])
+            self.assertEqual(sample.dropped, 27)
+        with self.subTest("Test other events and warnings are kept."):
+            self.assertTrue(sample.filter(record(event="peel")))
+            self.assertTrue(sample.filter(record()))
+            self.assertTrue(sample.filter(record(logging.WARNING, event="render")))
+        with self.subTest("Test the next record kept counts those dropped."):
+            sample = SampleFilter({"render": 4})
+            records = [record(event="render") for _ in range(5)]
+            for data in records:
+                sample.filter(data)
+            self.assertEqual(records[4].dropped, 3)
+
+    def test_rate(self):
+        with patch("logqueue.time.monotonic", return_value=100.0) as monotonic:
+            sample = SampleFilter(rate=10, burst=5)
+            kept = [sample.filter(record(logging.ERROR, event="peel")) for _ in range(8)]
+            with self.subTest("Test the burst is let through."):
+                self.assertEqual(kept, [True] * 5 + [False] * 3)
+            with self.subTest("Test events are limited apart."):
+                self.assertTrue(sample.filter(record(event="join")))
+            with self.subTest("Test tokens come back with time."):
+                monotonic.return_value = 100.2
+                data = record(logging.ERROR, event="peel")
+                self.assertTrue(sample.filter(data))
+                self.assertEqual(data.dropped, 3)
+                self.assertTrue(sample.filter(record(logging.ERROR, event="peel")))
+                self.assertFalse(sample.filter(record(logging.ERROR, event="peel")))
+
+
+class TestSetup(unittest.TestCase):
+    def test_setup(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "app.log")
+        logger = logging.getLogger("test_logqueue")
+        logger.propagate = False
+        with patch("logqueue.sys.stdout"):
+            listener = logqueue.setup([logger], path, sample={"render": 2})
+        try:
+            logger.debug("Not logged.")
+            for i in range(4):
+                logger.info("Rendered %d", i, extra={"event": "render"})
+            try:
+                raise ValueError("bad")
+            except ValueError:
+                logger.error("Failed", exc_info=True)
+        finally:
+            listener.stop()
+            for handler in logger.handlers[:]:
+                logger.removeHandler(handler)
+            for handler in listener.handlers:
+                handler.close()
+
+        with open(path) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(
+            [line["message"] for line in lines], ["Rendered 0", "Rendered 2", "Failed"]
+        )
+        self.assertEqual(lines[1]["dropped"], 1)
+        self.assertIn("ValueError: bad", lines[2]["exc_info"])
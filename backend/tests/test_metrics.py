@@ -0,0 +1,59 @@
+import unittest
+
+from metrics import Registry
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Registry()
+
+    def test_counter(self):
+        counter = self.metrics.counter("events_total", "Events.", ["event"])
+        peel = counter.labels("peel")
+        peel.inc()
+        peel.inc(2)
+        counter.labels('say "hi"\n').inc()
+        self.assertEqual(
+            self.metrics.expose(),
+            "# HELP events_total Events.\n"
+            "# TYPE events_total counter\n"
+            'events_total{event="peel"} 3\n'
+            'events_total{event="say \\"hi\\"\\n"} 1\n',
+        )
+
+    def test_gauge(self):
+        gauge = self.metrics.gauge("sessions", "Sessions.")
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+        self.metrics.gauge("games", "Games.", ["state"], lambda: {("IDLE",): 2, ("OVER",): 0.5})
+        self.metrics.gauge("size", "Size.", function=lambda: 7)
+        self.assertEqual(
+            self.metrics.expose(),
+            "# HELP sessions Sessions.\n# TYPE sessions gauge\nsessions 1\n"
+            '# HELP games Games.\n# TYPE games gauge\ngames{state="IDLE"} 2\ngames{state="OVER"} 0.5\n'
+            "# HELP size Size.\n# TYPE size gauge\nsize 7\n",
+        )
+
+    def test_histogram(self):
+        histogram = self.metrics.histogram("seconds", "Seconds.", ["event"], [1, 0.5])
+        peel = histogram.labels("peel")
+        for value in (0.25, 0.5, 0.75, 2):
+            peel.observe(value)
+        self.assertEqual(
+            self.metrics.expose(),
+            "# HELP seconds Seconds.\n"
+            "# TYPE seconds histogram\n"
+            'seconds_bucket{event="peel",le="0.5"} 2\n'
+            'seconds_bucket{event="peel",le="1"} 3\n'
+            'seconds_bucket{event="peel",le="+Inf"} 4\n'
+            'seconds_sum{event="peel"} 3.5\n'
+            'seconds_count{event="peel"} 4\n',
+        )
+
+    def test_errors(self):
+        counter = self.metrics.counter("events_total", "Events.", ["event"])
+        with self.subTest("Test the values must match the labels."), self.assertRaises(ValueError):
+            counter.labels()
+        with self.subTest("Test names are unique."), self.assertRaises(ValueError):
+            self.metrics.gauge("events_total", "Events.")
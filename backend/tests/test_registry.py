@@ -0,0 +1,133 @@
+import threading
+import unittest
+
+from registry import GameRegistry
+
+
+class TestGameRegistry(unittest.TestCase):
+    def test_mapping(self):
+        games = GameRegistry(shards=4)
+        for i in range(100):
+            games[f"game_{i}"] = i
+        del games["game_0"]
+
+        with self.subTest("Test lookups."):
+            self.assertEqual(games["game_7"], 7)
+            self.assertIn("game_7", games)
+            self.assertNotIn("game_0", games)
+            self.assertIsNone(games.get("game_0"))
+        with self.subTest("Test count."):
+            self.assertEqual(len(games), 99)
+        with self.subTest("Test iteration."):
+            self.assertEqual(sorted(games), sorted(f"game_{i}" for i in range(1, 100)))
+            self.assertEqual(dict(games.items())["game_42"], 42)
+        with self.subTest("Test missing game."), self.assertRaises(KeyError):
+            games["game_0"]
+
+    def test_get_or_create(self):
+        games = GameRegistry()
+        created = []
+
+        def create(i: int):
+            created.append(games.get_or_create("game", lambda: object())[1])
+
+        threads = [threading.Thread(target=create, args=(i,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with self.subTest("Test only one caller creates the game."):
+            self.assertEqual(created.count(True), 1)
+            self.assertEqual(len(games), 1)
+        with self.subTest("Test existing game."):
+            game = games["game"]
+            self.assertEqual(games.get_or_create("game", object), (game, False))
+
+    def test_remove_if(self):
+        games = GameRegistry(shards=4)
+        for i in range(10):
+            games[i] = i
+        with self.subTest("Test removal."):
+            self.assertEqual(sorted(games.remove_if(lambda game: game % 2)), [1, 3, 5, 7, 9])
+            self.assertEqual(sorted(games), [0, 2, 4, 6, 8])
+
+        with self.subTest("Test changes while iterating."):
+            for name in games:
+                games[name + 100] = name
+                del games[name]
+            self.assertEqual(len(games), 5)
+
+    def test_expire(self):
+        games = GameRegistry(ttl=100)
+        for i in range(10):
+            games[i] = FakeGame(last_active=i)
+        games[3].last_active = 50
+
+        with self.subTest("Test nothing due."):
+            self.assertEqual(games.expire(now=99.5), [])
+        with self.subTest("Test inactive games expire, active ones stay."):
+            self.assertEqual(games.expire(now=105.5), [0, 1, 2, 4, 5])
+            self.assertEqual(sorted(games), [3, 6, 7, 8, 9])
+            self.assertEqual(games.expired, 5)
+        with self.subTest("Test replaced game is tracked afresh."):
+            games[6] = FakeGame(last_active=200)
+            self.assertEqual(games.expire(now=250), [7, 8, 9, 3])
+            self.assertEqual(list(games), [6])
+
+    def test_max_games(self):
+        games = GameRegistry(max_games=3, idle_after=10)
+        for i in range(6):
+            games[i] = FakeGame(last_active=i)
+        games[0].last_active = 20
+
+        with self.subTest("Test least recently used idle games are evicted."):
+            self.assertEqual(games.expire(now=14.5), [1, 2, 3])
+            self.assertEqual(sorted(games), [0, 4, 5])
+            self.assertEqual(games.evicted, 3)
+        with self.subTest("Test games in use are kept over the ceiling."):
+            games[6] = FakeGame(last_active=20)
+            games[7] = FakeGame(last_active=20)
+            self.assertEqual(games.expire(now=14.5), [4])
+            self.assertEqual(sorted(games), [0, 5, 6, 7])
+
+    def test_store(self):
+        store = FakeStore()
+        games = store.games = GameRegistry(ttl=100, store=store)
+        for i in range(4):
+            games[i] = FakeGame(last_active=i)
+
+        removed = games.expire(now=105)
+        with self.subTest("Test saved games leave, others stay."):
+            self.assertEqual(removed, [0, 3])
+            self.assertEqual(sorted(games), [1, 2])
+            self.assertEqual(games.expired, 2)
+        with self.subTest("Test saving never holds the heap lock."):
+            self.assertEqual(store.heap_locked, [False] * 3)
+        with self.subTest("Test the games kept are tracked again."):
+            self.assertEqual(games.expire(now=250), [1])
+
+
+class FakeStore:
+    """Refuses game 2, and has game 1 used while game 0 is written out."""
+
+    def __init__(self):
+        self.games: GameRegistry
+        self.heap_locked: list[bool] = []
+
+    def save(self, name, game) -> bool:
+        self.heap_locked.append(self.games._heap_lock.locked())
+        if name == 0:
+            self.games[1].last_active = 150
+        return name != 2
+
+    def restore(self, name):
+        return None
+
+    def __contains__(self, name) -> bool:
+        return False
+
+
+class FakeGame:
+    def __init__(self, last_active: float):
+        self.last_active = last_active
@@ -0,0 +1,90 @@
+import random
+import unittest
+from collections import Counter
+
+from game import WORDS
+from solver import SolveResult, solve, submit
+from tiles import TILE_FREQUENCIES
+
+
+def grid_words(result: SolveResult) -> list[str]:
+    """Every maximal horizontal and vertical run of two or more tiles."""
+    grid = {(row, col): letter for row, col, letter in result.placements}
+    words = []
+    for step in ((0, 1), (1, 0)):
+        for (row, col), _ in grid.items():
+            if (row - step[0], col - step[1]) in grid:
+                continue
+            run = ""
+            while (row, col) in grid:
+                run += grid[(row, col)]
+                row, col = row + step[0], col + step[1]
+            if len(run) > 1:
+                words.append(run)
+    return words
+
+
+def connected(result: SolveResult) -> bool:
+    cells = {(row, col) for row, col, _ in result.placements}
+    if not cells:
+        return True
+    seen = set()
+    stack = [next(iter(cells))]
+    while stack:
+        row, col = stack.pop()
+        if (row, col) in seen:
+            continue
+        seen.add((row, col))
+        for cell in ((row + 1, col), (row - 1, col), (row, col + 1), (row, col - 1)):
+            if cell in cells:
+                stack.append(cell)
+    return seen == cells
+
+
+class TestSolver(unittest.TestCase):
+    def assert_valid(self, tiles: list[str], result: SolveResult):
+        used = Counter(letter for _, _, letter in result.placements)
+        self.assertEqual(used + Counter(result.remaining), Counter(tiles))
+        self.assertTrue(connected(result))
+        for word in grid_words(result):
+            self.assertIn(word, WORDS)
+
+    def test_solve(self):
+        bag = [letter for count, letters in TILE_FREQUENCIES.items() for letter in letters * count]
+        rng = random.Random(0)
+        for size in (7, 11, 15, 21, 21, 21):
+            tiles = rng.sample(bag, size)
+            result = solve(tiles, time_budget=5)
+            with self.subTest(f"Test grid for {''.join(tiles)} is valid."):
+                self.assert_valid(tiles, result)
+            with self.subTest(f"Test grid for {''.join(tiles)} is complete."):
+                self.assertTrue(result.complete)
+                self.assertEqual(result.remaining, [])
+
+    def test_partial(self):
+        tiles = ["C", "A", "T", "Q", "Q", "X"]
+        result = solve(tiles, time_budget=1)
+        with self.subTest("Test best partial grid returned."):
+            self.assert_valid(tiles, result)
+            self.assertFalse(result.complete)
+            self.assertIn("Q", result.remaining)
+        with self.subTest("Test rows rendered."):
+            self.assertEqual(len(result.rows()), max(row for row, _, _ in result.placements) + 1)
+
+    def test_time_budget(self):
+        tiles = list("ZZQQJJXXKKVVWWBBCCFFH")
+        result = solve(tiles, time_budget=0.2)
+        with self.subTest("Test search stops at the budget."):
+            self.assertLess(result.elapsed, 1)
+        with self.subTest("Test partial grid is still valid."):
+            self.assert_valid(tiles, result)
+
+    def test_unplayable(self):
+        result = solve(["Q", "Q"], time_budget=1)
+        self.assertEqual(result.placements, [])
+        self.assertEqual(result.remaining, ["Q", "Q"])
+        self.assertEqual(result.rows(), [])
+
+    def test_submit(self):
+        result = submit(list("RETAINS"), time_budget=2).result(timeout=60)
+        self.assertTrue(result.complete)
@@ -0,0 +1,107 @@
+import random
+import unittest
+from collections import Counter
+
+from tiles import TILE_FREQUENCIES, Rack, SeededRandom, TileBag
+
+
+class TestTileBag(unittest.TestCase):
+    def test_frequencies(self):
+        expected = Counter(
+            {letter: count for count, letters in TILE_FREQUENCIES.items() for letter in letters}
+        )
+        bag = TileBag.from_frequencies()
+        with self.subTest("Test full bag."):
+            self.assertEqual(len(bag), 144)
+            self.assertEqual(Counter(bag), expected)
+        with self.subTest("Test drawing every tile."):
+            self.assertEqual(Counter(bag.draw(144)), expected)
+            self.assertEqual(len(bag), 0)
+        with self.subTest("Test several bags."):
+            self.assertEqual(Counter(TileBag.from_frequencies(3)), expected + expected + expected)
+
+    def test_draw(self):
+        bag = TileBag.from_letters("AAB", rng=random.Random(0))
+        with self.subTest("Test drawing too many tiles."):
+            with self.assertRaises(ValueError):
+                bag.draw(4)
+            self.assertEqual(len(bag), 3)
+
+        bag.put("Z")
+        with self.subTest("Test returned tile."):
+            self.assertIn("Z", bag)
+            self.assertEqual(sorted(bag.draw(4)), ["A", "A", "B", "Z"])
+        with self.subTest("Test invalid tile."), self.assertRaises(ValueError):
+            bag.put("a")
+
+    def test_deal(self):
+        bag = TileBag.from_frequencies()
+        hands = bag.deal(4, 21)
+        with self.subTest("Test hand sizes."):
+            self.assertEqual([len(hand) for hand in hands], [21] * 4)
+            self.assertEqual(len(bag), 144 - 84)
+        with self.subTest("Test dealt tiles came from the bag."):
+            dealt = Counter(tile for hand in hands for tile in hand)
+            self.assertEqual(dealt + Counter(bag), Counter(TileBag.from_frequencies()))
+
+    def test_distribution(self):
+        # The first tile drawn follows the letter frequencies of the bag
+        rng = random.Random(0)
+        draws = Counter(TileBag.from_frequencies(rng=rng).draw()[0] for _ in range(14400))
+        for letter, expected in (("E", 1800), ("A", 1300), ("Q", 200)):
+            with self.subTest(letter=letter):
+                self.assertAlmostEqual(draws[letter], expected, delta=expected * 0.2)
+
+
+class TestSeededRandom(unittest.TestCase):
+    def test_reproducible(self):
+        rng = SeededRandom(42)
+        first = [rng.randrange(144) for _ in range(10)]
+        with self.subTest("Test same seed, same numbers."):
+            same, other = SeededRandom(42), SeededRandom(43)
+            self.assertEqual([same.randrange(144) for _ in range(10)], first)
+            self.assertNotEqual([other.randrange(144) for _ in range(10)], first)
+        with self.subTest("Test state is the seed and the draw count."):
+            self.assertEqual(rng.getstate(), (42, 10))
+            later = [rng.random() for _ in range(5)]
+            resumed = SeededRandom(42, draws=10)
+            self.assertEqual([resumed.random() for _ in range(5)], later)
+        with self.subTest("Test reseeding starts over."):
+            rng.seed(42)
+            self.assertEqual([rng.randrange(144) for _ in range(10)], first)
+
+    def test_ranges(self):
+        rng = SeededRandom(0)
+        values = [rng.randrange(3) for _ in range(3000)]
+        with self.subTest("Test every value in range is drawn evenly."):
+            self.assertEqual(set(values), {0, 1, 2})
+            self.assertAlmostEqual(values.count(0), 1000, delta=150)
+        with self.subTest("Test other methods of random.Random."):
+            self.assertTrue(0 <= rng.random() < 1)
+            self.assertIn(rng.randrange(10, 20, 5), (10, 15))
+            self.assertLess(rng.getrandbits(100), 1 << 100)
+            self.assertEqual(sorted(rng.sample(range(5), 5)), [0, 1, 2, 3, 4])
+
+
+class TestRack(unittest.TestCase):
+    def test_rack(self):
+        rack = Rack(["Q", "I", "A"])
+        rack.append("A")
+        with self.subTest("Test counts."):
+            self.assertEqual(len(rack), 4)
+            self.assertEqual(rack.count("A"), 2)
+            self.assertIn("Q", rack)
+            self.assertNotIn("Z", rack)
+        with self.subTest("Test wire format."):
+            self.assertEqual(rack.letters(), ["A", "A", "I", "Q"])
+            self.assertEqual(rack.for_json(), ["A", "A", "I", "Q"])
+
+        rack.remove("A")
+        with self.subTest("Test remove."):
+            self.assertEqual(rack, Rack("AIQ"))
+        with self.subTest("Test removing a missing tile."):
+            with self.assertRaises(ValueError):
+                rack.remove("Z")
+            self.assertEqual(len(rack), 3)
+        with self.subTest("Test invalid tile."), self.assertRaises(ValueError):
+            rack.append("?")
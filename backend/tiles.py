@@ -0,0 +1,303 @@
+"""The pile of tiles players draw from, and the racks they draw into.
+
+The bag is a compact byte array of the tiles, in no particular order, rather
+than a shuffled list of strings. Drawing a tile picks a uniformly random slot
+and moves the last tile into it, which is the same as taking the top tile of a
+uniformly shuffled pile. So there is never anything to shuffle: draws and
+returns are O(1) no matter how many tiles are in the bag, and a returned tile
+is just appended.
+
+Games draw with a ``SeededRandom``, whose whole state is its seed and the
+number of draws made so far, so a game's tiles can be reproduced from those
+two numbers alone.
+"""
+
+import os
+import random
+from collections.abc import Iterable, Iterator
+
+TILE_FREQUENCIES = {
+    2: ["J", "K", "Q", "X", "Z"],
+    3: ["B", "C", "F", "H", "M", "P", "V", "W", "Y"],
+    4: ["G"],
+    5: ["L"],
+    6: ["D", "S", "U"],
+    8: ["N"],
+    9: ["T", "R"],
+    11: ["O"],
+    12: ["I"],
+    13: ["A"],
+    18: ["E"],
+}
+
+# The minimal set of tiles used by test mode games
+TEST_TILES = ["A", "E", "T", "S", "R", "N", "O", "I", "L", "C"]
+
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# The slot of each letter in a rack
+_INDEX = {letter: i for i, letter in enumerate(LETTERS)}
+
+
+_MASK = (1 << 64) - 1
+
+
+class SeededRandom(random.Random):
+    """A random number generator that can be put back at any point from two numbers.
+
+    Draw ``n`` is splitmix64 of ``seed + n * golden gamma``, a function of the seed
+    and the draw's position alone, rather than the next step of a Mersenne
+    Twister with 2.5 KB of state. Setting ``draws`` moves the generator to any
+    point, which is what ``getstate`` and ``setstate`` save and restore. Every
+    other method of ``random.Random`` is built on ``getrandbits``.
+
+    Attributes:
+        initial_seed (int): The seed, 64 bits.
+        draws (int): The number of 64 bit draws made since seeding.
+    """
+
+    def __init__(self, seed: int | None = None, draws: int = 0):
+        super().__init__(seed)
+        self.draws = draws
+
+    def seed(self, a: int | None = None, version: int = 2):  # type: ignore[override]
+        """Start again from a seed, or from a random one when it is None."""
+        if a is None:
+            a = int.from_bytes(os.urandom(8))
+        self.initial_seed = a & _MASK
+        self.draws = 0
+        self.gauss_next = None
+
+    def _next(self) -> int:
+        self.draws += 1
+        z = (self.initial_seed + self.draws * 0x9E3779B97F4A7C15) & _MASK
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+        return z ^ (z >> 31)
+
+    def getrandbits(self, k: int) -> int:
+        if k <= 64:
+            return self._next() >> (64 - k)
+        bits = 0
+        for _ in range(0, k, 64):
+            bits = bits << 64 | self._next()
+        return bits >> (-k % 64)
+
+    def random(self) -> float:
+        return (self._next() >> 11) * 2.0**-53
+
+    def randrange(self, start: int, stop: int | None = None, step: int = 1) -> int:  # type: ignore[override]
+        if stop is None and step == 1 and start > 0:
+            # _next inlined, as this is every tile draw. Scaled rather than
+            # rejection sampled, the bias is at most start / 2**64
+            self.draws += 1
+            z = (self.initial_seed + self.draws * 0x9E3779B97F4A7C15) & _MASK
+            z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+            z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+            return ((z ^ (z >> 31)) * start) >> 64
+        return super().randrange(start, stop, step)
+
+    def getstate(self) -> tuple[int, int]:  # type: ignore[override]
+        return self.initial_seed, self.draws
+
+    def setstate(self, state: tuple[int, int]):  # type: ignore[override]
+        self.initial_seed, self.draws = state
+
+
+class TileBag:
+    """A bag of tiles.
+
+    Attributes:
+        tiles (bytearray): The ASCII letter of every tile in the bag, unordered.
+        rng (random.Random): The source of randomness for draws.
+    """
+
+    def __init__(self, tiles: bytes = b"", rng: random.Random | None = None):
+        self.tiles = bytearray(tiles)
+        self.rng = rng if rng is not None else random.Random()
+
+    @classmethod
+    def from_frequencies(cls, bags: int = 1, rng: random.Random | None = None) -> "TileBag":
+        """A full set of tiles, following ``TILE_FREQUENCIES``.
+
+        Args:
+            bags (int): How many full sets of tiles to put in the bag. Defaults to 1.
+            rng (random.Random, optional): The source of randomness for draws.
+        """
+        tiles = b"".join(
+            letter.encode("ascii") * (count * bags)
+            for count, letters in TILE_FREQUENCIES.items()
+            for letter in letters
+        )
+        return cls(tiles, rng)
+
+    @classmethod
+    def from_letters(cls, letters: Iterable[str], rng: random.Random | None = None) -> "TileBag":
+        """A bag holding exactly the given tiles.
+
+        Args:
+            letters (Iterable[str]): The tiles.
+            rng (random.Random, optional): The source of randomness for draws.
+        """
+        bag = cls(rng=rng)
+        bag.put(letters)
+        return bag
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+    def __iter__(self) -> Iterator[str]:
+        """The tiles in the bag, in alphabetical order."""
+        for letter, count in zip(LETTERS, self.counts(), strict=True):
+            yield from letter * count
+
+    def __contains__(self, letter: str) -> bool:
+        return letter in LETTERS and len(letter) == 1 and ord(letter) in self.tiles
+
+    def counts(self) -> list[int]:
+        """The number of each letter left in the bag, A to Z."""
+        return [self.tiles.count(code) for code in range(65, 91)]
+
+    def draw(self, k: int = 1) -> list[str]:
+        """Take tiles out of the bag at random.
+
+        Args:
+            k (int): The number of tiles to take. Defaults to 1.
+
+        Raises:
+            ValueError: There are fewer than ``k`` tiles in the bag.
+
+        Returns:
+            List[str]: The tiles, in the order they were drawn.
+        """
+        tiles, randrange = self.tiles, self.rng.randrange
+        if k > len(tiles):
+            raise ValueError(f"Cannot draw {k} tiles from a bag of {len(tiles)}.")
+        drawn = []
+        for n in range(len(tiles), len(tiles) - k, -1):
+            i = randrange(n)
+            drawn.append(LETTERS[tiles[i] - 65])
+            # Fill the hole with the last tile still in the bag
+            tiles[i] = tiles[n - 1]
+        del tiles[len(tiles) - k :]
+        return drawn
+
+    def deal(self, hands: int, k: int) -> list[list[str]]:
+        """Draw the same number of tiles for each of several players.
+
+        Args:
+            hands (int): The number of players.
+            k (int): The number of tiles each player gets.
+
+        Raises:
+            ValueError: There are not enough tiles in the bag.
+
+        Returns:
+            List[List[str]]: The tiles of each player.
+        """
+        tiles = self.draw(hands * k)
+        return [tiles[i * k : (i + 1) * k] for i in range(hands)]
+
+    def put(self, letters: Iterable[str]):
+        """Return tiles to the bag.
+
+        Args:
+            letters (Iterable[str]): The tiles.
+
+        Raises:
+            ValueError: A tile is not a letter from A to Z.
+        """
+        for letter in letters:
+            if len(letter) != 1 or not "A" <= letter <= "Z":
+                raise ValueError(f"Invalid tile {letter!r}.")
+            self.tiles.append(ord(letter))
+
+
+class Rack:
+    """The tiles a player holds, kept as a count of each letter.
+
+    Membership, counting, adding and removing a tile are O(1), and the rack is
+    26 bytes no matter how many tiles it holds (no letter has more than 255
+    tiles). It is only turned into a list of letters when sent to a client.
+
+    Attributes:
+        counts (bytearray): The number of each letter in the rack, A to Z.
+    """
+
+    __slots__ = ("_total", "counts")
+
+    def __init__(self, letters: Iterable[str] = ()):
+        self.counts = bytearray(26)
+        self._total = 0
+        self.extend(letters)
+
+    @classmethod
+    def from_counts(cls, counts: bytes) -> "Rack":
+        """A rack holding ``counts[i]`` tiles of the i-th letter, as in ``counts``."""
+        rack = cls()
+        rack.counts[:] = counts
+        rack._total = sum(rack.counts)
+        return rack
+
+    def __len__(self) -> int:
+        return self._total
+
+    def __iter__(self) -> Iterator[str]:
+        """The tiles in the rack, in alphabetical order."""
+        for letter, count in zip(LETTERS, self.counts, strict=True):
+            yield from letter * count
+
+    def __contains__(self, letter: str) -> bool:
+        i = _INDEX.get(letter)
+        return i is not None and self.counts[i] > 0
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Rack):
+            return self.counts == other.counts
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Rack({self.letters()})"
+
+    def count(self, letter: str) -> int:
+        """The number of tiles of a letter in the rack."""
+        i = _INDEX.get(letter)
+        return 0 if i is None else self.counts[i]
+
+    def append(self, letter: str):
+        """Add a tile to the rack.
+
+        Raises:
+            ValueError: The tile is not a letter from A to Z.
+        """
+        i = _INDEX.get(letter)
+        if i is None:
+            raise ValueError(f"Invalid tile {letter!r}.")
+        self.counts[i] += 1
+        self._total += 1
+
+    def extend(self, letters: Iterable[str]):
+        """Add several tiles to the rack."""
+        for letter in letters:
+            self.append(letter)
+
+    def remove(self, letter: str):
+        """Take a tile out of the rack.
+
+        Raises:
+            ValueError: The rack has no such tile.
+        """
+        i = _INDEX.get(letter)
+        if i is None or not self.counts[i]:
+            raise ValueError(f"Rack has no {letter!r} tile.")
+        self.counts[i] -= 1
+        self._total -= 1
+
+    def letters(self) -> list[str]:
+        """The tiles in the rack, as sent to clients."""
+        return list(self)
+
+    def __json__(self) -> list[str]:
+        return self.letters()
+
+    for_json = __json__
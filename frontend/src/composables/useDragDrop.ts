@@ -128,7 +128,14 @@ export function useDragDrop() {
     try {
       for (const { tile, move } of removedTiles) {
         boardStore.placeTile(tile, move.toRow, move.toCol)
-        socketStore.moveTile(gameStore.gameId, move.fromRow!, move.fromCol!, move.toRow, move.toCol)
+      }
+      if (removedTiles.length) {
+        socketStore.moveTiles(gameStore.gameId, removedTiles.map(({ move }) => ({
+          fromRow: move.fromRow!,
+          fromCol: move.fromCol!,
+          toRow: move.toRow,
+          toCol: move.toCol,
+        })))
       }
     } catch (error) {
       // Rollback on error - place tiles back in original positions
@@ -154,7 +161,7 @@ export function useDragDrop() {
 
         playerStore.markTileOnBoard(move.tile.id, true)
         boardStore.placeTile(move.tile, move.toRow, move.toCol)
-        socketStore.placeTile(gameStore.gameId, move.tile.id, move.toRow, move.toCol)
+        socketStore.placeTile(gameStore.gameId, move.tile, move.toRow, move.toCol)
       } catch (error) {
         logger.error(
           `Error executing move for tile ${move.tile.id}`,
@@ -179,7 +186,7 @@ export function useDragDrop() {
       const tile = boardStore.removeTile(dragData.sourceRow, dragData.sourceCol)
       if (tile) {
         playerStore.markTileOnBoard(tile.id, false)
-        // TODO: Send socket event for removing tile from board
+        socketStore.removeTile(gameStore.gameId, dragData.sourceRow, dragData.sourceCol)
       }
     }
 
@@ -17,7 +17,7 @@ export const useGameStore = defineStore("game", () => {
       id: playerId,
       name: playerId, // In the backend, player_id is the name
       ready: gameState.value?.state !== "IDLE",
-      tile_count: Array.isArray(tiles) ? tiles.length : 0,
+      tile_count: Array.isArray(tiles) ? tiles.length : tiles,
     }));
   });
   const tilesRemaining = computed(() => gameState.value?.tiles_remaining || 0);
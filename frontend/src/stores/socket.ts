@@ -6,7 +6,7 @@ import { usePlayerStore } from "./player";
 import { useBoardStore } from "./board";
 import { useErrorHandler } from "@/composables/useErrorHandler";
 import { logger } from "@/utils/logger";
-import type { GameState, Tile } from "@/types";
+import type { GameState, StateDelta, Tile } from "@/types";
 
 export const useSocketStore = defineStore("socket", () => {
   const socket = ref<Socket | null>(null);
@@ -17,6 +17,8 @@ export const useSocketStore = defineStore("socket", () => {
   const playerStore = usePlayerStore();
   const boardStore = useBoardStore();
   const { handleError, handleSocketError } = useErrorHandler('WebSocket');
+  // The server version of the last rack update applied to this player's tiles
+  let rackVersion: number | null = null;
 
   // Helper function to update player tiles while preserving existing tile IDs and board state
   function updatePlayerTiles(playerTileLetters: string[], currentPlayerName: string) {
@@ -196,29 +198,72 @@ export const useSocketStore = defineStore("socket", () => {
       }
 
       gameStore.updateGameState(data);
+    });
 
-      // Extract current player's tiles and convert to Tile objects
-      const currentPlayerName = playerStore.playerName;
-      if (
-        currentPlayerName &&
-        data.players &&
-        data.players[currentPlayerName]
-      ) {
-        const playerTileLetters: string[] = data.players[currentPlayerName];
-        updatePlayerTiles(playerTileLetters, currentPlayerName);
+    // Peels and swaps only send what changed, on top of the state at `base`
+    socket.value.on("state_delta", (data: StateDelta) => {
+      logger.socketEvent("state_delta", data);
+      const current = gameStore.gameState;
+      if (!current || current.version !== data.base) {
+        // Missed an update, ask for everything since the version we have
+        requestSync();
+        return;
+      }
+      const players = { ...current.players };
+      for (const [player, count] of Object.entries(data.players ?? {})) {
+        players[player] = count;
+      }
+      if (data.dealt) {
+        for (const [player, tiles] of Object.entries(players)) {
+          players[player] = (typeof tiles === "number" ? tiles : tiles.length) + data.dealt;
+        }
       }
+      gameStore.updateGameState({ ...data.state, players, version: data.version });
     });
 
-    socket.value.on("player_tiles", (data: { tiles: Tile[] }) => {
+    // Only this player's tiles, the shared game state just has each rack's size
+    socket.value.on("player_tiles", (data: { version?: number; tiles: string[] }) => {
       logger.socketEvent("player_tiles", data);
-      playerStore.setTiles(data.tiles);
+      const currentPlayerName = playerStore.playerName;
+      if (currentPlayerName) {
+        updatePlayerTiles(data.tiles, currentPlayerName);
+        rackVersion = data.version ?? rackVersion;
+      }
     });
 
-    socket.value.on("tile_update", (data: { tiles: Tile[] }) => {
+    // The reply to placing, moving or removing a tile, with a summary of the board
+    socket.value.on("tile_update", (data: { tiles?: Tile[] }) => {
       logger.socketEvent("tile_update", data);
-      playerStore.updateTiles(data.tiles);
+      if (data.tiles) {
+        playerStore.updateTiles(data.tiles);
+      }
     });
 
+    // Peels and swaps only send the tiles this player gained and lost
+    socket.value.on(
+      "rack_update",
+      (data: { version: number; add?: string[]; remove?: string[] }) => {
+        logger.socketEvent("rack_update", data);
+        const currentPlayerName = playerStore.playerName;
+        if (!currentPlayerName) {
+          return;
+        }
+        if (rackVersion !== null && data.version <= rackVersion) {
+          return; // Already applied
+        }
+        const letters = playerStore.tiles.map(t => t.letter);
+        for (const letter of data.remove ?? []) {
+          const index = letters.indexOf(letter);
+          if (index !== -1) {
+            letters.splice(index, 1);
+          }
+        }
+        letters.push(...(data.add ?? []));
+        updatePlayerTiles(letters, currentPlayerName);
+        rackVersion = data.version;
+      }
+    );
+
     socket.value.on("error", (data: { message: string }) => {
       logger.socketError(data, "Socket error");
       gameStore.setError(data.message);
@@ -318,7 +363,7 @@ export const useSocketStore = defineStore("socket", () => {
     }
   }
 
-  function placeTile(gameId: string, tileId: string, row: number, col: number) {
+  function placeTile(gameId: string, tile: Tile, row: number, col: number) {
     if (!socket.value?.connected) {
       handleSocketError(new Error("Socket not connected"), "Place Tile");
       return;
@@ -327,7 +372,9 @@ export const useSocketStore = defineStore("socket", () => {
     try {
       socket.value.emit("place_tile", {
         game_id: gameId,
-        tile_id: tileId,
+        player_id: playerStore.playerName,
+        tile_id: tile.id,
+        letter: tile.letter,
         row,
         col,
       });
@@ -347,6 +394,7 @@ export const useSocketStore = defineStore("socket", () => {
 
     socket.value.emit("move_tile", {
       game_id: gameId,
+      player_id: playerStore.playerName,
       from_row: fromRow,
       from_col: fromCol,
       to_row: toRow,
@@ -354,6 +402,48 @@ export const useSocketStore = defineStore("socket", () => {
     });
   }
 
+  function moveTiles(
+    gameId: string,
+    moves: Array<{ fromRow: number; fromCol: number; toRow: number; toCol: number }>
+  ) {
+    if (!socket.value?.connected) return;
+
+    // The server applies the moves all at once, so tiles can swap cells
+    socket.value.emit("move_tile", {
+      game_id: gameId,
+      player_id: playerStore.playerName,
+      moves: moves.map((move) => ({
+        from_row: move.fromRow,
+        from_col: move.fromCol,
+        to_row: move.toRow,
+        to_col: move.toCol,
+      })),
+    });
+  }
+
+  function removeTile(gameId: string, row: number, col: number) {
+    if (!socket.value?.connected) return;
+
+    socket.value.emit("remove_tile", {
+      game_id: gameId,
+      player_id: playerStore.playerName,
+      row,
+      col,
+    });
+  }
+
+  // Catch up after a missed delta, the server falls back to a full game_state
+  function requestSync() {
+    const current = gameStore.gameState;
+    if (!socket.value?.connected || !current) return;
+
+    socket.value.emit("sync", {
+      name: current.id,
+      version: current.version ?? 0,
+      ...(playerStore.playerName ? { player_id: playerStore.playerName } : {}),
+    });
+  }
+
   function swapTile(gameId: string, letter: string) {
     if (!socket.value?.connected) return;
 
@@ -382,10 +472,16 @@ export const useSocketStore = defineStore("socket", () => {
   function callBananagrams(gameId: string, words: string[]) {
     if (!socket.value?.connected) return;
 
+    // The server checks the whole board against the player's tiles
     socket.value.emit("bananagrams", {
       name: gameId,
       player_id: playerStore.playerName,
       words: words,
+      board: boardStore.getAllTiles().map(({ tile, position }) => ({
+        row: position.row,
+        col: position.col,
+        letter: tile.letter,
+      })),
     });
   }
 
@@ -423,6 +519,8 @@ export const useSocketStore = defineStore("socket", () => {
     startGame,
     placeTile,
     moveTile,
+    moveTiles,
+    removeTile,
     swapTile,
     peel,
     callBananagrams,
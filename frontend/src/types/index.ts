@@ -14,7 +14,7 @@ export interface Player {
 
 export interface GameState {
   id: string
-  players: Record<string, string[]> // Backend format: player_id -> tiles array
+  players: Record<string, string[] | number> // Backend format: player_id -> tiles, or number of tiles
   state: 'IDLE' | 'ACTIVE' | 'ENDGAME' | 'OVER'
   num_players?: number
   tiles_remaining?: number
@@ -22,6 +22,15 @@ export interface GameState {
   winning_words?: string[]
   winner?: string // Alternative name for winning_player
   winningWords?: string[] // Alternative name for winning_words
+  version?: number // The server's change counter, deltas apply on top of it
+}
+
+export interface StateDelta {
+  base: number
+  version: number
+  state?: Partial<GameState>
+  players?: Record<string, number>
+  dealt?: number
 }
 
 export interface BoardCell {